@@ -1,16 +1,72 @@
-import sqlite3, time, hashlib, json, os, sys, logging
+# sqlite3 / hashlib / json are imported on first use so that `import cache`
+# stays cheap for callers that never touch the database.
+import time, os, sys, logging, threading
 from pathlib import Path
 
 BASE = Path(__file__).resolve().parent
 sys.path.insert(0, str(BASE))
 
-from utils.project_utils import resolve_auto_project
-
 DB_PATH = Path(os.getenv("AUGMENT_DB_DIR", "./data")) / "response_cache.sqlite"
-DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 logger = logging.getLogger(__name__)
 
+
+# Last "auto" resolution, keyed on (cwd, projects.json mtime/size) so steady
+# state costs one os.stat instead of reading and parsing projects.json.
+_active_cache = (None, None)
+
+
+def resolve_auto_project():
+    """Resolve auto project mode (imported lazily from utils.project_utils)."""
+    global _active_cache
+    from utils.project_utils import PROJECTS_CONFIG, resolve_auto_project as _resolve
+
+    try:
+        st = os.stat(PROJECTS_CONFIG)
+        key = (os.getcwd(), st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        key = (os.getcwd(), None, None)
+
+    cached_key, name = _active_cache
+    if cached_key != key:
+        name = _resolve()
+        _active_cache = (key, name)
+    return name
+
+# Optional accelerators for make_key(): orjson encodes the payload in C and
+# BLAKE3 / xxh3 hash it much faster than SHA-256. Fall back to stdlib.
+_orjson = None
+
+
+def _lazy_orjson():
+    """Lazy import orjson; returns None when it is not installed."""
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson
+            _orjson = orjson
+        except ImportError:
+            _orjson = False
+    return _orjson if _orjson is not False else None
+
+_hasher_factory = None
+
+
+def _new_hasher():
+    """Return a fresh hasher: BLAKE3, then xxh3_128, then SHA-256."""
+    global _hasher_factory
+    if _hasher_factory is None:
+        try:
+            from blake3 import blake3 as factory
+        except ImportError:
+            try:
+                from xxhash import xxh3_128 as factory
+            except ImportError:
+                import hashlib
+                factory = hashlib.sha256
+        _hasher_factory = factory
+    return _hasher_factory()
+
 # Lazy import semantic cache
 _SemanticCache = None
 
@@ -27,19 +83,83 @@ def _lazy_semantic_cache():
     return _SemanticCache if _SemanticCache is not False else None
 
 
-def _db():
-    conn = sqlite3.connect(DB_PATH)
+def __getattr__(name):
+    """PEP 562: resolve `cache.SemanticCache` on first access only."""
+    if name == "SemanticCache":
+        cls = _lazy_semantic_cache()
+        if cls is not None:
+            return cls
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Shared connection (created once per process).
+# WAL lets readers proceed while a write is in flight, and synchronous=NORMAL
+# drops the per-commit fsync that the default FULL mode pays.
+_CONN = None
+_CONN_LOCK = threading.Lock()
+# sqlite allows a single writer; serialize writes in-process instead of
+# relying on busy-timeout retries.
+_WRITE_LOCK = threading.Lock()
+
+# Expired rows are purged in bulk at most once per interval instead of
+# deleting them one at a time on read.
+_GC_INTERVAL_SEC = 300
+_last_gc = 0.0
+
+
+def _init_db():
+    """Open the cache database, configure pragmas and create schema (runs once)."""
+    import sqlite3
+
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    # journal_mode must be set before the first write
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-20000")
     # Updated schema: add project column
     conn.execute("""CREATE TABLE IF NOT EXISTS cache (
         project TEXT NOT NULL,
         k TEXT NOT NULL,
-        v TEXT NOT NULL,
+        v BLOB NOT NULL,
         expire_at INTEGER NOT NULL,
         PRIMARY KEY (project, k)
     )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS cache_expire ON cache(expire_at)")
     return conn
 
-def make_key(model: str, messages: list, extra: dict, evidence_fingerprints: list, project: str = None):
+
+def _db():
+    global _CONN
+    if _CONN is None:
+        with _CONN_LOCK:
+            if _CONN is None:
+                _CONN = _init_db()
+    return _CONN
+
+
+def _maybe_gc(conn, now: float):
+    """Delete all expired rows in one statement if the GC interval elapsed."""
+    global _last_gc
+    if now - _last_gc < _GC_INTERVAL_SEC:
+        return
+    with _WRITE_LOCK:
+        if now - _last_gc < _GC_INTERVAL_SEC:
+            return
+        _last_gc = now
+        conn.execute("DELETE FROM cache WHERE expire_at<?", (int(now),))
+
+def message_fingerprint(message) -> str:
+    """Hash one message so callers can reuse it across make_key() calls."""
+    h = _new_hasher()
+    h.update(_canonical_bytes(message))
+    return h.hexdigest()
+
+
+def make_key(model: str, messages: list, extra: dict, evidence_fingerprints: list, project: str = None,
+             messages_fingerprints: list = None):
     """
     Generate cache key.
 
@@ -49,6 +169,8 @@ def make_key(model: str, messages: list, extra: dict, evidence_fingerprints: lis
         extra: Extra parameters
         evidence_fingerprints: Evidence fingerprints
         project: Project name (None for global, "auto" for active project)
+        messages_fingerprints: Optional per-message hashes (see message_fingerprint);
+            when given, they are hashed instead of re-serializing messages
 
     Returns:
         Tuple of (project, key_hash)
@@ -59,17 +181,60 @@ def make_key(model: str, messages: list, extra: dict, evidence_fingerprints: lis
     # Use empty string for global cache
     project = project or ""
 
-    payload = {
-        "model": model,
-        "messages": messages,
-        "extra": extra,
-        "evidence": evidence_fingerprints,
-    }
-    s = json.dumps(payload, sort_keys=True, ensure_ascii=False)
-    key_hash = hashlib.sha256(s.encode("utf-8")).hexdigest()
+    if messages_fingerprints is not None:
+        # Hash of hashes: cost no longer depends on message size
+        payload = {
+            "model": model,
+            "msgs": messages_fingerprints,
+            "extra": extra,
+            "evidence": evidence_fingerprints,
+        }
+    else:
+        payload = {
+            "model": model,
+            "messages": messages,
+            "extra": extra,
+            "evidence": evidence_fingerprints,
+        }
+    h = _new_hasher()
+    h.update(_canonical_bytes(payload))
+    key_hash = h.hexdigest()
 
     return (project, key_hash)
 
+
+def _dumps(v) -> bytes:
+    """Serialize a cache value to bytes (stored as a BLOB)."""
+    orjson = _lazy_orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(v)
+        except TypeError:
+            pass
+    import json
+    return json.dumps(v, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(v):
+    """Deserialize a cache value (accepts BLOB rows and legacy TEXT rows)."""
+    orjson = _lazy_orjson()
+    if orjson is not None:
+        return orjson.loads(v)
+    import json
+    return json.loads(v)
+
+
+def _canonical_bytes(payload) -> bytes:
+    """Encode payload deterministically (sorted keys) straight to bytes."""
+    orjson = _lazy_orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass  # e.g. non-str dict keys; use stdlib encoder below
+    import json
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+
 def get(k: str | tuple, project: str = None):
     """
     Get cached value.
@@ -91,17 +256,17 @@ def get(k: str | tuple, project: str = None):
         project = project or ""
         key_hash = k
 
-    now = int(time.time())
-    with _db() as conn:
-        cur = conn.execute("SELECT v, expire_at FROM cache WHERE project=? AND k=?", (project, key_hash))
-        row = cur.fetchone()
-        if not row:
-            return None
-        v, expire_at = row
-        if expire_at < now:
-            conn.execute("DELETE FROM cache WHERE project=? AND k=?", (project, key_hash))
-            return None
-        return json.loads(v)
+    now = time.time()
+    conn = _db()
+    _maybe_gc(conn, now)
+    row = conn.execute("SELECT v, expire_at FROM cache WHERE project=? AND k=?", (project, key_hash)).fetchone()
+    if not row:
+        return None
+    v, expire_at = row
+    if expire_at < int(now):
+        # Expired rows are left for _maybe_gc() to purge in bulk
+        return None
+    return _loads(v)
 
 def set(k: str | tuple, v, ttl_sec: int = 3600, project: str = None):
     """
@@ -124,12 +289,57 @@ def set(k: str | tuple, v, ttl_sec: int = 3600, project: str = None):
         key_hash = k
 
     expire_at = int(time.time()) + ttl_sec
-    with _db() as conn:
+    conn = _db()
+    with _WRITE_LOCK, conn:
         conn.execute(
             "REPLACE INTO cache (project, k, v, expire_at) VALUES (?, ?, ?, ?)",
-            (project, key_hash, json.dumps(v, ensure_ascii=False), expire_at)
+            (project, key_hash, _dumps(v), expire_at)
         )
 
+def set_many(items, ttl_sec: int = 3600, project: str = None):
+    """
+    Set several cached values in a single transaction.
+
+    Args:
+        items: Iterable of (k, v) pairs; k follows the same rules as in set()
+        ttl_sec: Time to live in seconds (shared by all items)
+        project: Project name for str keys (None for global, "auto" for active project)
+    """
+    # Resolve project once for all old-style (str) keys
+    if project == "auto":
+        project = resolve_auto_project()
+    project = project or ""
+
+    expire_at = int(time.time()) + ttl_sec
+    rows = (
+        (*k, _dumps(v), expire_at) if isinstance(k, tuple) else (project, k, _dumps(v), expire_at)
+        for k, v in items
+    )
+
+    conn = _db()
+    with _WRITE_LOCK, conn:
+        conn.execute("BEGIN")
+        conn.executemany("REPLACE INTO cache (project, k, v, expire_at) VALUES (?, ?, ?, ?)", rows)
+
+# One SemanticCache per project: construction loads the embedding provider
+# and the FAISS index from disk, so it must not happen on every call.
+_sem_instances: dict = {}
+_SEM_LOCK = threading.Lock()
+
+
+def _get_sem(SemanticCache, project: str = None):
+    """Return the shared SemanticCache for project, creating it once."""
+    key = project or ""
+    inst = _sem_instances.get(key)
+    if inst is None:
+        with _SEM_LOCK:
+            inst = _sem_instances.get(key)
+            if inst is None:
+                inst = SemanticCache(project=project)
+                _sem_instances[key] = inst
+    return inst
+
+
 def clear(project: str = None):
     """
     Clear cache for a project.
@@ -140,7 +350,8 @@ def clear(project: str = None):
     if project == "auto":
         project = resolve_auto_project()
 
-    with _db() as conn:
+    conn = _db()
+    with _WRITE_LOCK, conn:
         if project == "all":
             conn.execute("DELETE FROM cache")
             print("✅ Cleared all cache")
@@ -155,14 +366,20 @@ def clear(project: str = None):
         try:
             if project == "all":
                 # Clear all semantic caches (would need to iterate projects)
+                with _SEM_LOCK:
+                    _sem_instances.clear()
                 cache = SemanticCache(project=None)
                 cache.clear()
             else:
-                cache = SemanticCache(project=project)
+                with _SEM_LOCK:
+                    cache = _sem_instances.pop(project or "", None)
+                if cache is None:
+                    cache = SemanticCache(project=project)
                 cache.clear()
         except Exception as e:
             logger.warning(f"Failed to clear semantic cache: {e}")
 
+
 def semantic_get(query: str, project: str = "auto", similarity_threshold: float = 0.95):
     """
     Get cached value using semantic similarity.
@@ -170,7 +387,9 @@ def semantic_get(query: str, project: str = "auto", similarity_threshold: float
     Args:
         query: Query text
         project: Project name (None for global, "auto" for active project)
-        similarity_threshold: Minimum similarity score (0-1)
+        similarity_threshold: Minimum cosine similarity (0-1). The cache
+            matches query against query, so keep it high (~0.95); thresholds
+            around 0.4 only make sense for query-to-document retrieval.
 
     Returns:
         Cached value or None
@@ -183,8 +402,8 @@ def semantic_get(query: str, project: str = "auto", similarity_threshold: float
         project = resolve_auto_project()
 
     try:
-        cache = SemanticCache(project=project, similarity_threshold=similarity_threshold)
-        return cache.get(query)
+        cache = _get_sem(SemanticCache, project)
+        return cache.get(query, similarity_threshold=similarity_threshold)
     except Exception as e:
         logger.error(f"Semantic cache get failed: {e}")
         return None
@@ -207,7 +426,7 @@ def semantic_set(query: str, value, ttl_sec: int = 3600, project: str = "auto"):
         project = resolve_auto_project()
 
     try:
-        cache = SemanticCache(project=project)
+        cache = _get_sem(SemanticCache, project)
         cache.set(query, value, ttl_sec=ttl_sec)
     except Exception as e:
         logger.error(f"Semantic cache set failed: {e}")
\ No newline at end of file
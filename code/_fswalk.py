@@ -0,0 +1,104 @@
+"""Shared source-tree traversal for code search (os.scandir based)."""
+import fnmatch
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+# Directories never searched (in addition to hidden ones)
+SKIP_DIRS = frozenset({'__pycache__', 'node_modules', 'venv', '.venv', 'dist', 'build'})
+
+
+def skip_pattern(skip: frozenset = SKIP_DIRS) -> re.Pattern:
+    """Compile a regex that finds a hidden or skip-dir component in a path string.
+
+    One C-level search replaces a Python loop over Path.parts.
+    """
+    alternatives = "|".join([r"\.[^\\/]*", *(re.escape(name) for name in sorted(skip))])
+    return re.compile(rf"(?:^|[\\/])(?:{alternatives})(?:[\\/]|$)")
+
+
+SKIP_RE = skip_pattern()
+
+
+def path_prefix(root) -> str:
+    """Prefix p with p + rel == str(Path(root) / rel), for joining without Path objects."""
+    base = str(Path(root))
+    if base == ".":
+        return ""
+    return base if base.endswith(os.sep) else base + os.sep
+
+
+def walk(root: str, skip: frozenset = SKIP_DIRS, recursive: bool = True) -> Iterator[tuple[str, str]]:
+    """Yield (path, relpath) for files under root using os.scandir.
+
+    Hidden entries and skip dirs are pruned at descent time, so skipped
+    subtrees are never listed. DirEntry caches the type, so no extra stat.
+    """
+    stack = [(root, "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            for entry in it:
+                name = entry.name
+                if name.startswith('.'):
+                    continue
+                rel = os.path.join(rel_dir, name) if rel_dir else name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and name not in skip:
+                            subdirs.append((entry.path, rel))
+                    elif entry.is_file():
+                        yield entry.path, rel
+                except OSError:
+                    continue
+        stack.extend(reversed(subdirs))
+
+
+def iter_files(
+    root: str,
+    exts: Optional[Iterable[str]] = None,
+    skip: frozenset = SKIP_DIRS
+) -> Iterator[tuple[str, str]]:
+    """Yield (path, relpath) for files under root ending in one of exts (all if None)."""
+    if exts is None:
+        yield from walk(str(root), skip)
+        return
+    suffixes = tuple(exts)
+    for path, rel in walk(str(root), skip):
+        if path.endswith(suffixes):
+            yield path, rel
+
+
+def iter_glob(root: str, file_glob: str, skip: frozenset = SKIP_DIRS) -> Iterator[tuple[str, str]]:
+    """Yield (path, relpath) for files matching file_glob under root.
+
+    Simple globs ('*.py', '**/*.py', '**/*') are matched by name with a
+    compiled fnmatch regex during an os.scandir walk; anything with
+    directory components falls back to Path.glob.
+    """
+    if file_glob.startswith("**/"):
+        name_glob, recursive = file_glob[3:], True
+    else:
+        name_glob, recursive = file_glob, False
+
+    if "/" in name_glob or "**" in name_glob:
+        base = Path(root)
+        skip_re = SKIP_RE if skip is SKIP_DIRS else skip_pattern(skip)
+        for fp in base.glob(file_glob):
+            rel = str(fp.relative_to(base))
+            if skip_re.search(rel):
+                continue
+            if fp.is_file():
+                yield str(fp), rel
+        return
+
+    match = None if name_glob == "*" else re.compile(fnmatch.translate(name_glob)).match
+    for path, rel in walk(str(root), skip, recursive=recursive):
+        if match is None or match(os.path.basename(rel)):
+            yield path, rel
@@ -0,0 +1,51 @@
+"""Shared process pool for scans that threads cannot speed up.
+
+One pool serves every caller, started on first use and shut down at exit.
+Workers come from a forkserver (spawn where that is unavailable), never a
+plain fork: the MCP server runs threads (asyncio.to_thread, sqlite), and a
+child forked while one of them holds a lock deadlocks instead of crashing,
+which the pool cannot detect.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+MAX_WORKERS = 8
+
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The shared pool (min(MAX_WORKERS, CPUs) workers), started on first use."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                min(MAX_WORKERS, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context(_START_METHOD),
+            )
+        return _pool
+
+
+def discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next get_pool() starts a fresh one."""
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def _shutdown() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
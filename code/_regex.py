@@ -0,0 +1,35 @@
+"""Regex engine selection for bulk code search.
+
+Uses Google RE2 (linear-time DFA, no catastrophic backtracking) when the
+optional ``google-re2`` package is installed, and the stdlib ``re`` module
+otherwise or for patterns RE2 cannot express (backreferences, lookarounds).
+"""
+import re
+
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
+ENGINE = "re2" if _re2 is not None else "re"
+
+# Flags RE2 understands, as inline modifiers
+_INLINE_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+_INLINE_MASK = re.IGNORECASE | re.MULTILINE | re.DOTALL
+
+
+def compile_pattern(pattern: str, flags: int = 0):
+    """Compile pattern with the fastest available engine.
+
+    Always validates with ``re`` first so invalid patterns raise ``re.error``
+    regardless of engine. Note that RE2's ``\\w``/``\\b`` are ASCII-only.
+    """
+    compiled = re.compile(pattern, flags)
+    if _re2 is None or flags & ~_INLINE_MASK & ~re.UNICODE:
+        return compiled
+    inline = "".join(ch for flag, ch in _INLINE_FLAGS if flags & flag)
+    try:
+        return _re2.compile(f"(?{inline}){pattern}" if inline else pattern)
+    except Exception:
+        # Unsupported by RE2 (backreference, lookaround, ...)
+        return compiled
@@ -0,0 +1,50 @@
+"""Compact symbol records shared by the tree-sitter and Python AST extractors."""
+from typing import Optional
+
+
+class Symbol:
+    """A symbol definition.
+
+    Extractors and caches keep these slot-based records (much smaller than
+    dicts); callers get the public dict form from to_dict().
+    """
+
+    __slots__ = ("name", "kind", "lineno", "end_lineno", "column", "name_path", "language", "body", "children")
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        lineno: int,
+        end_lineno: int,
+        name_path: str,
+        language: str,
+        column: Optional[int] = None,
+        body: Optional[str] = None,
+        children: Optional[list["Symbol"]] = None
+    ):
+        self.name = name
+        self.kind = kind
+        self.lineno = lineno
+        self.end_lineno = end_lineno
+        self.column = column
+        self.name_path = name_path
+        self.language = language
+        self.body = body
+        self.children = children
+
+    def to_dict(self) -> dict:
+        """Public dict form; unset column/body and empty children are omitted."""
+        d = {"name": self.name, "kind": self.kind, "lineno": self.lineno, "end_lineno": self.end_lineno}
+        if self.column is not None:
+            d["column"] = self.column
+        d["name_path"] = self.name_path
+        d["language"] = self.language
+        if self.body is not None:
+            d["body"] = self.body
+        if self.children:
+            d["children"] = [child.to_dict() for child in self.children]
+        return d
+
+    def __repr__(self) -> str:
+        return f"Symbol({self.kind} {self.name_path!r} @ {self.lineno}-{self.end_lineno})"
@@ -0,0 +1,178 @@
+"""Persistent SQLite FTS5 index of source files.
+
+The index is a candidate prefilter for search_pattern / find_references: a
+file whose indexed contents lack the query's required literal, and which has
+not changed since it was indexed, is skipped without being read. Files that
+are new, modified or not indexed (binary, too large) are always scanned, so
+results never depend on how fresh the index is.
+
+Build or refresh it with ``build_index(root)`` or
+``python -m code.index <project_root>``.
+"""
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from ._fswalk import iter_files
+
+DB_PATH = Path(os.getenv("AUGMENT_DB_DIR", "./data")) / "code_index.sqlite"
+
+# Larger files are tracked but not indexed (always scanned)
+_MAX_INDEX_BYTES = 2 * 1024 * 1024
+# The trigram tokenizer cannot match needles shorter than this
+_MIN_LITERAL = 3
+
+
+def _connect(db: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS src_files (
+        id INTEGER PRIMARY KEY,
+        root TEXT NOT NULL,
+        path TEXT NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        indexed INTEGER NOT NULL,
+        UNIQUE (root, path)
+    )""")
+    # rowid = src_files.id; trigram gives case-insensitive substring matching
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS src_fts USING fts5(body, tokenize='trigram')")
+    return conn
+
+
+def _root_key(root: Union[str, Path]) -> str:
+    return str(Path(root).resolve())
+
+
+def build_index(root: Union[str, Path], db: Optional[Union[str, Path]] = None) -> dict:
+    """Index (or incrementally refresh) all non-hidden files under root.
+
+    Only files whose (mtime, size) changed are re-read; everything is
+    written in a single transaction.
+
+    Returns:
+        Counts of indexed, unchanged and removed files
+    """
+    root_key = _root_key(root)
+    db = Path(db) if db else DB_PATH
+    db.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = _connect(db)
+    try:
+        known = {
+            path: (file_id, mtime_ns, size)
+            for file_id, path, mtime_ns, size in conn.execute(
+                "SELECT id, path, mtime_ns, size FROM src_files WHERE root=?", (root_key,)
+            )
+        }
+        seen = set()
+        indexed = unchanged = 0
+
+        with conn:
+            for path, rel in iter_files(root_key):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(rel)
+
+                old = known.get(rel)
+                if old is not None:
+                    if old[1] == st.st_mtime_ns and old[2] == st.st_size:
+                        unchanged += 1
+                        continue
+                    conn.execute("DELETE FROM src_fts WHERE rowid=?", (old[0],))
+                    conn.execute("DELETE FROM src_files WHERE id=?", (old[0],))
+
+                body = None
+                if st.st_size <= _MAX_INDEX_BYTES:
+                    try:
+                        with open(path, 'rb') as f:
+                            body = f.read().decode("utf-8")
+                    except (OSError, UnicodeDecodeError):
+                        body = None
+
+                cur = conn.execute(
+                    "INSERT INTO src_files(root, path, mtime_ns, size, indexed) VALUES (?, ?, ?, ?, ?)",
+                    (root_key, rel, st.st_mtime_ns, st.st_size, body is not None),
+                )
+                if body is not None:
+                    conn.execute("INSERT INTO src_fts(rowid, body) VALUES (?, ?)", (cur.lastrowid, body))
+                    indexed += 1
+
+            removed = [file_id for rel, (file_id, _, _) in known.items() if rel not in seen]
+            conn.executemany("DELETE FROM src_fts WHERE rowid=?", ((i,) for i in removed))
+            conn.executemany("DELETE FROM src_files WHERE id=?", ((i,) for i in removed))
+    finally:
+        conn.close()
+
+    return {"root": root_key, "indexed": indexed, "unchanged": unchanged, "removed": len(removed)}
+
+
+def filter_candidates(
+    root: Union[str, Path],
+    files: Iterable[tuple[str, str]],
+    literal: Optional[str],
+    db: Optional[Union[str, Path]] = None
+) -> Iterable[tuple[str, str]]:
+    """Drop (path, relpath) pairs the index proves cannot contain literal.
+
+    literal must occur verbatim (case-sensitively) in every matching file.
+    Returns files unchanged when there is no usable index or literal.
+    """
+    if not literal or len(literal) < _MIN_LITERAL:
+        return files
+    db = Path(db) if db else DB_PATH
+    if not db.exists():
+        return files
+
+    root_key = _root_key(root)
+    try:
+        conn = sqlite3.connect(f"{db.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            indexed = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in conn.execute(
+                    "SELECT path, mtime_ns, size FROM src_files WHERE root=? AND indexed=1", (root_key,)
+                )
+            }
+            if not indexed:
+                return files
+            phrase = '"' + literal.replace('"', '""') + '"'
+            hits = {
+                row[0] for row in conn.execute(
+                    "SELECT f.path FROM src_fts JOIN src_files f ON f.id = src_fts.rowid "
+                    "WHERE src_fts MATCH ? AND f.root=?",
+                    (phrase, root_key),
+                )
+            }
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return files
+
+    return _iter_candidates(files, indexed, hits)
+
+
+def _iter_candidates(files, indexed: dict, hits: set) -> Iterator[tuple[str, str]]:
+    for path, rel in files:
+        if rel in hits:
+            yield path, rel
+            continue
+        known = indexed.get(rel)
+        if known is None:
+            yield path, rel  # not indexed: must scan
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if (st.st_mtime_ns, st.st_size) != known:
+            yield path, rel  # changed since indexing
+
+
+if __name__ == "__main__":
+    import sys
+    print(build_index(sys.argv[1] if len(sys.argv) > 1 else "."))
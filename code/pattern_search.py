@@ -1,9 +1,186 @@
 """Regex pattern search (complements semantic search)."""
+import mmap
+import os
 import re
-import fnmatch
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Optional
 
+from ._fswalk import iter_glob
+from ._pool import MAX_WORKERS, discard_pool, get_pool
+from ._regex import ENGINE, compile_pattern
+from .index import filter_candidates
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+# Shard the scan across workers only when it is big enough to pay for them
+_PARALLEL_MIN_FILES = 256
+_PARALLEL_MIN_RESULTS = 20
+_MAX_WORKERS = MAX_WORKERS
+
+# Files at least this large are memory-mapped and prescreened in place
+_MMAP_MIN_BYTES = 1 << 20
+
+
+# Constructs whose result depends on text beyond the current line; patterns
+# using them are matched line by line instead of over the whole buffer.
+_LINE_UNSAFE_TOKENS = ('(?!', '(?<', '\\A', '\\Z')
+# Line breaks recognised by str.splitlines() other than '\n'
+_EXTRA_LINE_BREAKS = re.compile('[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]')
+
+
+def _required_literal(pattern: str, flags: int) -> Optional[str]:
+    """Longest run of literal characters every match must contain, if any.
+
+    Only top-level literals count (anything inside a group, branch or
+    repeat may be skipped). Case-insensitive patterns return None.
+    """
+    if flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except (re.error, RecursionError):
+        return None
+    if parsed.state.flags & re.IGNORECASE:  # inline (?i)
+        return None
+
+    best, run = "", []
+    for op, av in parsed:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    if len(run) > len(best):
+        best = "".join(run)
+    return best or None
+
+
+def _compile_buffer_regex(pattern: str, flags: int):
+    """Compile pattern for whole-buffer scanning, or None if it is not line-safe."""
+    if any(tok in pattern for tok in _LINE_UNSAFE_TOKENS):
+        return None
+    return compile_pattern(pattern, flags | re.MULTILINE)
+
+
+def _iter_line_matches(regex, buf_regex, content: str):
+    """Yield (lineno, line, match) for the first match on each matching line.
+
+    Runs buf_regex over the whole buffer to jump straight to candidate lines
+    (line numbers come from C-level str.count), then confirms each candidate
+    with regex on that line alone so results equal a per-line search.
+    """
+    if buf_regex is None or _EXTRA_LINE_BREAKS.search(content):
+        for i, line in enumerate(content.splitlines(), start=1):
+            match = regex.search(line)
+            if match:
+                yield i, line, match
+        return
+
+    search = buf_regex.search
+    n = len(content)
+    pos = 0
+    lineno = 1
+    counted = 0
+    while pos < n:
+        m = search(content, pos)
+        if m is None:
+            return
+        start = m.start()
+        if start == n and content[-1] == '\n':
+            return  # empty match after the final newline is not a line
+        lineno += content.count('\n', counted, start)
+        counted = start
+        line_start = content.rfind('\n', 0, start) + 1
+        line_end = content.find('\n', start)
+        if line_end == -1:
+            line_end = n
+        line = content[line_start:line_end]
+        match = regex.search(line)
+        if match:
+            yield lineno, line, match
+        pos = line_end + 1
+
+
+def _read_text(fp: str, needle: Optional[bytes]) -> Optional[str]:
+    """Read fp as UTF-8, or None if unreadable or it cannot contain needle.
+
+    The needle is checked on raw bytes before decoding; files above
+    _MMAP_MIN_BYTES are memory-mapped so non-matching ones are never copied.
+    """
+    with open(fp, 'rb') as f:
+        if needle is not None and os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(needle) == -1:
+                    return None
+                data = mm[:]
+        else:
+            data = f.read()
+            if needle is not None and needle not in data:
+                return None
+    return data.decode("utf-8")
+
+
+def _scan_files(files, regex, buf_regex, context_lines: int, max_results: int,
+                deadline: Optional[float], needle: Optional[bytes] = None) -> list[dict]:
+    """Scan (path, relpath) pairs in order, returning up to max_results matches.
+
+    needle, if given, is UTF-8 text every match must contain.
+    """
+    results = []
+    for fp, rel in files:
+        if deadline is not None and time.monotonic() > deadline:
+            break
+
+        try:
+            content = _read_text(fp, needle)
+        except (UnicodeDecodeError, OSError, ValueError):
+            continue
+        if content is None:
+            continue
+
+        lines = None  # split only once the file has a hit
+        for i, line, match in _iter_line_matches(regex, buf_regex, content):
+            if lines is None:
+                lines = content.splitlines()
+            start = max(0, i - 1 - context_lines)
+            end = min(len(lines), i + context_lines)
+            context = lines[start:end]
+
+            results.append({
+                "file": rel,
+                "line": i,
+                "column": match.start() + 1,
+                "match": match.group(),
+                "text": line.strip(),
+                "context": "\n".join(context),
+            })
+
+            if len(results) >= max_results:
+                return results
+
+    return results
+
+
+def _scan_chunk(pattern: str, flags: int, files: list, context_lines: int,
+                max_results: int, deadline: Optional[float]) -> list[dict]:
+    """Process-pool entry point: compile in the worker and scan one shard."""
+    regex = compile_pattern(pattern, flags)
+    buf_regex = _compile_buffer_regex(pattern, flags)
+    return _scan_files(files, regex, buf_regex, context_lines, max_results, deadline,
+                       _needle(pattern, flags))
+
+
+def _needle(pattern: str, flags: int) -> Optional[bytes]:
+    literal = _required_literal(pattern, flags)
+    return literal.encode("utf-8") if literal else None
+
 
 def search_pattern(
     pattern: str,
@@ -11,10 +188,13 @@ def search_pattern(
     file_glob: str = "**/*",
     context_lines: int = 2,
     max_results: int = 50,
-    case_sensitive: bool = True
+    case_sensitive: bool = True,
+    timeout_s: Optional[float] = None
 ) -> list[dict]:
     """Search files using regex pattern.
 
+    Uses RE2 when installed (linear time), falling back to ``re``.
+
     Args:
         pattern: Regex pattern to search
         project_root: Root directory
@@ -22,16 +202,18 @@ def search_pattern(
         context_lines: Lines of context around matches
         max_results: Maximum results
         case_sensitive: Case-sensitive search
+        timeout_s: Stop scanning after this many seconds and return the
+            matches found so far (None = no limit)
 
     Returns:
         List of matches with file, line, context
     """
-    results = []
     root = Path(project_root)
 
     flags = 0 if case_sensitive else re.IGNORECASE
     try:
-        regex = re.compile(pattern, flags)
+        regex = compile_pattern(pattern, flags)
+        buf_regex = _compile_buffer_regex(pattern, flags)
     except re.error as e:
         return [{"error": f"Invalid regex: {e}"}]
 
@@ -43,45 +225,53 @@ def search_pattern(
         '.md', '.txt', '.rst', '.sql', '.graphql', '.proto'
     }
 
-    for fp in root.glob(file_glob):
-        if not fp.is_file():
-            continue
-        # Skip binary and system directories
-        if any(part.startswith('.') or part in ('__pycache__', 'node_modules', 'venv', '.venv', 'dist', 'build')
-               for part in fp.parts):
-            continue
-        # Skip non-text files unless glob is specific
-        if '.' in file_glob:
-            pass  # User specified extension
-        elif fp.suffix.lower() not in text_extensions:
-            continue
+    check_ext = '.' not in file_glob  # Skip non-text files unless glob is specific
+    deadline = time.monotonic() + timeout_s if timeout_s is not None else None
 
-        try:
-            content = fp.read_text(encoding="utf-8")
-            lines = content.splitlines()
-        except (UnicodeDecodeError, PermissionError):
-            continue
+    files = (
+        (fp, rel) for fp, rel in iter_glob(str(root), file_glob)
+        if not check_ext or os.path.splitext(fp)[1].lower() in text_extensions
+    )
+    # With a persistent index, skip unchanged files lacking a required literal
+    literal = _required_literal(pattern, flags)
+    files = filter_candidates(root, files, literal)
+    needle = literal.encode("utf-8") if literal else None
+    workers = min(_MAX_WORKERS, os.cpu_count() or 1)
+    if workers < 2 or max_results < _PARALLEL_MIN_RESULTS:
+        return _scan_files(files, regex, buf_regex, context_lines, max_results, deadline, needle)
 
-        for i, line in enumerate(lines, start=1):
-            match = regex.search(line)
-            if match:
-                start = max(0, i - 1 - context_lines)
-                end = min(len(lines), i + context_lines)
-                context = lines[start:end]
-
-                results.append({
-                    "file": str(fp.relative_to(root)),
-                    "line": i,
-                    "column": match.start() + 1,
-                    "match": match.group(),
-                    "text": line.strip(),
-                    "context": "\n".join(context),
-                })
-
-                if len(results) >= max_results:
-                    return results
+    files = list(files)
+    if len(files) < _PARALLEL_MIN_FILES:
+        return _scan_files(files, regex, buf_regex, context_lines, max_results, deadline, needle)
 
-    return results
+    # Contiguous shards so concatenating them keeps sequential file order
+    size = -(-len(files) // workers)
+    chunks = [files[i:i + size] for i in range(0, len(files), size)]
+    try:
+        if ENGINE == "re2":
+            # RE2 releases the GIL while matching; threads are enough
+            with ThreadPoolExecutor(len(chunks)) as pool:
+                parts = pool.map(
+                    lambda chunk: _scan_files(chunk, regex, buf_regex, context_lines, max_results, deadline, needle),
+                    chunks,
+                )
+                results = [r for part in parts for r in part]
+        else:
+            n = len(chunks)
+            pool = get_pool()
+            try:
+                parts = pool.map(
+                    _scan_chunk, [pattern] * n, [flags] * n, chunks,
+                    [context_lines] * n, [max_results] * n, [deadline] * n,
+                )
+                results = [r for part in parts for r in part]
+            except BrokenProcessPool:
+                discard_pool(pool)
+                raise
+    except (OSError, BrokenProcessPool):
+        return _scan_files(files, regex, buf_regex, context_lines, max_results, deadline, needle)
+
+    return results[:max_results]
 
 
 def search_and_replace_preview(
@@ -111,16 +301,11 @@ def search_and_replace_preview(
     except re.error as e:
         return [{"error": f"Invalid regex: {e}"}]
 
-    for fp in root.glob(file_glob):
-        if not fp.is_file():
-            continue
-        if any(part.startswith('.') or part in ('__pycache__', 'node_modules', 'venv', '.venv')
-               for part in fp.parts):
-            continue
-
+    for fp, rel in iter_glob(str(root), file_glob):
         try:
-            lines = fp.read_text(encoding="utf-8").splitlines()
-        except (UnicodeDecodeError, PermissionError):
+            with open(fp, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except (UnicodeDecodeError, OSError):
             continue
 
         for i, line in enumerate(lines, start=1):
@@ -128,7 +313,7 @@ def search_and_replace_preview(
                 new_line = regex.sub(replacement, line)
                 if new_line != line:
                     results.append({
-                        "file": str(fp.relative_to(root)),
+                        "file": rel,
                         "line": i,
                         "before": line,
                         "after": new_line,
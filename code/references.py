@@ -1,12 +1,20 @@
 """Find symbol references across codebase using Tree-sitter AST."""
+import functools
+import os
 import re
+import stat
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
+
+from ._fswalk import iter_files, iter_glob, path_prefix
+from ._regex import compile_pattern
+from .index import filter_candidates
 
 # Try to import tree-sitter parser
 try:
     from .tree_sitter_parser import (
-        parse_file, detect_language, find_references_in_tree,
+        get_parser, detect_language, find_references_in_tree,
         supported_extensions, EXT_TO_LANG
     )
     TREE_SITTER_AVAILABLE = True
@@ -18,12 +26,36 @@ except ImportError:
         return [".py"]
 
 
+@functools.lru_cache(maxsize=2048)
+def _parse_cached(path: str, mtime_ns: int, size: int):
+    """Parse a file once per (path, mtime, size).
+
+    Returns (tree, source bytes); tree is None if the language has no parser.
+    Repeated symbol searches over an unchanged tree only re-walk the AST.
+    """
+    with open(path, 'rb') as f:
+        source = f.read()
+    lang = detect_language(path)
+    parser = get_parser(lang) if lang else None
+    try:
+        tree = parser.parse(source) if parser else None
+    except Exception:
+        tree = None
+    return tree, source
+
+
+def clear_parse_cache() -> None:
+    """Drop all cached parse trees (e.g. after a bulk checkout)."""
+    _parse_cached.cache_clear()
+
+
 def find_references(
     symbol: str,
     project_root: str,
     file_glob: Optional[str] = None,
     context_lines: int = 2,
-    max_results: int = 50
+    max_results: int = 50,
+    timeout_s: Optional[float] = None
 ) -> list[dict]:
     """Find all references to a symbol in the codebase.
 
@@ -36,43 +68,71 @@ def find_references(
         file_glob: Optional glob pattern (e.g., "**/*.py"). Auto-detected if None.
         context_lines: Lines of context around each match
         max_results: Maximum results to return
+        timeout_s: Stop scanning after this many seconds and return the
+            references found so far (None = no limit)
 
     Returns:
         List of reference locations with context
     """
-    results = []
     root = Path(project_root)
+    deadline = time.monotonic() + timeout_s if timeout_s is not None else None
 
-    # Determine files to search
+    # Determine files to search (hidden and non-code directories are pruned)
     if file_glob:
-        files = list(root.glob(file_glob))
+        files = iter_glob(str(root), file_glob)
     else:
-        # Search all supported extensions
-        files = []
-        extensions = supported_extensions() if TREE_SITTER_AVAILABLE else [".py"]
-        for ext in extensions:
-            files.extend(root.rglob(f"*{ext}"))
-
-    for fp in files:
-        if not fp.is_file():
+        files = iter_files(str(root), _search_extensions())
+    files = filter_candidates(root, files, symbol)
+
+    return _find_references(symbol, files, context_lines, max_results, deadline)
+
+
+def _search_extensions() -> list[str]:
+    """Extensions searched when no file_glob is given."""
+    return supported_extensions() if TREE_SITTER_AVAILABLE else [".py"]
+
+
+def _find_references(
+    symbol: str,
+    files: Iterable[tuple[str, str]],
+    context_lines: int,
+    max_results: int,
+    deadline: Optional[float] = None
+) -> list[dict]:
+    """find_references over pre-collected (path, relpath) pairs."""
+    results = []
+    pattern = compile_pattern(rf'\b{re.escape(symbol)}\b')
+    needle = symbol.encode("utf-8")
+
+    for fp, rel in files:
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        try:
+            st = os.stat(fp)
+        except OSError:
             continue
-        # Skip common non-code directories
-        if any(part.startswith('.') or part in ('__pycache__', 'node_modules', 'venv', '.venv', 'dist', 'build')
-               for part in fp.parts):
+        if not stat.S_ISREG(st.st_mode):
             continue
 
         try:
-            source = fp.read_bytes()
-            source_text = source.decode("utf-8", errors="replace")
-            source_lines = source_text.splitlines()
-        except (UnicodeDecodeError, PermissionError):
+            with open(fp, 'rb') as f:
+                source = f.read()
+        except OSError:
             continue
+        # Cheap C-level substring prescreen: most files never mention the symbol
+        if needle not in source:
+            continue
+        source_text = source.decode("utf-8", errors="replace")
+        source_lines = source_text.splitlines()
 
         # Try Tree-sitter AST-based search first
         if TREE_SITTER_AVAILABLE:
-            lang = detect_language(str(fp))
+            lang = detect_language(fp)
             if lang:
-                tree = parse_file(str(fp))
+                try:
+                    tree, source = _parse_cached(fp, st.st_mtime_ns, st.st_size)
+                except OSError:
+                    tree = None
                 if tree:
                     refs = find_references_in_tree(tree, source, symbol, lang)
                     for ref in refs:
@@ -82,7 +142,7 @@ def find_references(
                         context = source_lines[start:end]
 
                         results.append({
-                            "file": str(fp.relative_to(root)),
+                            "file": rel,
                             "line": ref["line"],
                             "column": ref["column"],
                             "text": ref["text"].strip(),
@@ -97,7 +157,6 @@ def find_references(
                     continue  # Move to next file
 
         # Fallback: regex search
-        pattern = re.compile(rf'\b{re.escape(symbol)}\b')
         for i, line in enumerate(source_lines, start=1):
             if pattern.search(line):
                 start = max(0, i - 1 - context_lines)
@@ -105,12 +164,12 @@ def find_references(
                 context = source_lines[start:end]
 
                 results.append({
-                    "file": str(fp.relative_to(root)),
+                    "file": rel,
                     "line": i,
                     "column": line.find(symbol) + 1,
                     "text": line.strip(),
                     "context": "\n".join(context),
-                    "language": detect_language(str(fp)) if TREE_SITTER_AVAILABLE else "unknown",
+                    "language": detect_language(fp) if TREE_SITTER_AVAILABLE else "unknown",
                     "method": "regex",
                 })
 
@@ -123,7 +182,8 @@ def find_references(
 def find_imports(
     symbol: str,
     project_root: str,
-    max_results: int = 20
+    max_results: int = 20,
+    timeout_s: Optional[float] = None
 ) -> list[dict]:
     """Find import statements for a symbol.
 
@@ -131,50 +191,64 @@ def find_imports(
         symbol: Symbol name (module, class, function)
         project_root: Root directory to search
         max_results: Maximum results
+        timeout_s: Stop scanning after this many seconds (None = no limit)
 
     Returns:
         List of import locations
     """
-    results = []
     root = Path(project_root)
+    deadline = time.monotonic() + timeout_s if timeout_s is not None else None
+    files = iter_files(str(root), _search_extensions())
+    return _find_imports(symbol, files, max_results, deadline)
 
-    # Import patterns (Python-focused, but works for JS/TS too)
-    patterns = [
-        re.compile(rf'^import\s+.*\b{re.escape(symbol)}\b'),
-        re.compile(rf'^from\s+.*\bimport\s+.*\b{re.escape(symbol)}\b'),
-        re.compile(rf'require\s*\(\s*[\'"].*{re.escape(symbol)}.*[\'"]\s*\)'),  # JS require
-        re.compile(rf'from\s+[\'"].*{re.escape(symbol)}.*[\'"]\s*import'),  # JS/TS import
-    ]
 
-    extensions = supported_extensions() if TREE_SITTER_AVAILABLE else [".py"]
+def _find_imports(
+    symbol: str,
+    files: Iterable[tuple[str, str]],
+    max_results: int,
+    deadline: Optional[float] = None
+) -> list[dict]:
+    """find_imports over pre-collected (path, relpath) pairs."""
+    results = []
 
-    for ext in extensions:
-        for fp in root.rglob(f"*{ext}"):
-            if not fp.is_file():
-                continue
-            if any(part.startswith('.') or part in ('__pycache__', 'node_modules', 'venv', '.venv')
-                   for part in fp.parts):
-                continue
+    # Import patterns (Python-focused, but works for JS/TS too), matched at
+    # line start as a single alternation so each line is scanned once
+    esc = re.escape(symbol)
+    import_re = compile_pattern(
+        rf'(?:import\s+.*\b{esc}\b'
+        rf'|from\s+.*\bimport\s+.*\b{esc}\b'
+        rf'|require\s*\(\s*[\'"].*{esc}.*[\'"]\s*\)'  # JS require
+        rf'|from\s+[\'"].*{esc}.*[\'"]\s*import)'  # JS/TS import
+    )
 
-            try:
-                lines = fp.read_text(encoding="utf-8").splitlines()
-            except (UnicodeDecodeError, PermissionError):
+    needle = symbol.encode("utf-8")
+
+    for fp, rel in files:
+        if deadline is not None and time.monotonic() > deadline:
+            return results
+
+        try:
+            with open(fp, 'rb') as f:
+                source = f.read()
+            # Every import pattern needs the symbol plus an import keyword
+            if needle not in source or (b'import' not in source and b'require' not in source):
                 continue
+            lines = source.decode("utf-8").splitlines()
+        except (UnicodeDecodeError, OSError):
+            continue
 
-            for i, line in enumerate(lines, start=1):
-                stripped = line.strip()
-                for pattern in patterns:
-                    if pattern.match(stripped):
-                        results.append({
-                            "file": str(fp.relative_to(root)),
-                            "line": i,
-                            "text": stripped,
-                            "type": "import",
-                            "language": detect_language(str(fp)) if TREE_SITTER_AVAILABLE else "unknown",
-                        })
-                        if len(results) >= max_results:
-                            return results
-                        break
+        for i, line in enumerate(lines, start=1):
+            stripped = line.strip()
+            if import_re.match(stripped):
+                results.append({
+                    "file": rel,
+                    "line": i,
+                    "text": stripped,
+                    "type": "import",
+                    "language": detect_language(fp) if TREE_SITTER_AVAILABLE else "unknown",
+                })
+                if len(results) >= max_results:
+                    return results
 
     return results
 
@@ -196,15 +270,22 @@ def find_usages(
     Returns:
         Dict with 'imports', 'references', and optionally 'definitions'
     """
+    # Walk the tree once and share the file list across all sub-searches
+    root = Path(project_root)
+    files = list(filter_candidates(root, iter_files(str(root), _search_extensions()), symbol))
+
     result = {
         "symbol": symbol,
-        "imports": find_imports(symbol, project_root, max_results=max_results),
-        "references": find_references(symbol, project_root, max_results=max_results),
+        "imports": _find_imports(symbol, files, max_results),
+        "references": _find_references(symbol, files, 2, max_results),
     }
 
     if include_definitions:
-        from .symbols import find_symbol
-        result["definitions"] = find_symbol(symbol, project_root=project_root, max_results=max_results)
+        from .symbols import _find_symbol
+        prefix = path_prefix(root)
+        result["definitions"] = _find_symbol(
+            symbol, (prefix + rel for _, rel in files), include_body=True, max_results=max_results
+        )
 
     # Add summary
     result["summary"] = {
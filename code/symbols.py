@@ -1,12 +1,25 @@
 """Multi-language symbol extraction using Tree-sitter (with Python AST fallback)."""
 import ast
+import bisect
+import io
+import os
+import stat
+import tokenize
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
+
+from . import symbols_cache
+from ._fswalk import SKIP_RE, iter_files, path_prefix
+from ._pool import MAX_WORKERS, discard_pool, get_pool
+from ._symbol import Symbol
 
 # Try to import tree-sitter parser
 try:
     from .tree_sitter_parser import (
-        parse_file, detect_language, extract_symbols_from_tree,
+        get_parser, extract_symbols_from_tree, read_source,
         supported_extensions, EXT_TO_LANG
     )
     TREE_SITTER_AVAILABLE = True
@@ -18,10 +31,33 @@ except ImportError:
         return [".py"]
 
 
+# (path, depth, include_body) -> (mtime_ns, size, symbols); least recently used evicted first
+_SYMBOL_CACHE: OrderedDict[tuple[str, int, bool], tuple[int, int, list[Symbol]]] = OrderedDict()
+_SYMBOL_CACHE_MAX = 4096
+
+# path -> (symbols, end_linenos) for get_symbol_at_line, valid while the
+# symbol cache hands back the same list; end_linenos is None if unsorted
+_LINE_INDEX: dict[str, tuple[list[Symbol], Optional[list[int]]]] = {}
+_LINE_INDEX_MAX = 256
+
+# Shard find_symbol across workers only for scans big enough to pay for them
+_PARALLEL_MIN_FILES = 256
+_MAX_WORKERS = MAX_WORKERS
+
+
+def clear_symbol_cache(persistent: bool = False) -> None:
+    """Drop all memoized extract_symbols results (and the on-disk cache if persistent)."""
+    _SYMBOL_CACHE.clear()
+    _LINE_INDEX.clear()
+    if persistent:
+        symbols_cache.clear()
+
+
 def extract_symbols(
     file_path: str,
     depth: int = 2,
-    include_body: bool = False
+    include_body: bool = False,
+    source_bytes: Optional[bytes] = None
 ) -> list[dict]:
     """Extract symbols from a source file.
 
@@ -31,111 +67,170 @@ def extract_symbols(
         file_path: Path to source file
         depth: 1=top-level only, 2=include nested (class methods, etc.)
         include_body: Include source code body
+        source_bytes: File contents if the caller already read them
 
     Returns:
         List of symbol dicts with name, kind, lineno, language, etc.
+
+    Results are kept in an in-process LRU per (path, depth, include_body) and
+    reused while the file's mtime and size are unchanged; across processes
+    they are persisted by content hash in symbols_cache.
     """
-    path = Path(file_path)
-    if not path.exists():
+    return [sym.to_dict() for sym in _extract_symbols(file_path, depth, include_body, source_bytes)]
+
+
+def _extract_symbols(
+    file_path: str,
+    depth: int,
+    include_body: bool,
+    source_bytes: Optional[bytes] = None,
+    pending: Optional[list] = None,
+    st: Optional[os.stat_result] = None
+) -> list[Symbol]:
+    """extract_symbols as shared (read-only) Symbol records.
+
+    Persistent-cache writes go to pending if given; st is the file's stat
+    result if the caller already has it.
+    """
+    if st is None:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return []
+
+    key = (str(file_path), depth, include_body)
+    cached = _SYMBOL_CACHE.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        try:
+            _SYMBOL_CACHE.move_to_end(key)
+        except KeyError:
+            pass  # evicted by another thread meanwhile
+        return cached[2]
+
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext != ".py" and not (TREE_SITTER_AVAILABLE and ext in EXT_TO_LANG):
         return []
 
-    ext = path.suffix.lower()
+    abs_path = os.path.abspath(file_path)
+    try:
+        # Without contents in hand, hash the file without copying it: a cache
+        # hit then never needs the bytes at all
+        if source_bytes is None:
+            sha = symbols_cache.file_hash(file_path)
+        else:
+            sha = symbols_cache.content_hash(source_bytes)
+        symbols = symbols_cache.get(abs_path, sha, depth, include_body)
+        if symbols is None and source_bytes is None:
+            with open(file_path, 'rb') as f:
+                source_bytes = f.read()
+            sha = symbols_cache.content_hash(source_bytes)  # the bytes actually parsed
+    except OSError:
+        return []
+
+    if symbols is None:
+        symbols = _extract_symbols_uncached(file_path, depth, include_body, source_bytes)
+        row = (abs_path, sha, depth, include_body, symbols)
+        if pending is None:
+            symbols_cache.put(*row)
+        else:
+            pending.append(row)
+
+    _SYMBOL_CACHE[key] = (st.st_mtime_ns, st.st_size, symbols)
+    _SYMBOL_CACHE.move_to_end(key)
+    while len(_SYMBOL_CACHE) > _SYMBOL_CACHE_MAX:
+        try:
+            _SYMBOL_CACHE.popitem(last=False)
+        except KeyError:
+            break
+    return symbols
+
+
+def _extract_symbols_uncached(
+    file_path: str,
+    depth: int,
+    include_body: bool,
+    source_bytes: Optional[bytes] = None
+) -> list[Symbol]:
+    """Parse file_path (or its given contents) and extract symbols (no caching)."""
+    ext = os.path.splitext(file_path)[1].lower()
 
     # Try Tree-sitter first (multi-language)
-    if TREE_SITTER_AVAILABLE and ext in EXT_TO_LANG:
+    lang = EXT_TO_LANG.get(ext) if TREE_SITTER_AVAILABLE else None
+    if lang:
         try:
-            source = path.read_bytes()
-            tree = parse_file(file_path)
+            source = read_source(file_path) if source_bytes is None else source_bytes
+            parser = get_parser(lang)
+            tree = parser.parse(source) if parser else None
             if tree:
-                lang = detect_language(file_path)
                 return extract_symbols_from_tree(tree, source, lang, depth, include_body)
         except Exception:
             pass  # Fall through to Python AST
 
     # Fallback: Python AST for .py files
     if ext == ".py":
-        return _extract_python_ast(file_path, depth, include_body)
+        return _extract_python_ast(file_path, depth, include_body, source_bytes)
 
     return []
 
 
-def _extract_python_ast(file_path: str, depth: int, include_body: bool) -> list[dict]:
+def _extract_python_ast(
+    file_path: str,
+    depth: int,
+    include_body: bool,
+    source_bytes: Optional[bytes] = None
+) -> list[Symbol]:
     """Extract symbols from Python file using built-in AST (fallback)."""
-    path = Path(file_path)
+    if source_bytes is None:
+        with open(file_path, 'rb') as f:
+            source_bytes = f.read()
     try:
-        source = path.read_text(encoding="utf-8")
-        tree = ast.parse(source, filename=str(path))
-    except (SyntaxError, UnicodeDecodeError):
+        # ast.parse decodes bytes itself; text is only needed for bodies
+        tree = ast.parse(source_bytes, filename=str(file_path))
+    except SyntaxError:
         return []
 
-    source_lines = source.splitlines() if include_body else []
     symbols = []
+    spans = []  # symbols whose bodies are filled in after the walk
 
-    def get_body(start: int, end: int) -> str:
-        if not include_body or not source_lines:
-            return ""
-        return "\n".join(source_lines[start - 1:end])
+    def make(node: ast.AST, name: str, kind: str, name_path: str) -> Symbol:
+        sym = Symbol(name, kind, node.lineno, node.end_lineno or node.lineno, name_path, "python")
+        if include_body and kind != "variable":
+            spans.append(sym)
+        return sym
 
-    for node in ast.iter_child_nodes(tree):
+    # Single pass over module statements; only class bodies are descended
+    for node in tree.body:
         if isinstance(node, ast.ClassDef):
-            end_line = node.end_lineno or node.lineno
-            sym = {
-                "name": node.name,
-                "kind": "class",
-                "lineno": node.lineno,
-                "end_lineno": end_line,
-                "name_path": node.name,
-                "language": "python",
-            }
-            if include_body:
-                sym["body"] = get_body(node.lineno, end_line)
-
+            sym = make(node, node.name, "class", node.name)
             if depth >= 2:
-                children = []
-                for child in ast.iter_child_nodes(node):
-                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                        child_end = child.end_lineno or child.lineno
-                        child_sym = {
-                            "name": child.name,
-                            "kind": "method",
-                            "lineno": child.lineno,
-                            "end_lineno": child_end,
-                            "name_path": f"{node.name}/{child.name}",
-                            "language": "python",
-                        }
-                        if include_body:
-                            child_sym["body"] = get_body(child.lineno, child_end)
-                        children.append(child_sym)
+                children = [
+                    make(child, child.name, "method", f"{node.name}/{child.name}")
+                    for child in node.body
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+                ]
                 if children:
-                    sym["children"] = children
-
+                    sym.children = children
             symbols.append(sym)
 
         elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            end_line = node.end_lineno or node.lineno
-            sym = {
-                "name": node.name,
-                "kind": "function",
-                "lineno": node.lineno,
-                "end_lineno": end_line,
-                "name_path": node.name,
-                "language": "python",
-            }
-            if include_body:
-                sym["body"] = get_body(node.lineno, end_line)
-            symbols.append(sym)
+            symbols.append(make(node, node.name, "function", node.name))
 
         elif isinstance(node, ast.Assign):
             for target in node.targets:
                 if isinstance(target, ast.Name):
-                    symbols.append({
-                        "name": target.id,
-                        "kind": "variable",
-                        "lineno": node.lineno,
-                        "end_lineno": node.end_lineno or node.lineno,
-                        "name_path": target.id,
-                        "language": "python",
-                    })
+                    symbols.append(make(node, target.id, "variable", target.id))
+
+    if spans:
+        try:
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(source_bytes).readline)
+            source = source_bytes.decode(encoding)
+        except (SyntaxError, UnicodeDecodeError):
+            return []
+        if "\r" in source:  # universal newlines, as the parser saw them
+            source = source.replace("\r\n", "\n").replace("\r", "\n")
+        source_lines = source.splitlines()
+        for sym in spans:
+            sym.body = "\n".join(source_lines[sym.lineno - 1:sym.end_lineno])
 
     return symbols
 
@@ -159,68 +254,200 @@ def find_symbol(
     Returns:
         List of matching symbols with file path
     """
-    results = []
-    pattern_lower = pattern.lower()
-
     # Determine which extensions to search
     extensions = supported_extensions() if TREE_SITTER_AVAILABLE else [".py"]
 
     if file_path:
-        files = [Path(file_path)]
+        fp = str(Path(file_path))
+        if SKIP_RE.search(fp):
+            return []
+        files = [fp]
     elif project_root:
-        files = []
-        root = Path(project_root)
-        for ext in extensions:
-            files.extend(root.rglob(f"*{ext}"))
+        # Hidden and non-code directories are pruned during the walk; paths
+        # stay plain strings, spelled as str(Path(project_root) / rel)
+        prefix = path_prefix(project_root)
+        files = (prefix + rel for _, rel in iter_files(str(project_root), extensions))
     else:
         return []
 
+    return _find_symbol(pattern, files, include_body, max_results)
+
+
+def _find_symbol(
+    pattern: str,
+    files: Iterable[str],
+    include_body: bool = True,
+    max_results: int = 10
+) -> list[dict]:
+    """find_symbol over a pre-collected file list."""
+    workers = min(_MAX_WORKERS, os.cpu_count() or 1)
+    if workers >= 2:
+        files = list(files)
+        if len(files) >= _PARALLEL_MIN_FILES:
+            return _find_symbol_parallel(pattern, files, include_body, max_results, workers)
+
+    pending = []  # persistent-cache rows, written in one batch
+    try:
+        return _find_symbol_in(pattern, files, include_body, max_results, pending)
+    finally:
+        symbols_cache.put_many(pending)
+
+
+def _scan_chunk(pattern: str, files: list, include_body: bool, max_results: int) -> tuple[list, list]:
+    """Worker entry point: returns (matches, persistent-cache rows) for one shard."""
+    pending = []
+    return _find_symbol_in(pattern, files, include_body, max_results, pending), pending
+
+
+def _find_symbol_parallel(
+    pattern: str,
+    files: list,
+    include_body: bool,
+    max_results: int,
+    workers: int
+) -> list[dict]:
+    """Shard files across a pool; shards are contiguous so merged order is sequential."""
+    size = -(-len(files) // workers)
+    chunks = [files[i:i + size] for i in range(0, len(files), size)]
+    n = len(chunks)
+    args = ([pattern] * n, chunks, [include_body] * n, [max_results] * n)
+    try:
+        if TREE_SITTER_AVAILABLE:
+            # tree-sitter parses with the GIL released; threads are enough
+            with ThreadPoolExecutor(n) as pool:
+                parts = list(pool.map(_scan_chunk, *args))
+        else:
+            # The AST fallback holds the GIL: use the shared process pool
+            pool = get_pool()
+            try:
+                parts = list(pool.map(_scan_chunk, *args))
+            except BrokenProcessPool:
+                discard_pool(pool)
+                raise
+    except (OSError, BrokenProcessPool):
+        pending = []
+        try:
+            return _find_symbol_in(pattern, files, include_body, max_results, pending)
+        finally:
+            symbols_cache.put_many(pending)
+
+    symbols_cache.put_many(row for _, rows in parts for row in rows)
+    results = [sym for found, _ in parts for sym in found]
+    return results[:max_results]
+
+
+def _find_symbol_in(
+    pattern: str,
+    files: Iterable[str],
+    include_body: bool,
+    max_results: int,
+    pending: list
+) -> list[dict]:
+    """Scan files for symbols matching pattern, queueing cache rows in pending."""
+    results = []
+    pattern_lower = pattern.lower()
+    # A symbol name containing pattern must appear in the file's bytes. Only
+    # ASCII patterns are prescreened: bytes.lower() does not fold non-ASCII.
+    needle = pattern_lower.encode("ascii") if pattern.isascii() else None
+
     for fp in files:
-        if not fp.exists() or fp.is_dir():
+        # One stat per file, reused for the symbol cache check
+        try:
+            st = os.stat(fp)
+        except OSError:
             continue
-        # Skip common non-code directories
-        if any(part.startswith('.') or part in ('__pycache__', 'node_modules', 'venv', '.venv', 'dist', 'build')
-               for part in fp.parts):
+        if stat.S_ISDIR(st.st_mode):
             continue
 
-        symbols = extract_symbols(str(fp), depth=2, include_body=include_body)
+        source_bytes = None
+        if needle:
+            try:
+                with open(fp, 'rb') as f:
+                    source_bytes = f.read()
+            except OSError:
+                continue
+            if needle not in source_bytes.lower():
+                continue
+
+        symbols = _extract_symbols(fp, 2, include_body, source_bytes, pending, st)
 
         for sym in symbols:
-            name_lower = sym["name"].lower()
+            sym_dict = None  # converted only once something in it matches
+            name_lower = sym.name.lower()
             if pattern_lower in name_lower or name_lower.startswith(pattern_lower):
-                sym["file"] = str(fp)
-                results.append(sym)
+                sym_dict = sym.to_dict()
+                sym_dict["file"] = fp
+                results.append(sym_dict)
                 if len(results) >= max_results:
                     return results
 
             # Also check children (methods)
-            for child in sym.get("children", []):
-                child_name_lower = child["name"].lower()
+            for i, child in enumerate(sym.children or ()):
+                child_name_lower = child.name.lower()
                 if pattern_lower in child_name_lower or child_name_lower.startswith(pattern_lower):
-                    child["file"] = str(fp)
-                    child["parent"] = sym["name"]
-                    results.append(child)
+                    if sym_dict is None:
+                        sym_dict = sym.to_dict()
+                    child_dict = sym_dict["children"][i]
+                    child_dict["file"] = fp
+                    child_dict["parent"] = sym.name
+                    results.append(child_dict)
                     if len(results) >= max_results:
                         return results
 
     return results
 
 
+def read_symbol(file_path: str, symbol_name: str) -> Optional[dict]:
+    """Find a symbol (or method) by name or name_path, with its body.
+
+    Same match as scanning extract_symbols(depth=2, include_body=True), but
+    only the symbol returned is converted to a dict.
+    """
+    for sym in _extract_symbols(file_path, 2, True):
+        if sym.name == symbol_name or sym.name_path == symbol_name:
+            return sym.to_dict()
+        for child in sym.children or ():
+            if child.name == symbol_name or child.name_path == symbol_name:
+                return child.to_dict()
+    return None
+
+
 def get_symbol_at_line(file_path: str, line: int) -> Optional[dict]:
     """Get symbol definition containing a specific line."""
-    symbols = extract_symbols(file_path, depth=2, include_body=False)
-
-    def find_in_symbols(syms: list[dict]) -> Optional[dict]:
-        for sym in syms:
-            if sym["lineno"] <= line <= sym["end_lineno"]:
-                # Check children first (more specific)
-                for child in sym.get("children", []):
-                    if child["lineno"] <= line <= child["end_lineno"]:
-                        return child
-                return sym
-        return None
-
-    return find_in_symbols(symbols)
+    symbols = _extract_symbols(file_path, 2, False)
+    ends = _line_index(str(file_path), symbols)
+
+    if ends is not None:
+        # Top-level ranges do not nest, so starts and ends are both sorted: the
+        # first range ending at or after line is the only candidate
+        i = bisect.bisect_left(ends, line)
+        candidates = symbols[i:i + 1] if i < len(symbols) else ()
+    else:
+        candidates = symbols
+
+    for sym in candidates:
+        if sym.lineno <= line <= sym.end_lineno:
+            # Check children first (more specific)
+            for child in sym.children or ():
+                if child.lineno <= line <= child.end_lineno:
+                    return child.to_dict()
+            return sym.to_dict()
+    return None
+
+
+def _line_index(file_path: str, symbols: list[Symbol]) -> Optional[list[int]]:
+    """end_lineno of each top-level symbol, or None unless starts and ends are both sorted."""
+    entry = _LINE_INDEX.get(file_path)
+    if entry is not None and entry[0] is symbols:
+        return entry[1]
+
+    ends = [sym.end_lineno for sym in symbols]
+    ordered = all(a.lineno <= b.lineno for a, b in zip(symbols, symbols[1:])) and \
+        all(a <= b for a, b in zip(ends, ends[1:]))
+    if len(_LINE_INDEX) >= _LINE_INDEX_MAX:
+        _LINE_INDEX.pop(next(iter(_LINE_INDEX)), None)
+    _LINE_INDEX[file_path] = (symbols, ends if ordered else None)
+    return ends if ordered else None
 
 
 def get_supported_languages() -> list[str]:
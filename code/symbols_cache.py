@@ -0,0 +1,125 @@
+"""Persistent symbol cache for extract_symbols, keyed by file content hash.
+
+Rows are keyed by (path, sha256(content), depth, include_body), so edits
+invalidate entries naturally and a warm process start skips re-parsing
+unchanged files. Storage errors never propagate: the cache just misses.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+DB_PATH = Path(os.getenv("AUGMENT_DB_DIR", "./data")) / "symbols_cache.sqlite"
+# Bumped whenever the pickled symbol format changes; older tables are dropped
+_SCHEMA_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+_CONN = None
+_CONN_LOCK = threading.Lock()
+_CONN_PID = None
+# Single writer per process
+_WRITE_LOCK = threading.Lock()
+
+
+def _init_db():
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+        conn.execute("DROP TABLE IF EXISTS symbols")
+        conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+    conn.execute("""CREATE TABLE IF NOT EXISTS symbols (
+        path TEXT NOT NULL,
+        sha TEXT NOT NULL,
+        depth INTEGER NOT NULL,
+        include_body INTEGER NOT NULL,
+        symbols BLOB NOT NULL,
+        PRIMARY KEY (path, sha, depth, include_body)
+    )""")
+    return conn
+
+
+def _db():
+    global _CONN, _CONN_PID
+    # sqlite connections must not cross fork(): reopen in child processes
+    if _CONN is None or _CONN_PID != os.getpid():
+        with _CONN_LOCK:
+            if _CONN is None or _CONN_PID != os.getpid():
+                _CONN = _init_db()
+                _CONN_PID = os.getpid()
+    return _CONN
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """content_hash of a file, streamed through hashlib without reading it into memory."""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+, hashes with the GIL released
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def get(path: str, sha: str, depth: int, include_body: bool) -> Optional[list]:
+    """Return cached Symbol records for this exact file content, or None."""
+    try:
+        row = _db().execute(
+            "SELECT symbols FROM symbols WHERE path=? AND sha=? AND depth=? AND include_body=?",
+            (path, sha, depth, int(include_body)),
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+    except (sqlite3.Error, OSError, pickle.UnpicklingError) as e:
+        logger.debug(f"Symbol cache lookup failed: {e}")
+        return None
+
+
+def put_many(rows: Iterable[tuple[str, str, int, bool, list]]) -> None:
+    """Store (path, sha, depth, include_body, symbols) rows in one transaction.
+
+    Older content hashes for the same path are dropped.
+    """
+    rows = [
+        (path, sha, depth, int(include_body), pickle.dumps(symbols, protocol=5))
+        for path, sha, depth, include_body, symbols in rows
+    ]
+    if not rows:
+        return
+    try:
+        conn = _db()
+        with _WRITE_LOCK, conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "DELETE FROM symbols WHERE path=? AND sha<>?",
+                ((r[0], r[1]) for r in rows),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO symbols (path, sha, depth, include_body, symbols) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+    except (sqlite3.Error, OSError) as e:
+        logger.debug(f"Symbol cache write failed: {e}")
+
+
+def put(path: str, sha: str, depth: int, include_body: bool, symbols: list) -> None:
+    put_many([(path, sha, depth, include_body, symbols)])
+
+
+def clear() -> None:
+    """Delete every cached entry."""
+    try:
+        conn = _db()
+        with _WRITE_LOCK, conn:
+            conn.execute("DELETE FROM symbols")
+    except (sqlite3.Error, OSError) as e:
+        logger.debug(f"Symbol cache clear failed: {e}")
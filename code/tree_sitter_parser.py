@@ -1,10 +1,17 @@
 """Tree-sitter based multi-language AST parser."""
-from pathlib import Path
-from typing import Optional
+import importlib
+import mmap
+import os
+from typing import Optional, Union
 import tree_sitter
 
-# Language registry - lazy loaded
-_LANGUAGES: dict[str, tree_sitter.Language] = {}
+from ._symbol import Symbol
+
+# Files at least this large are parsed from a read-only memory map
+_MMAP_MIN_BYTES = 1 << 20
+
+# Language registry - lazy loaded (None: grammar package not installed)
+_LANGUAGES: dict[str, Optional[tree_sitter.Language]] = {}
 _PARSERS: dict[str, tree_sitter.Parser] = {}
 
 # File extension to language mapping
@@ -33,6 +40,22 @@ EXT_TO_LANG = {
     ".toml": "toml",
 }
 
+# Language -> (grammar module, function returning the language pointer)
+_LANGUAGE_MODULES = {
+    "python": ("tree_sitter_python", "language"),
+    "javascript": ("tree_sitter_javascript", "language"),
+    "typescript": ("tree_sitter_typescript", "language_typescript"),
+    "golang": ("tree_sitter_go", "language"),
+    "rust": ("tree_sitter_rust", "language"),
+    "bash": ("tree_sitter_bash", "language"),
+    "json": ("tree_sitter_json", "language"),
+    "yaml": ("tree_sitter_yaml", "language"),
+    "html": ("tree_sitter_html", "language"),
+    "css": ("tree_sitter_css", "language"),
+    "hcl": ("tree_sitter_hcl", "language"),
+    "toml": ("tree_sitter_toml", "language"),
+}
+
 # Symbol node types per language
 SYMBOL_TYPES = {
     "python": {
@@ -101,51 +124,23 @@ SYMBOL_TYPES = {
 
 def _get_language(lang: str) -> Optional[tree_sitter.Language]:
     """Get tree-sitter Language object, lazy loading."""
-    if lang in _LANGUAGES:
+    try:
         return _LANGUAGES[lang]
+    except KeyError:
+        pass
 
+    spec = _LANGUAGE_MODULES.get(lang)
+    if spec is None:
+        return None
+    module_name, attr = spec
     try:
-        if lang == "python":
-            import tree_sitter_python
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_python.language())
-        elif lang == "javascript":
-            import tree_sitter_javascript
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_javascript.language())
-        elif lang == "typescript":
-            import tree_sitter_typescript
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_typescript.language_typescript())
-        elif lang == "golang":
-            import tree_sitter_go
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_go.language())
-        elif lang == "rust":
-            import tree_sitter_rust
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_rust.language())
-        elif lang == "bash":
-            import tree_sitter_bash
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_bash.language())
-        elif lang == "json":
-            import tree_sitter_json
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_json.language())
-        elif lang == "yaml":
-            import tree_sitter_yaml
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_yaml.language())
-        elif lang == "html":
-            import tree_sitter_html
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_html.language())
-        elif lang == "css":
-            import tree_sitter_css
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_css.language())
-        elif lang == "hcl":
-            import tree_sitter_hcl
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_hcl.language())
-        elif lang == "toml":
-            import tree_sitter_toml
-            _LANGUAGES[lang] = tree_sitter.Language(tree_sitter_toml.language())
-        else:
-            return None
-        return _LANGUAGES[lang]
+        module = importlib.import_module(module_name)
     except ImportError:
-        return None
+        language = None  # remembered, so a missing grammar is not re-imported per file
+    else:
+        language = tree_sitter.Language(getattr(module, attr)())
+    _LANGUAGES[lang] = language
+    return language
 
 
 def get_parser(lang: str) -> Optional[tree_sitter.Parser]:
@@ -164,16 +159,24 @@ def get_parser(lang: str) -> Optional[tree_sitter.Parser]:
 
 def detect_language(file_path: str) -> Optional[str]:
     """Detect language from file extension."""
-    ext = Path(file_path).suffix.lower()
-    return EXT_TO_LANG.get(ext)
+    # String-only suffix split: no Path object per file
+    return EXT_TO_LANG.get(os.path.splitext(file_path)[1].lower())
+
+
+def read_source(file_path: str) -> Union[bytes, mmap.mmap]:
+    """Read a file for parsing; large files are memory-mapped instead of copied.
+
+    Parser.parse and get_node_text accept either form. A tree keeps a
+    reference to its source, so a mapping lives exactly as long as the tree.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
 
 
 def parse_file(file_path: str) -> Optional[tree_sitter.Tree]:
     """Parse a file and return the AST tree."""
-    path = Path(file_path)
-    if not path.exists():
-        return None
-
     lang = detect_language(file_path)
     if not lang:
         return None
@@ -183,15 +186,19 @@ def parse_file(file_path: str) -> Optional[tree_sitter.Tree]:
         return None
 
     try:
-        source = path.read_bytes()
-        return parser.parse(source)
+        return parser.parse(read_source(file_path))
     except Exception:
         return None
 
 
-def get_node_text(node: tree_sitter.Node, source: bytes) -> str:
+def get_node_text(node: tree_sitter.Node, source: Union[bytes, mmap.mmap]) -> str:
     """Extract text content of a node."""
-    return source[node.start_byte:node.end_byte].decode("utf-8", errors="replace")
+    text = source[node.start_byte:node.end_byte]
+    try:
+        # Identifiers are almost always ASCII: strict ASCII is the cheapest decode
+        return text.decode("ascii")
+    except UnicodeDecodeError:
+        return text.decode("utf-8", errors="replace")
 
 
 def get_symbol_name(node: tree_sitter.Node, source: bytes, lang: str) -> Optional[str]:
@@ -258,81 +265,102 @@ def extract_symbols_from_tree(
     lang: str,
     depth: int = 2,
     include_body: bool = False
-) -> list[dict]:
-    """Extract symbols from a parsed tree."""
+) -> list[Symbol]:
+    """Extract symbols from a parsed tree as Symbol records (see Symbol.to_dict).
+
+    Walks with TreeCursors in pre-order (the order of a recursive walk):
+    no per-node children lists or Python call frames, and no recursion limit.
+    """
     symbols = []
     symbol_types = SYMBOL_TYPES.get(lang, {})
-
-    def process_node(node: tree_sitter.Node, parent_name: str = "", current_depth: int = 0):
-        if current_depth > depth:
-            return
-
-        node_type = node.type
-        if node_type in symbol_types:
-            kind = symbol_types[node_type]
+    if depth < 0:
+        return symbols
+
+    def make(node: tree_sitter.Node, kind: str, name: str, name_path: str) -> Symbol:
+        start_row, start_col = node.start_point
+        return Symbol(
+            name, kind, start_row + 1, node.end_point[0] + 1, name_path, lang,
+            column=start_col,
+            body=get_node_text(node, source) if include_body else None,
+        )
+
+    def collect_children(node: tree_sitter.Node, parent_name: str) -> list[Symbol]:
+        # Every symbol nested within depth, flattened under parent_name
+        result = []
+        cursor = node.walk()
+        if depth < 1 or not cursor.goto_first_child():
+            return result
+        current_depth = 1
+        while True:
+            child = cursor.node
+            kind = symbol_types.get(child.type)
+            if kind is not None:
+                name = get_symbol_name(child, source, lang)
+                if name:
+                    result.append(make(child, kind, name, f"{parent_name}/{name}"))
+            if current_depth < depth and cursor.goto_first_child():
+                current_depth += 1
+                continue
+            while not cursor.goto_next_sibling():
+                cursor.goto_parent()
+                current_depth -= 1
+                if current_depth == 0:
+                    return result
+
+    # Top-level symbols; their subtrees are handled by collect_children
+    cursor = tree.walk()
+    while True:
+        node = cursor.node
+        descend = True
+        kind = symbol_types.get(node.type)
+        if kind is not None:
             name = get_symbol_name(node, source, lang)
-
             if name:
-                name_path = f"{parent_name}/{name}" if parent_name else name
-                symbol = {
-                    "name": name,
-                    "kind": kind,
-                    "lineno": node.start_point[0] + 1,
-                    "end_lineno": node.end_point[0] + 1,
-                    "column": node.start_point[1],
-                    "name_path": name_path,
-                    "language": lang,
-                }
-
-                if include_body:
-                    symbol["body"] = get_node_text(node, source)
-
-                # Process children for nested symbols
-                children = []
-                for child in node.children:
-                    child_symbols = []
-                    process_child(child, name, current_depth + 1, child_symbols)
-                    children.extend(child_symbols)
-
+                symbol = make(node, kind, name, name)
+                children = collect_children(node, name)
                 if children:
-                    symbol["children"] = children
-
+                    symbol.children = children
                 symbols.append(symbol)
-                return  # Don't recurse further for this branch
+                descend = False  # Don't descend further for this branch
 
-        # Continue recursing for non-symbol nodes
-        for child in node.children:
-            process_node(child, parent_name, current_depth)
+        if descend and cursor.goto_first_child():
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                return symbols
 
-    def process_child(node: tree_sitter.Node, parent_name: str, current_depth: int, result: list):
-        if current_depth > depth:
-            return
 
-        node_type = node.type
-        if node_type in symbol_types:
-            kind = symbol_types[node_type]
-            name = get_symbol_name(node, source, lang)
+# Node types that can name a referenced symbol
+IDENTIFIER_TYPES = ("identifier", "property_identifier", "type_identifier", "word")
 
-            if name:
-                name_path = f"{parent_name}/{name}"
-                symbol = {
-                    "name": name,
-                    "kind": kind,
-                    "lineno": node.start_point[0] + 1,
-                    "end_lineno": node.end_point[0] + 1,
-                    "column": node.start_point[1],
-                    "name_path": name_path,
-                    "language": lang,
-                }
-                if include_body:
-                    symbol["body"] = get_node_text(node, source)
-                result.append(symbol)
+# lang -> compiled identifier Query (None if the language cannot build one)
+_IDENTIFIER_QUERIES: dict[str, Optional[tree_sitter.Query]] = {}
 
-        for child in node.children:
-            process_child(child, parent_name, current_depth + 1, result)
 
-    process_node(tree.root_node)
-    return symbols
+def _identifier_query(lang: str) -> Optional[tree_sitter.Query]:
+    """Query capturing every identifier-like node of a language as @id."""
+    if lang in _IDENTIFIER_QUERIES:
+        return _IDENTIFIER_QUERIES[lang]
+
+    query = None
+    language = _get_language(lang)
+    if language is not None:
+        kinds = [k for k in IDENTIFIER_TYPES if language.id_for_node_kind(k, True)]
+        if kinds:
+            try:
+                query = tree_sitter.Query(language, "[" + " ".join(f"({k})" for k in kinds) + "] @id")
+            except Exception:
+                query = None
+    _IDENTIFIER_QUERIES[lang] = query
+    return query
+
+
+def _captures(query: tree_sitter.Query, node: tree_sitter.Node) -> dict:
+    """Run a query in C; tree-sitter 0.25 moved captures() onto QueryCursor."""
+    cursor_cls = getattr(tree_sitter, "QueryCursor", None)
+    if cursor_cls is not None:
+        return cursor_cls(query).captures(node)
+    return query.captures(node)
 
 
 def find_references_in_tree(
@@ -341,13 +369,47 @@ def find_references_in_tree(
     symbol: str,
     lang: str
 ) -> list[dict]:
-    """Find all references to a symbol in a parsed tree."""
+    """Find all references to a symbol in a parsed tree.
+
+    Identifier nodes are collected by a tree-sitter Query (in C) and compared
+    as raw bytes; the Python recursive walk is only a fallback.
+    """
+    query = _identifier_query(lang)
+    if query is None:
+        return _find_references_walk(tree, source, symbol)
+
+    needle = symbol.encode("utf-8")
+    size = len(needle)
+    nodes = [
+        node for node in _captures(query, tree.root_node).get("id", ())
+        if node.end_byte - node.start_byte == size and source[node.start_byte:node.end_byte] == needle
+    ]
+    if not nodes:
+        return []
+    nodes.sort(key=lambda n: n.start_byte)
+
+    source_lines = source.decode("utf-8", errors="replace").splitlines()
+    references = []
+    for node in nodes:
+        line = node.start_point[0]
+        parent = node.parent
+        references.append({
+            "line": line + 1,
+            "column": node.start_point[1] + 1,
+            "text": source_lines[line] if line < len(source_lines) else "",
+            "node_type": parent.type if parent else "unknown",
+        })
+    return references
+
+
+def _find_references_walk(tree: tree_sitter.Tree, source: bytes, symbol: str) -> list[dict]:
+    """Recursive-walk version of find_references_in_tree (no Query support)."""
     references = []
     source_lines = source.decode("utf-8", errors="replace").splitlines()
 
     def find_in_node(node: tree_sitter.Node):
         # Check if this node is an identifier matching our symbol
-        if node.type in ("identifier", "property_identifier", "type_identifier", "word"):
+        if node.type in IDENTIFIER_TYPES:
             text = get_node_text(node, source)
             if text == symbol:
                 line = node.start_point[0]
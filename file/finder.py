@@ -1,16 +1,26 @@
 """File finding and directory listing (Serena-like)."""
 import os
+import re
+import stat
 from pathlib import Path
 from typing import Optional
 import fnmatch
 
+from code._fswalk import iter_glob, walk
+
+# Directories never listed or searched (in addition to hidden ones)
+_SKIP_DIRS = frozenset({'__pycache__', 'node_modules', 'venv', '.venv'})
+# Recursive listings also skip build output
+_SKIP_DIRS_RECURSIVE = _SKIP_DIRS | {'dist', 'build'}
+
 
 def list_directory(
     path: str = ".",
     project_root: Optional[str] = None,
     recursive: bool = False,
     pattern: Optional[str] = None,
-    max_items: int = 200
+    max_items: int = 200,
+    max_depth: Optional[int] = None
 ) -> dict:
     """List directory contents.
 
@@ -20,40 +30,50 @@ def list_directory(
         recursive: List recursively
         pattern: Glob pattern filter (e.g., '*.py')
         max_items: Maximum items to return
+        max_depth: Recursive mode only: deepest level listed (1 = direct children, must be >= 1); None for no limit
 
     Returns:
         Dict with files and directories
     """
+    if max_depth is not None and max_depth < 1:
+        return {"ok": False, "error": f"max_depth must be >= 1, got {max_depth}"}
+
     # Resolve path
     if project_root and not Path(path).is_absolute():
         full_path = Path(project_root) / path
     else:
         full_path = Path(path)
 
-    if not full_path.exists():
+    try:
+        st = os.stat(full_path)
+    except OSError:
         return {"ok": False, "error": f"Path not found: {path}"}
 
-    if not full_path.is_dir():
+    if not stat.S_ISDIR(st.st_mode):
         return {"ok": False, "error": f"Not a directory: {path}"}
 
     files = []
     directories = []
     count = 0
+    # Compile the glob once instead of per entry
+    match = re.compile(fnmatch.translate(pattern)).match if pattern else None
 
     try:
         if recursive:
-            for root, dirs, filenames in os.walk(full_path):
+            top = str(full_path)
+            for root, dirs, filenames in os.walk(top):
                 # Skip hidden and system directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in
-                          ('__pycache__', 'node_modules', 'venv', '.venv', 'dist', 'build')]
+                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in _SKIP_DIRS_RECURSIVE]
 
-                rel_root = Path(root).relative_to(full_path)
+                rel_root = os.path.relpath(root, top)
+                prefix = "" if rel_root == "." else rel_root + os.sep
+                # Entries of this directory sit one level below it
+                level = 1 if rel_root == "." else rel_root.count(os.sep) + 2
 
                 for d in dirs:
                     if count >= max_items:
                         break
-                    rel_path = rel_root / d if str(rel_root) != '.' else Path(d)
-                    directories.append(str(rel_path))
+                    directories.append(prefix + d)
                     count += 1
 
                 for f in filenames:
@@ -61,29 +81,33 @@ def list_directory(
                         break
                     if f.startswith('.'):
                         continue
-                    if pattern and not fnmatch.fnmatch(f, pattern):
+                    if match and not match(f):
                         continue
-                    rel_path = rel_root / f if str(rel_root) != '.' else Path(f)
-                    files.append(str(rel_path))
+                    files.append(prefix + f)
                     count += 1
 
                 if count >= max_items:
                     break
+                if max_depth is not None and level >= max_depth:
+                    dirs[:] = []  # listed, but not descended into
         else:
-            for item in full_path.iterdir():
-                if count >= max_items:
-                    break
-                if item.name.startswith('.'):
-                    continue
-                if item.is_dir():
-                    if item.name not in ('__pycache__', 'node_modules', 'venv', '.venv'):
-                        directories.append(item.name)
-                        count += 1
-                else:
-                    if pattern and not fnmatch.fnmatch(item.name, pattern):
+            # DirEntry caches the entry type, so no per-item stat
+            with os.scandir(full_path) as it:
+                for entry in it:
+                    if count >= max_items:
+                        break
+                    name = entry.name
+                    if name.startswith('.'):
                         continue
-                    files.append(item.name)
-                    count += 1
+                    if entry.is_dir():
+                        if name not in _SKIP_DIRS:
+                            directories.append(name)
+                            count += 1
+                    else:
+                        if match and not match(name):
+                            continue
+                        files.append(name)
+                        count += 1
 
         return {
             "ok": True,
@@ -123,19 +147,14 @@ def find_files(
     count = 0
 
     try:
-        for fp in root.glob(pattern):
+        # Hidden and system directories are pruned before descending
+        for fp, rel in iter_glob(str(root), pattern, _SKIP_DIRS):
             if count >= max_results:
                 break
-            if not fp.is_file():
-                continue
-            # Skip hidden and system directories
-            if any(part.startswith('.') or part in ('__pycache__', 'node_modules', 'venv', '.venv')
-                   for part in fp.parts):
-                continue
 
             files.append({
-                "path": str(fp.relative_to(root)),
-                "size": fp.stat().st_size,
+                "path": rel,
+                "size": os.stat(fp).st_size,
             })
             count += 1
 
@@ -174,19 +193,16 @@ def find_file_by_name(
     name_lower = name.lower()
 
     try:
-        for fp in root.rglob("*"):
-            if len(files) >= max_results:
-                break
-            if not fp.is_file():
-                continue
-            if any(part.startswith('.') or part in ('__pycache__', 'node_modules', 'venv', '.venv')
-                   for part in fp.parts):
-                continue
-            if name_lower in fp.name.lower():
+        # Hidden and system directories are pruned before descending
+        for _, rel in walk(str(root), _SKIP_DIRS):
+            file_name = os.path.basename(rel)
+            if name_lower in file_name.lower():
                 files.append({
-                    "path": str(fp.relative_to(root)),
-                    "name": fp.name,
+                    "path": rel,
+                    "name": file_name,
                 })
+                if len(files) >= max_results:
+                    break
 
         return {
             "ok": True,
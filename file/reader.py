@@ -1,7 +1,72 @@
 """File reading with line ranges (Serena-like)."""
+import mmap
+import os
+import stat
 from pathlib import Path
 from typing import Optional
 
+# Files at least this large are mapped instead of read into memory
+_MMAP_MIN_BYTES = 1 << 20
+# Scan granularity when counting lines
+_CHUNK_BYTES = 1 << 20
+# Line boundaries str.splitlines() honours besides \n, \r\n and lone \r
+_ASCII_LINE_BREAKS = b"\x0b\x0c\x1c\x1d\x1e"
+_UNICODE_LINE_BREAKS = "\x85\u2028\u2029"
+
+
+def _chunks(buf):
+    """Yield (offset, bytes) pieces of buf that each end just after a newline (or at EOF).
+
+    Never splitting inside a line keeps \r\n pairs and UTF-8 sequences whole.
+    """
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        end = min(size, pos + _CHUNK_BYTES)
+        if end < size:
+            cut = buf.rfind(b"\n", pos, end)
+            if cut == -1:
+                cut = buf.find(b"\n", end)
+            end = size if cut == -1 else cut + 1
+        yield pos, buf[pos:end]
+        pos = end
+
+
+def _scan_lines(buf, first: int, last: int):
+    """Count lines in buf and locate where lines first and last start (0-indexed).
+
+    Returns (total_lines, first_offset, last_offset), or None when buf holds
+    line breaks other than \n / \r\n, whose numbering only splitlines() gets right.
+    Raises UnicodeDecodeError for non UTF-8 content, like a full read would.
+    """
+    size = len(buf)
+    offsets = {first: size, last: size}
+    newlines = 0
+    for pos, chunk in _chunks(buf):
+        # Non-ASCII chunks are decoded: same UnicodeDecodeError as a full read
+        if not chunk.isascii():
+            text = chunk.decode("utf-8")
+            if any(c in text for c in _UNICODE_LINE_BREAKS):
+                return None
+        if any(c in chunk for c in _ASCII_LINE_BREAKS):
+            return None
+        if b"\r" in chunk and chunk.count(b"\r") != chunk.count(b"\r\n"):
+            return None
+        count = chunk.count(b"\n")
+        for target in offsets:
+            # Line `target` starts right after the target-th newline
+            if target == 0:
+                offsets[target] = 0
+            elif newlines < target <= newlines + count:
+                i = -1
+                for _ in range(target - newlines):
+                    i = chunk.find(b"\n", i + 1)
+                offsets[target] = pos + i + 1
+        newlines += count
+    if size and buf[size - 1:size] != b"\n":
+        newlines += 1
+    return newlines, offsets[first], offsets[last]
+
 
 def read_file(
     path: str,
@@ -28,29 +93,43 @@ def read_file(
     else:
         full_path = Path(path)
 
-    if not full_path.exists():
+    # One stat answers existence, type and size
+    try:
+        st = os.stat(full_path)
+    except OSError:
         return {"ok": False, "error": f"File not found: {path}"}
 
-    if not full_path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         return {"ok": False, "error": f"Not a file: {path}"}
 
-    try:
-        content = full_path.read_text(encoding="utf-8")
-        lines = content.splitlines()
-        total_lines = len(lines)
-
-        # Apply line range
-        if start_line is not None:
-            start_idx = max(0, start_line - 1)
-        else:
-            start_idx = 0
-
-        if end_line is not None:
-            end_idx = min(total_lines, end_line)
-        else:
-            end_idx = min(total_lines, start_idx + max_lines)
+    # Apply line range
+    if start_line is not None:
+        start_idx = max(0, start_line - 1)
+    else:
+        start_idx = 0
+    want_end = end_line if end_line is not None else start_idx + max_lines
 
-        selected = lines[start_idx:end_idx]
+    try:
+        with open(full_path, "rb") as f:
+            if st.st_size >= _MMAP_MIN_BYTES:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+            try:
+                # Count lines in one pass, then decode only the requested range
+                scan = _scan_lines(buf, start_idx, max(start_idx, want_end))
+                if scan is not None:
+                    total_lines, lo, hi = scan
+                    selected = buf[lo:hi].decode("utf-8").splitlines()
+                else:
+                    lines = bytes(buf).decode("utf-8").splitlines()
+                    total_lines = len(lines)
+                    selected = lines[start_idx:max(start_idx, want_end)]
+            finally:
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+
+        end_idx = min(total_lines, want_end)
 
         # Add line numbers
         numbered = [f"{i:4d}| {line}" for i, line in enumerate(selected, start=start_idx + 1)]
@@ -89,7 +168,7 @@ def read_symbol_body(
     Returns:
         Dict with symbol body content
     """
-    from code.symbols import extract_symbols
+    from code.symbols import read_symbol
 
     # Resolve path
     if project_root and not Path(path).is_absolute():
@@ -100,25 +179,14 @@ def read_symbol_body(
     if not full_path.exists():
         return {"ok": False, "error": f"File not found: {path}"}
 
-    symbols = extract_symbols(str(full_path), depth=2, include_body=True)
-
-    # Search for symbol
-    for sym in symbols:
-        if sym["name"] == symbol_name or sym.get("name_path") == symbol_name:
-            return {
-                "ok": True,
-                "symbol": sym,
-                "body": sym.get("body", ""),
-                "path": str(full_path)
-            }
-        # Check children
-        for child in sym.get("children", []):
-            if child["name"] == symbol_name or child.get("name_path") == symbol_name:
-                return {
-                    "ok": True,
-                    "symbol": child,
-                    "body": child.get("body", ""),
-                    "path": str(full_path)
-                }
-
-    return {"ok": False, "error": f"Symbol not found: {symbol_name}"}
+    # Only the matching symbol is converted to a dict
+    sym = read_symbol(str(full_path), symbol_name)
+    if sym is None:
+        return {"ok": False, "error": f"Symbol not found: {symbol_name}"}
+
+    return {
+        "ok": True,
+        "symbol": sym,
+        "body": sym.get("body", ""),
+        "path": str(full_path)
+    }
@@ -10,15 +10,17 @@ Modules:
 - hallucination: Hallucination detection
 - context_grounding: Response grounding validation
 - schema_validation: Output schema validation
+- combined_scan: PII + code security in one pass
 """
 
 from .abstain import should_abstain, get_abstain_reason, suggest_query_improvements
-from .prompt_injection import detect_prompt_injection, sanitize_input, get_injection_report
+from .prompt_injection import detect_prompt_injection, detect_prompt_injection_batch, sanitize_input, get_injection_report
 from .pii_detection import detect_pii, mask_pii, should_block_pii, get_pii_report
 from .code_security import scan_code, should_block_code, get_security_report
 from .hallucination import detect_hallucinations, should_flag_response, get_hallucination_report
 from .context_grounding import validate_grounding, enforce_grounding, calculate_grounding_score
 from .schema_validation import validate_output, validate_json_output, validate_mcp_output
+from .combined_scan import scan_all
 
 __all__ = [
     # Abstain
@@ -27,6 +29,7 @@ __all__ = [
     "suggest_query_improvements",
     # Prompt Injection
     "detect_prompt_injection",
+    "detect_prompt_injection_batch",
     "sanitize_input",
     "get_injection_report",
     # PII Detection
@@ -50,4 +53,6 @@ __all__ = [
     "validate_output",
     "validate_json_output",
     "validate_mcp_output",
+    # Combined Scan
+    "scan_all",
 ]
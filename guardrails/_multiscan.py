@@ -0,0 +1,283 @@
+"""Regex acceleration for the guardrail scanners.
+
+A pattern set gets a prefilter that finds which patterns can match at all:
+one Hyperscan scan when the optional ``hyperscan`` package is installed,
+otherwise a substring check for each pattern's required literals. With the
+optional ``pcre2`` package, patterns also get a PCRE2-JIT compiled twin.
+Both engines are used only on text they read exactly as ``re`` does, so
+results are the same with or without them.
+"""
+import re
+import threading
+from typing import Optional, Sequence, Union
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+try:
+    import hyperscan as _hs
+except ImportError:
+    _hs = None
+
+try:
+    import pcre2 as _pcre2
+except ImportError:
+    _pcre2 = None
+
+ENGINE = "hyperscan" if _hs is not None else "re"
+
+# Text other engines read exactly as re does: ASCII without \x1c-\x1f, which
+# str patterns treat as \s but Hyperscan and PCRE2 do not
+_NOT_SAFE = re.compile(r"[^\x00-\x1b\x20-\x7f]")
+
+
+def ascii_safe(text: str) -> bool:
+    """True if text may be matched with jit_compile() patterns."""
+    return _NOT_SAFE.search(text) is None
+
+
+def jit_compile(pattern: str, flags: int = 0):
+    """PCRE2-JIT twin of re.compile(pattern, flags), or None.
+
+    Only valid on ascii_safe() text. None when pcre2 is not installed or the
+    pattern is non-ASCII, uses \\Z (end-or-final-newline in PCRE) or fails to
+    compile.
+    """
+    if _pcre2 is None or not pattern.isascii() or r"\Z" in pattern:
+        return None
+    pcre_flags = 0
+    if flags & re.IGNORECASE:
+        pcre_flags |= _pcre2.IGNORECASE
+    if flags & re.MULTILINE:
+        pcre_flags |= _pcre2.MULTILINE
+    if flags & re.DOTALL:
+        pcre_flags |= _pcre2.DOTALL
+    try:
+        # (*LF): only \n is a newline for '.' and '$', as in re
+        return _JitPattern(_pcre2.compile(("(*LF)" + pattern).encode("ascii"), flags=pcre_flags))
+    except Exception:
+        return None
+
+
+class _JitPattern:
+    """A PCRE2 pattern matched against the ASCII bytes of str text.
+
+    pcre2 maps each offset into a str subject by rescanning it from the
+    start, which is quadratic in the number of matches; bytes offsets are
+    used as-is and equal character offsets in ASCII text.
+    """
+
+    __slots__ = ("_pattern",)
+
+    def __init__(self, pattern):
+        self._pattern = pattern
+
+    def finditer(self, text: str):
+        for match in self._pattern.finditer(text.encode("ascii")):
+            yield _JitMatch(match)
+
+
+class _JitMatch:
+    """The subset of re.Match the scanners use, over a bytes PCRE2 match."""
+
+    __slots__ = ("_match",)
+
+    def __init__(self, match):
+        self._match = match
+
+    def start(self) -> int:
+        return self._match.start()
+
+    def end(self) -> int:
+        return self._match.end()
+
+    def span(self) -> tuple:
+        return self._match.span()
+
+    def group(self) -> str:
+        return self._match.group().decode("ascii")
+
+
+def _hs_flags(flags: int) -> int:
+    # PREFILTER approximates unsupported constructs without false negatives
+    hs_flags = _hs.HS_FLAG_PREFILTER | _hs.HS_FLAG_SINGLEMATCH | _hs.HS_FLAG_ALLOWEMPTY
+    if flags & re.IGNORECASE:
+        hs_flags |= _hs.HS_FLAG_CASELESS
+    if flags & re.MULTILINE:
+        hs_flags |= _hs.HS_FLAG_MULTILINE
+    if flags & re.DOTALL:
+        hs_flags |= _hs.HS_FLAG_DOTALL
+    return hs_flags
+
+
+def _parse(pattern: str, flags: int):
+    """Parsed pattern, or None if it fails to parse or inline flags change case sensitivity."""
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except (re.error, RecursionError):
+        return None
+    if parsed.state.flags & re.IGNORECASE != flags & re.IGNORECASE:
+        return None
+    return parsed
+
+
+def _fold(literal: str, flags: int) -> Optional[str]:
+    if flags & re.IGNORECASE:
+        if not literal.isascii():
+            return None
+        literal = literal.lower()
+    return literal or None
+
+
+def _better(a: tuple, b: tuple) -> bool:
+    """Whether literal set a filters better than b: a longer shortest literal, then fewer literals.
+
+    Sets of several literals need each to be 3+ characters; shorter ones
+    occur in nearly every text and are not worth the extra substring checks.
+    """
+    if len(a) > 1 and min(map(len, a)) < 3:
+        return False
+    return (min(map(len, a)), -len(a)) > (min(map(len, b)), -len(b))
+
+
+def _best_literals(items, run: list) -> tuple:
+    """Best literal set that every match of the parsed items contains, given
+    that the literal characters in run immediately precede them."""
+    best = ("",)
+    run = list(run)
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if op is _sre_parse.BRANCH:
+            # Each match goes through one branch, so it contains one of the
+            # branches' literals; the run before the branch starts each of them
+            alternatives = tuple(lit for branch in av[1] for lit in _best_literals(branch, run))
+            if _better(alternatives, best):
+                best = alternatives
+        elif op is _sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            # A group (without inline flags) is matched exactly once
+            inner = _best_literals(av[3], run)
+            if _better(inner, best):
+                best = inner
+        if _better(("".join(run),), best):
+            best = ("".join(run),)
+        run = []
+    if _better(("".join(run),), best):
+        best = ("".join(run),)
+    return best
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[tuple]:
+    """Literals at least one of which every match of pattern must contain, or None.
+
+    Either the longest top-level literal run or, for an alternation, one
+    literal per branch. With re.IGNORECASE the literals are lowercased and
+    must be ASCII. Patterns whose inline flags change case sensitivity
+    return None.
+    """
+    parsed = _parse(pattern, flags)
+    if parsed is None:
+        return None
+    literals = tuple(_fold(literal, flags) for literal in _best_literals(parsed, []))
+    if None in literals:
+        return None
+    return literals
+
+
+def literal_prefix(pattern: str, flags: int = 0) -> Optional[str]:
+    """Literal every match of pattern starts with, or None (folded as in required_literals)."""
+    parsed = _parse(pattern, flags)
+    if parsed is None:
+        return None
+    run = []
+    for op, av in parsed:
+        if op is not _sre_parse.LITERAL:
+            break
+        run.append(chr(av))
+    return _fold("".join(run), flags)
+
+
+def prefix_finditer(regex: re.Pattern, prefix: str, text: str, folded: str):
+    """regex.finditer(text) for a regex whose matches all start with prefix.
+
+    folded is text, lowercased (and ASCII) if prefix came from an IGNORECASE
+    pattern. regex is only tried where prefix occurs.
+    """
+    end = 0
+    i = folded.find(prefix)
+    while i != -1:
+        match = regex.match(text, i)
+        if match:
+            yield match
+            end = match.end()
+        i = folded.find(prefix, max(i + 1, end))
+
+
+class Prefilter:
+    """Finds which of a list of patterns can match a text.
+
+    Uses one Hyperscan scan when available; otherwise a pattern is skipped
+    when none of its required literals occurs in the text.
+    """
+
+    def __init__(self, patterns: Sequence[str], flags: Union[int, Sequence[int]] = 0):
+        """flags is one set of re flags for all patterns, or one per pattern."""
+        if isinstance(flags, int):
+            flags = [flags] * len(patterns)
+        self._all = range(len(patterns))
+        # (literals, ignorecase) per pattern
+        self._literals = [
+            (required_literals(p, f), bool(f & re.IGNORECASE)) for p, f in zip(patterns, flags)
+        ]
+        if not any(literals for literals, _ in self._literals):
+            self._literals = None
+        self._any_ignorecase = any(f & re.IGNORECASE for f in flags)
+        self._db = None
+        self._lock = threading.Lock()  # a database's scratch space is single-threaded
+        if _hs is None or not patterns:
+            return
+        try:
+            db = _hs.Database(mode=_hs.HS_MODE_BLOCK)
+            db.compile(
+                expressions=[p.encode("utf-8") for p in patterns],
+                ids=list(self._all),
+                elements=len(patterns),
+                flags=[_hs_flags(f) for f in flags],
+            )
+            self._db = db
+        except Exception:
+            # Some pattern Hyperscan cannot compile: use the literal check
+            self._db = None
+
+    def candidates(self, text: str) -> Sequence[int]:
+        """Ascending indices of patterns that may match text (all when unsure)."""
+        if self._db is not None and ascii_safe(text):
+            hits = set()
+
+            def on_match(pattern_id, start, end, flags, context):
+                hits.add(pattern_id)
+
+            try:
+                with self._lock:
+                    self._db.scan(text.encode("ascii"), match_event_handler=on_match)
+                return sorted(hits)
+            except Exception:
+                pass
+
+        if self._literals is None:
+            return self._all
+        # ASCII lowercasing is exact case folding only for ASCII text
+        lowered = text.lower() if self._any_ignorecase and text.isascii() else None
+        hits = []
+        for i, (literals, ignorecase) in enumerate(self._literals):
+            if literals is None:
+                hits.append(i)
+            elif ignorecase:
+                if lowered is None or any(literal in lowered for literal in literals):
+                    hits.append(i)
+            elif any(literal in text for literal in literals):
+                hits.append(i)
+        return hits
@@ -0,0 +1,14 @@
+"""Sentence splitting shared by the hallucination and grounding checks."""
+import re
+from functools import lru_cache
+
+_SPLIT_RE = re.compile(r'[.!?]\s+')
+
+
+@lru_cache(maxsize=32)
+def split_sentences(text: str) -> tuple:
+    """Split text after ., ! or ? followed by whitespace.
+
+    Memoized: reports split the same response in several checks.
+    """
+    return tuple(_SPLIT_RE.split(text))
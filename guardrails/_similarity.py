@@ -0,0 +1,31 @@
+"""Sequence similarity for the grounding and hallucination checks.
+
+Uses RapidFuzz's C++ Indel ratio (bit-parallel LCS) when the optional
+``rapidfuzz`` package is installed, and difflib.SequenceMatcher otherwise.
+Both score 2*M/T; RapidFuzz counts M as the longest common subsequence, so
+its score is never below difflib's matching-block count (usually equal).
+"""
+from difflib import SequenceMatcher
+
+try:
+    from rapidfuzz.fuzz import ratio as _rf_ratio
+except ImportError:
+    _rf_ratio = None
+
+ENGINE = "rapidfuzz" if _rf_ratio is not None else "difflib"
+
+
+def ratio(a: str, b: str, score_cutoff: float = 0.0) -> float:
+    """Similarity of a and b in [0, 1].
+
+    Scores below score_cutoff are returned as 0.0, and cheap upper bounds
+    (length ratio, character multiset overlap) skip the full comparison
+    when they already fall below it.
+    """
+    if _rf_ratio is not None:
+        return _rf_ratio(a, b, score_cutoff=score_cutoff * 100.0) / 100.0
+    matcher = SequenceMatcher(None, a, b)
+    if score_cutoff > 0.0 and (matcher.real_quick_ratio() < score_cutoff or matcher.quick_ratio() < score_cutoff):
+        return 0.0
+    score = matcher.ratio()
+    return score if score >= score_cutoff else 0.0
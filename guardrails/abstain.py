@@ -1,3 +1,19 @@
+def _hit_stats(hits):
+    """(best score, unique source count, average score) of non-empty hits, in one pass."""
+    # Reading scores out of the hit dicts dominates: a NumPy array built from
+    # them is slower than this loop even for thousands of hits
+    best = None
+    total = 0
+    sources = set()
+    for h in hits:
+        score = h.get("score", 0.0)
+        total += score
+        if best is None or score > best:
+            best = score
+        sources.add(h.get("source", ""))
+    return best, len(sources), total / len(hits)
+
+
 def should_abstain(
     hits,
     min_hits: int = 1,
@@ -22,17 +38,17 @@ def should_abstain(
     if not hits or len(hits) < min_hits:
         return True
 
+    max_score, unique_sources, avg_score = _hit_stats(hits)
+
     # Check 2: Best result quality
-    if max(h.get("score", 0.0) for h in hits) < min_score:
+    if max_score < min_score:
         return True
 
     # Check 3: Result diversity (avoid all results from same file)
-    unique_sources = set(h.get("source", "") for h in hits)
-    if len(unique_sources) < min_diversity:
+    if unique_sources < min_diversity:
         return True
 
     # Check 4: Average quality (avoid low-quality bulk results)
-    avg_score = sum(h.get("score", 0.0) for h in hits) / len(hits)
     if avg_score < min_avg_score:
         return True
 
@@ -66,17 +82,15 @@ def get_abstain_reason(
         _log_detail(f"Insufficient results: {len(hits)} found, {min_hits} required. Try broader search terms.")
         return "INSUFFICIENT_RESULTS"
 
-    max_score = max(h.get("score", 0.0) for h in hits)
+    max_score, unique_sources, avg_score = _hit_stats(hits)
     if max_score < min_score:
         _log_detail(f"Low relevance: max score {max_score:.2f} < threshold {min_score:.2f}. Refine query.")
         return "LOW_RELEVANCE"
 
-    unique_sources = set(h.get("source", "") for h in hits)
-    if len(unique_sources) < min_diversity:
-        _log_detail(f"Low diversity: {len(unique_sources)} unique files. Try more specific query.")
+    if unique_sources < min_diversity:
+        _log_detail(f"Low diversity: {unique_sources} unique files. Try more specific query.")
         return "LOW_DIVERSITY"
 
-    avg_score = sum(h.get("score", 0.0) for h in hits) / len(hits)
     if avg_score < min_avg_score:
         _log_detail(f"Low average quality: {avg_score:.2f} < threshold {min_avg_score:.2f}.")
         return "LOW_QUALITY"
@@ -112,14 +126,14 @@ def suggest_query_improvements(query: str, hits):
 
     # Analyze results
     if hits:
+        _, unique_sources, avg_score = _hit_stats(hits)
+
         # Check if results are low quality
-        avg_score = sum(h.get("score", 0.0) for h in hits) / len(hits)
         if avg_score < 0.2:
             suggestions.append("• Low keyword match - try synonyms or related terms")
 
         # Check diversity
-        unique_sources = set(h.get("source", "") for h in hits)
-        if len(unique_sources) < 2 and len(hits) > 2:
+        if unique_sources < 2 and len(hits) > 2:
             suggestions.append("• Results concentrated in few files - need more specific function/module names")
 
     if not suggestions:
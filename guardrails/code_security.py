@@ -6,17 +6,25 @@ Patterns loaded from external config to avoid scanner false positives.
 
 import re
 import os
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterable, Optional
 from pathlib import Path
 
+from ._multiscan import Prefilter, ascii_safe, jit_compile
+
 SEVERITY_WEIGHTS = {"CRITICAL": 1.0, "HIGH": 0.8, "MEDIUM": 0.5, "LOW": 0.3}
+# Findings are ordered by severity rank; anything else (LOW, unknown) ranks last
+_SEVERITY_RANK = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2}
+_LAST_RANK = 3
+_SCAN_FLAGS = re.IGNORECASE | re.MULTILINE
+_CONFIG_PATH = Path(__file__).parent / "security_patterns.txt"
+
+# (config file signature, compiled rows, prefilter); rebuilt when the file changes
+_PATTERNS_CACHE = None
 
 
 def _load_patterns_from_config() -> Dict[str, List[Tuple[str, str, str]]]:
     """Load vulnerability patterns from config file."""
-    config_path = Path(__file__).parent / "security_patterns.txt"
-
-    if not config_path.exists():
+    if not _CONFIG_PATH.exists():
         # Return minimal built-in patterns
         return {
             "SQL_INJECTION": [
@@ -33,7 +41,7 @@ def _load_patterns_from_config() -> Dict[str, List[Tuple[str, str, str]]]:
     patterns = {}
     current_category = None
 
-    with open(config_path, 'r') as f:
+    with open(_CONFIG_PATH, 'r') as f:
         for line in f:
             line = line.strip()
             if not line or line.startswith('#'):
@@ -49,31 +57,105 @@ def _load_patterns_from_config() -> Dict[str, List[Tuple[str, str, str]]]:
     return patterns
 
 
-def scan_code(code: str, language: str = "auto") -> List[Dict]:
-    """Scan code for security vulnerabilities."""
-    if not code:
-        return []
-
-    findings = []
-    patterns = _load_patterns_from_config()
+def _compile_patterns(patterns: Dict[str, List[Tuple[str, str, str]]]) -> Tuple[list, Prefilter]:
+    """Compile loaded patterns into (category, regex, fast regex, description, severity, rank) rows.
 
+    The fast regex is a PCRE2-JIT twin for ascii_safe code (or the re
+    pattern again). Invalid regexes are dropped.
+    """
+    compiled = []
     for category, pattern_list in patterns.items():
         for pattern, description, severity in pattern_list:
             try:
-                for match in re.finditer(pattern, code, re.IGNORECASE | re.MULTILINE):
-                    line_num = code[:match.start()].count('\n') + 1
-                    findings.append({
-                        "category": category,
-                        "severity": severity,
-                        "description": description,
-                        "line": line_num,
-                        "match": match.group()[:80],
-                    })
+                regex = re.compile(pattern, _SCAN_FLAGS)
             except re.error:
-                pass
+                continue
+            compiled.append((
+                category, regex, jit_compile(pattern, _SCAN_FLAGS) or regex,
+                description, severity, _SEVERITY_RANK.get(severity, _LAST_RANK),
+            ))
+    return compiled, Prefilter([c[1].pattern for c in compiled], _SCAN_FLAGS)
+
+
+def _get_compiled_patterns() -> Tuple[list, Prefilter]:
+    """Compiled patterns, reloaded only when the config file's mtime or size changes."""
+    global _PATTERNS_CACHE
+    try:
+        st = _CONFIG_PATH.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        signature = None  # built-in patterns
+    cache = _PATTERNS_CACHE
+    if cache is None or cache[0] != signature:
+        cache = (signature, *_compile_patterns(_load_patterns_from_config()))
+        _PATTERNS_CACHE = cache
+    return cache[1], cache[2]
+
+
+def scan_code(code: str, language: str = "auto", max_per_category: Optional[int] = None) -> List[Dict]:
+    """Scan code for security vulnerabilities.
+
+    With max_per_category, at most that many findings are kept per category
+    and its remaining matches are not searched for.
+    """
+    if not code:
+        return []
 
-    findings.sort(key=lambda x: {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2}.get(x["severity"], 3))
-    return findings
+    compiled, prefilter = _get_compiled_patterns()
+    # With Hyperscan, only patterns that can match are run
+    return _scan_code(code, compiled, prefilter.candidates(code), max_per_category)
+
+
+def _scan_code(
+    code: str,
+    compiled: list,
+    candidates: Iterable[int],
+    max_per_category: Optional[int] = None,
+    until_blocked: bool = False
+) -> List[Dict]:
+    """scan_code restricted to the compiled pattern rows at candidates.
+
+    With until_blocked, scanning stops once a CRITICAL finding has been made
+    and the risk score is saturated, when should_block_code's result can no
+    longer change.
+    """
+    # One bucket per severity rank; concatenating them is a stable sort by rank
+    buckets = [[] for _ in range(_LAST_RANK + 1)]
+    safe = ascii_safe(code)
+    per_category = {}
+    weight = 0.0
+    critical = False
+
+    for i in candidates:
+        category, regex, fast, description, severity, rank = compiled[i]
+        findings = buckets[rank]
+        count = per_category.get(category, 0)
+        if max_per_category is not None and count >= max_per_category:
+            continue
+        # Matches come in order, so line numbers are counted incrementally
+        line_num, pos = 1, 0
+        for match in (fast if safe else regex).finditer(code):
+            start = match.start()
+            line_num += code.count('\n', pos, start)
+            pos = start
+            findings.append({
+                "category": category,
+                "severity": severity,
+                "description": description,
+                "line": line_num,
+                "match": match.group()[:80],
+            })
+            count += 1
+            if until_blocked:
+                weight += SEVERITY_WEIGHTS.get(severity, 0)
+                critical = critical or severity == "CRITICAL"
+                if critical and weight >= 3.0:
+                    return [finding for bucket in buckets for finding in bucket]
+            if max_per_category is not None and count >= max_per_category:
+                break
+        per_category[category] = count
+
+    return [finding for bucket in buckets for finding in bucket]
 
 
 def calculate_risk_score(findings: List[Dict]) -> float:
@@ -86,7 +168,12 @@ def calculate_risk_score(findings: List[Dict]) -> float:
 
 def should_block_code(code: str, threshold: float = 0.7) -> Tuple[bool, str, float]:
     """Check if code should be blocked."""
-    findings = scan_code(code)
+    if not code:
+        return False, "", 0.0
+
+    compiled, prefilter = _get_compiled_patterns()
+    # Stops early once blocking on a CRITICAL finding with risk 1.0 is certain
+    findings = _scan_code(code, compiled, prefilter.candidates(code), until_blocked=True)
     if not findings:
         return False, "", 0.0
 
@@ -0,0 +1,51 @@
+# guardrails/combined_scan.py - Combined PII + Code Security Scan
+"""
+Runs PII / API key detection and code security scanning with one prefilter
+pass over the text instead of one per scanner.
+"""
+
+import re
+from typing import Dict, List
+
+from ._multiscan import Prefilter
+from .code_security import _SCAN_FLAGS, _get_compiled_patterns, _scan_code
+from .pii_detection import _DETECT_COMPILED, _detect_pii
+
+# (security pattern rows it was built for, prefilter); rebuilt when they reload
+_PREFILTER_CACHE = None
+
+
+def _combined_prefilter(compiled: list) -> Prefilter:
+    """Prefilter over PII + API key patterns (ids first) then security patterns."""
+    global _PREFILTER_CACHE
+    cache = _PREFILTER_CACHE
+    if cache is None or cache[0] is not compiled:
+        patterns = [entry[3].pattern for entry in _DETECT_COMPILED] + [row[1].pattern for row in compiled]
+        flags = [re.IGNORECASE] * len(_DETECT_COMPILED) + [_SCAN_FLAGS] * len(compiled)
+        cache = (compiled, Prefilter(patterns, flags))
+        _PREFILTER_CACHE = cache
+    return cache[1]
+
+
+def scan_all(text: str) -> Dict[str, List[Dict]]:
+    """
+    Scan text for PII, API keys and code vulnerabilities in one pass.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        {"pii": detect_pii(text), "security": scan_code(text)}
+    """
+    if not text:
+        return {"pii": [], "security": []}
+
+    compiled, _ = _get_compiled_patterns()
+    candidates = _combined_prefilter(compiled).candidates(text)
+
+    # Candidate ids are ascending: PII/API key ids come first
+    split = len(_DETECT_COMPILED)
+    return {
+        "pii": _detect_pii(text, [i for i in candidates if i < split]),
+        "security": _scan_code(text, compiled, [i - split for i in candidates if i >= split]),
+    }
@@ -5,28 +5,50 @@ Validates that answers don't go beyond the evidence.
 """
 
 import re
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
-from difflib import SequenceMatcher
+
+from ._sentences import split_sentences
+from ._similarity import ratio
+
+# Words 4+ chars
+_WORD_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+
+_STOPWORDS = frozenset({
+    'this', 'that', 'these', 'those', 'have', 'been', 'were', 'will',
+    'would', 'could', 'should', 'about', 'with', 'from', 'into', 'through',
+    'during', 'before', 'after', 'above', 'below', 'between', 'under',
+    'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where',
+    'which', 'while', 'other', 'some', 'such', 'only', 'same', 'than',
+    'very', 'just', 'also', 'more', 'most', 'being', 'having', 'doing',
+})
+
+
+# Shingle length for find_ungrounded_segments similarity
+_SHINGLE = 5
+
+
+@lru_cache(maxsize=128)
+def _key_terms(text: str) -> frozenset:
+    """Memoized extract_key_terms; the same context is scanned many times per request."""
+    return frozenset(_WORD_RE.findall(text.lower())) - _STOPWORDS
 
 
 def extract_key_terms(text: str) -> set:
     """Extract significant terms from text."""
     if not text:
         return set()
+    return set(_key_terms(text))
 
-    # Extract words 4+ chars, exclude common stopwords
-    words = set(re.findall(r'\b[a-zA-Z]{4,}\b', text.lower()))
 
-    stopwords = {
-        'this', 'that', 'these', 'those', 'have', 'been', 'were', 'will',
-        'would', 'could', 'should', 'about', 'with', 'from', 'into', 'through',
-        'during', 'before', 'after', 'above', 'below', 'between', 'under',
-        'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where',
-        'which', 'while', 'other', 'some', 'such', 'only', 'same', 'than',
-        'very', 'just', 'also', 'more', 'most', 'being', 'having', 'doing',
-    }
+def _shingles(text: str) -> set:
+    """All _SHINGLE-character substrings of text."""
+    return {text[i:i + _SHINGLE] for i in range(len(text) - _SHINGLE + 1)}
 
-    return words - stopwords
+
+@lru_cache(maxsize=16)
+def _context_shingles(context: str) -> frozenset:
+    return frozenset(_shingles(context.lower()))
 
 
 def calculate_grounding_score(response: str, context: str) -> float:
@@ -43,8 +65,14 @@ def calculate_grounding_score(response: str, context: str) -> float:
     if not response or not context:
         return 0.0
 
-    response_terms = extract_key_terms(response)
-    context_terms = extract_key_terms(context)
+    return _grounding_score(response, context)
+
+
+@lru_cache(maxsize=64)
+def _grounding_score(response: str, context: str) -> float:
+    """Memoized calculate_grounding_score for non-empty response and context."""
+    response_terms = _key_terms(response)
+    context_terms = _key_terms(context)
 
     if not response_terms:
         return 1.0  # No specific terms = vacuously grounded
@@ -54,7 +82,7 @@ def calculate_grounding_score(response: str, context: str) -> float:
     coverage = len(overlap) / len(response_terms)
 
     # Sequence similarity for phrases
-    seq_score = SequenceMatcher(None, response.lower(), context.lower()).ratio()
+    seq_score = ratio(response.lower(), context.lower())
 
     # Combined score (weighted)
     score = coverage * 0.7 + seq_score * 0.3
@@ -69,7 +97,7 @@ def find_ungrounded_segments(response: str, context: str, window_size: int = 50)
     Args:
         response: LLM response
         context: Provided context
-        window_size: Size of text windows to check
+        window_size: Length of each sentence's prefix compared against context
 
     Returns:
         List of ungrounded segments
@@ -77,11 +105,19 @@ def find_ungrounded_segments(response: str, context: str, window_size: int = 50)
     if not response or not context:
         return []
 
+    # Copies, so callers cannot change the memoized segments
+    return [dict(segment) for segment in _ungrounded_segments(response, context, window_size)]
+
+
+@lru_cache(maxsize=64)
+def _ungrounded_segments(response: str, context: str, window_size: int) -> tuple:
+    """Memoized find_ungrounded_segments for non-empty response and context."""
     ungrounded = []
-    context_lower = context.lower()
+    context_terms = _key_terms(context)
+    context_shingles = _context_shingles(context)
 
     # Split response into sentences
-    sentences = re.split(r'[.!?]\s+', response)
+    sentences = split_sentences(response)
 
     for i, sentence in enumerate(sentences):
         if len(sentence) < 15:
@@ -90,21 +126,17 @@ def find_ungrounded_segments(response: str, context: str, window_size: int = 50)
         sentence_lower = sentence.lower()
 
         # Check if sentence content appears in context
-        terms = extract_key_terms(sentence)
+        terms = _key_terms(sentence)
 
         if not terms:
             continue
 
-        context_terms = extract_key_terms(context)
         overlap = terms & context_terms
         coverage = len(overlap) / len(terms) if terms else 0
 
-        # Check sequence similarity
-        best_sim = 0.0
-        for j in range(0, len(context) - window_size, window_size // 2):
-            window = context_lower[j:j + window_size]
-            sim = SequenceMatcher(None, sentence_lower[:window_size], window).ratio()
-            best_sim = max(best_sim, sim)
+        # Share of the sentence's shingles found anywhere in context
+        sentence_shingles = _shingles(sentence_lower[:window_size])
+        best_sim = len(sentence_shingles & context_shingles) / max(len(sentence_shingles), 1)
 
         # Ungrounded if low coverage AND low similarity
         if coverage < 0.3 and best_sim < 0.3:
@@ -115,7 +147,7 @@ def find_ungrounded_segments(response: str, context: str, window_size: int = 50)
                 "best_similarity": round(best_sim, 2),
             })
 
-    return ungrounded
+    return tuple(ungrounded)
 
 
 def validate_grounding(
@@ -134,19 +166,32 @@ def validate_grounding(
     Returns:
         Tuple of (is_valid, reason, score)
     """
+    return _validate_grounding(response, context, min_score)
+
+
+def _validate_grounding(
+    response: str,
+    context: str,
+    min_score: float,
+    score: Optional[float] = None,
+    ungrounded: Optional[List[Dict]] = None
+) -> Tuple[bool, str, float]:
+    """validate_grounding, reusing a score and ungrounded segments already computed."""
     if not response:
         return True, "", 1.0
 
     if not context:
         return False, "NO_CONTEXT_PROVIDED", 0.0
 
-    score = calculate_grounding_score(response, context)
+    if score is None:
+        score = calculate_grounding_score(response, context)
 
     if score < min_score:
         return False, "LOW_GROUNDING_SCORE", score
 
     # Check for ungrounded segments
-    ungrounded = find_ungrounded_segments(response, context)
+    if ungrounded is None:
+        ungrounded = find_ungrounded_segments(response, context)
 
     if len(ungrounded) > 3:
         return False, "MULTIPLE_UNGROUNDED_SEGMENTS", score
@@ -172,16 +217,16 @@ def enforce_grounding(
     """
     score = calculate_grounding_score(response, context)
     ungrounded = find_ungrounded_segments(response, context)
-    is_valid, reason, _ = validate_grounding(response, context)
+    is_valid, reason, _ = _validate_grounding(response, context, 0.4, score, ungrounded)
 
     # Check citation coverage if provided
     citation_score = 0.0
     if citations:
         cited_terms = set()
         for cite in citations:
-            cited_terms.update(extract_key_terms(cite))
+            cited_terms.update(_key_terms(cite))
 
-        response_terms = extract_key_terms(response)
+        response_terms = _key_terms(response)
         if response_terms:
             citation_score = len(cited_terms & response_terms) / len(response_terms)
 
@@ -6,7 +6,29 @@ Verifies claims are grounded in provided evidence.
 
 import re
 from typing import List, Dict, Tuple, Set
-from difflib import SequenceMatcher
+
+from ._sentences import split_sentences
+from ._similarity import ratio
+
+# Meta-statements, not claims
+_META_RE = re.compile(
+    r"I |Based on|According to|The evidence|As shown"
+    r"|Let me|I'll |I can|I don't|I cannot"
+    r"|(?:Here|This|That|These|Those)\s+(?:is|are|shows?)",
+    re.IGNORECASE,
+)
+
+# A sentence with any of these contains specific details. Kept as separate
+# patterns: each is found with re's prefix scan, which a union would lose.
+# RE2 and PCRE2 are slower here: their per-call overhead outweighs the
+# matching work on sentence-length input.
+_FACTUAL_PATTERNS = tuple(re.compile(p) for p in (
+    r"\d+",  # Numbers
+    r"(is|are|was|were|has|have|does|do)\s+\w+",  # Assertions
+    r"(will|can|must|should)\s+\w+",  # Predictions
+    r"\"[^\"]+\"",  # Quoted content
+    r"\b(always|never|all|none|every)\b",  # Absolute statements
+))
 
 
 def extract_claims(response: str) -> List[str]:
@@ -25,7 +47,7 @@ def extract_claims(response: str) -> List[str]:
     claims = []
 
     # Split into sentences
-    sentences = re.split(r'[.!?]\s+', response)
+    sentences = split_sentences(response)
 
     for sentence in sentences:
         sentence = sentence.strip()
@@ -33,30 +55,31 @@ def extract_claims(response: str) -> List[str]:
             continue
 
         # Skip meta-statements
-        skip_patterns = [
-            r"^(I |Based on|According to|The evidence|As shown)",
-            r"^(Let me|I'll |I can|I don't|I cannot)",
-            r"^(Here|This|That|These|Those)\s+(is|are|shows?)",
-        ]
-
-        if any(re.match(p, sentence, re.IGNORECASE) for p in skip_patterns):
+        if _META_RE.match(sentence):
             continue
 
         # Detect factual claims (contains specific details)
-        factual_indicators = [
-            r"\d+",  # Numbers
-            r"(is|are|was|were|has|have|does|do)\s+\w+",  # Assertions
-            r"(will|can|must|should)\s+\w+",  # Predictions
-            r"\"[^\"]+\"",  # Quoted content
-            r"\b(always|never|all|none|every)\b",  # Absolute statements
-        ]
-
-        if any(re.search(p, sentence) for p in factual_indicators):
+        if any(p.search(sentence) for p in _FACTUAL_PATTERNS):
             claims.append(sentence)
 
     return claims
 
 
+# Key terms for overlap scoring: words 4+ chars
+_TERM_RE = re.compile(r'\b\w{4,}\b')
+
+
+def _prepare_evidence(evidence: List[str]) -> List[Tuple[str, str, Set[str]]]:
+    """Lowercase and tokenize evidence once: (ev, ev_lower, ev_words) per non-empty item."""
+    prepared = []
+    for ev in evidence:
+        if not ev:
+            continue
+        ev_lower = ev.lower()
+        prepared.append((ev, ev_lower, set(_TERM_RE.findall(ev_lower))))
+    return prepared
+
+
 def check_grounding(claim: str, evidence: List[str], threshold: float = 0.4) -> Tuple[bool, float, str]:
     """
     Check if a claim is grounded in evidence.
@@ -71,29 +94,31 @@ def check_grounding(claim: str, evidence: List[str], threshold: float = 0.4) ->
     """
     if not claim or not evidence:
         return False, 0.0, ""
+    return _check_grounding(claim, _prepare_evidence(evidence), threshold)
 
+
+def _check_grounding(
+    claim: str,
+    evidence: List[Tuple[str, str, Set[str]]],
+    threshold: float
+) -> Tuple[bool, float, str]:
+    """check_grounding against _prepare_evidence() output."""
     claim_lower = claim.lower()
+    claim_words = set(_TERM_RE.findall(claim_lower))
     best_score = 0.0
     best_match = ""
 
-    for ev in evidence:
-        if not ev:
-            continue
-
-        ev_lower = ev.lower()
-
-        # Method 1: Sequence matching
-        seq_score = SequenceMatcher(None, claim_lower, ev_lower).ratio()
-
-        # Method 2: Key term overlap
-        claim_words = set(re.findall(r'\b\w{4,}\b', claim_lower))
-        ev_words = set(re.findall(r'\b\w{4,}\b', ev_lower))
-
+    for ev, ev_lower, ev_words in evidence:
+        # Method 1: Key term overlap (cheap)
         if claim_words:
             overlap = len(claim_words & ev_words) / len(claim_words)
         else:
             overlap = 0.0
 
+        # Method 2: Sequence matching, skipped when its upper bounds show it
+        # cannot beat the overlap score or the best score so far
+        seq_score = ratio(claim_lower, ev_lower, score_cutoff=max(best_score, overlap * 0.8))
+
         # Combined score
         score = max(seq_score, overlap * 0.8)
 
@@ -104,10 +129,36 @@ def check_grounding(claim: str, evidence: List[str], threshold: float = 0.4) ->
     return best_score >= threshold, best_score, best_match
 
 
+def _embedding_grounding(claims: List[str], evidence: List[str], embedder) -> List[Tuple[float, str]]:
+    """
+    Score every claim against every evidence text by cosine similarity.
+
+    Claims and evidence are embedded in one batched encode() call and
+    compared with a single matrix product.
+
+    Returns:
+        (best_score, best_match) per claim, as from check_grounding
+    """
+    evidence = [ev for ev in evidence if ev]
+    if not claims or not evidence:
+        return [(0.0, "")] * len(claims)
+
+    embeddings = embedder.encode(claims + evidence, normalize=True)
+    sims = embeddings[:len(claims)] @ embeddings[len(claims):].T
+    best = sims.argmax(axis=1)
+
+    results = []
+    for i, j in enumerate(best):
+        score = float(sims[i, j])
+        results.append((score, evidence[j][:200]) if score > 0 else (0.0, ""))
+    return results
+
+
 def detect_hallucinations(
     response: str,
     evidence: List[str],
-    strict: bool = False
+    strict: bool = False,
+    embedder=None
 ) -> List[Dict]:
     """
     Detect potential hallucinations in response.
@@ -116,6 +167,9 @@ def detect_hallucinations(
         response: LLM response to check
         evidence: List of evidence/context provided
         strict: If True, use stricter grounding threshold
+        embedder: Optional embedding model with encode(texts, normalize=True),
+            e.g. retrieval.vector_search.EmbeddingProvider; claims are then
+            scored by cosine similarity instead of check_grounding
 
     Returns:
         List of potential hallucinations
@@ -123,15 +177,26 @@ def detect_hallucinations(
     if not response:
         return []
 
-    claims = extract_claims(response)
+    return _detect_hallucinations(extract_claims(response), evidence, strict, embedder)
+
+
+def _detect_hallucinations(claims: List[str], evidence: List[str], strict: bool, embedder) -> List[Dict]:
+    """detect_hallucinations for claims already extracted from the response."""
     threshold = 0.5 if strict else 0.35
 
-    hallucinations = []
+    if embedder is not None:
+        scored = _embedding_grounding(claims, evidence, embedder)
+    elif evidence:
+        # Evidence is tokenized once and shared by every claim
+        prepared = _prepare_evidence(evidence)
+        scored = [_check_grounding(claim, prepared, threshold)[1:] for claim in claims]
+    else:
+        scored = [(0.0, "")] * len(claims)
 
-    for claim in claims:
-        is_grounded, score, match = check_grounding(claim, evidence, threshold)
+    hallucinations = []
 
-        if not is_grounded:
+    for claim, (score, match) in zip(claims, scored):
+        if score < threshold:
             hallucinations.append({
                 "claim": claim[:200],
                 "grounding_score": round(score, 2),
@@ -149,7 +214,8 @@ def should_flag_response(
     response: str,
     evidence: List[str],
     max_hallucinations: int = 2,
-    min_confidence: float = 0.7
+    min_confidence: float = 0.7,
+    embedder=None
 ) -> Tuple[bool, str, List[Dict]]:
     """
     Determine if response should be flagged for hallucinations.
@@ -159,12 +225,22 @@ def should_flag_response(
         evidence: Evidence provided
         max_hallucinations: Max allowed ungrounded claims
         min_confidence: Min confidence to count as hallucination
+        embedder: Optional embedding model (see detect_hallucinations)
 
     Returns:
         Tuple of (should_flag, reason, hallucinations)
     """
-    hallucinations = detect_hallucinations(response, evidence)
+    hallucinations = detect_hallucinations(response, evidence, embedder=embedder)
+    return _flag_response(response, hallucinations, max_hallucinations, min_confidence)
+
 
+def _flag_response(
+    response: str,
+    hallucinations: List[Dict],
+    max_hallucinations: int,
+    min_confidence: float
+) -> Tuple[bool, str, List[Dict]]:
+    """should_flag_response for hallucinations already detected in the response."""
     # Filter by confidence
     high_confidence = [h for h in hallucinations if h["confidence"] >= min_confidence]
 
@@ -186,20 +262,22 @@ def should_flag_response(
     return False, "", hallucinations
 
 
-def get_hallucination_report(response: str, evidence: List[str]) -> Dict:
+def get_hallucination_report(response: str, evidence: List[str], embedder=None) -> Dict:
     """
     Generate hallucination detection report.
 
     Args:
         response: LLM response
         evidence: Evidence provided
+        embedder: Optional embedding model (see detect_hallucinations)
 
     Returns:
         Detailed hallucination report
     """
+    # Claims are extracted and checked once, then shared by every figure
     claims = extract_claims(response)
-    hallucinations = detect_hallucinations(response, evidence)
-    should_flag, reason, _ = should_flag_response(response, evidence)
+    hallucinations = _detect_hallucinations(claims, evidence, False, embedder) if response else []
+    should_flag, reason, _ = _flag_response(response, hallucinations, 2, 0.7)
 
     grounded_count = len(claims) - len(hallucinations)
 
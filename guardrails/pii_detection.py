@@ -5,7 +5,9 @@ Covers: emails, phones, SSN, credit cards, API keys, passwords.
 """
 
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Optional
+
+from ._multiscan import Prefilter, ascii_safe, jit_compile, literal_prefix, prefix_finditer
 
 # PII patterns with named groups
 PII_PATTERNS = {
@@ -60,6 +62,33 @@ SENSITIVITY = {
 }
 
 
+def _compile(pattern: str, flags: int = 0) -> Tuple[re.Pattern, object]:
+    """(re pattern, PCRE2-JIT twin for ascii_safe text, or the re pattern again)."""
+    regex = re.compile(pattern, flags)
+    return regex, jit_compile(pattern, flags) or regex
+
+
+def _prefix(pattern: str) -> Optional[str]:
+    """Lowercased literal prefix of a detect_pii pattern worth searching for, or None."""
+    prefix = literal_prefix(pattern, re.IGNORECASE)
+    # Shorter prefixes occur too often in ordinary text to beat a full scan
+    return prefix if prefix and len(prefix) >= 3 else None
+
+
+# Compiled once at import. detect_pii matches case-insensitively, one
+# (type, category, sensitivity, pattern, fast pattern, literal prefix) entry
+# per pattern; mask_pii has always matched case-sensitively, so it keeps its
+# own compiled set.
+_DETECT_COMPILED = [
+    (name, category, SENSITIVITY.get(name, default), *_compile(p, re.IGNORECASE), _prefix(p))
+    for category, default, patterns in (("PII", "MEDIUM", PII_PATTERNS), ("API_KEY", "HIGH", API_KEY_PATTERNS))
+    for name, p in patterns.items()
+]
+_DETECT_PREFILTER = Prefilter([*PII_PATTERNS.values(), *API_KEY_PATTERNS.values()], re.IGNORECASE)
+_MASK_COMPILED = [_compile(p) for p in (*API_KEY_PATTERNS.values(), *PII_PATTERNS.values())]
+_MASK_PREFILTER = Prefilter([*API_KEY_PATTERNS.values(), *PII_PATTERNS.values()])
+
+
 def detect_pii(text: str) -> List[Dict]:
     """
     Detect PII in text.
@@ -73,32 +102,36 @@ def detect_pii(text: str) -> List[Dict]:
     if not text:
         return []
 
-    findings = []
+    # PII patterns, then API key patterns; with Hyperscan, only those that can match
+    return _detect_pii(text, _DETECT_PREFILTER.candidates(text))
+
 
-    # Check PII patterns
-    for pii_type, pattern in PII_PATTERNS.items():
-        matches = re.finditer(pattern, text, re.IGNORECASE)
+def _detect_pii(text: str, candidates: Iterable[int]) -> List[Dict]:
+    """detect_pii restricted to the _DETECT_COMPILED entries at candidates."""
+    findings = []
+    safe = ascii_safe(text)
+    # Without a PCRE2 twin, patterns with a literal prefix (sk-, AKIA, Bearer,
+    # ...) are only tried where it occurs; lowercasing is exact case folding
+    # only for ASCII text
+    lowered = None
+
+    for i in candidates:
+        pii_type, category, sensitivity, pattern, fast, prefix = _DETECT_COMPILED[i]
+        if prefix and fast is pattern and text.isascii():
+            if lowered is None:
+                lowered = text.lower()
+            matches = prefix_finditer(pattern, prefix, text, lowered)
+        else:
+            matches = (fast if safe else pattern).finditer(text)
         for match in matches:
             findings.append({
                 "type": pii_type,
-                "category": "PII",
-                "sensitivity": SENSITIVITY.get(pii_type, "MEDIUM"),
+                "category": category,
+                "sensitivity": sensitivity,
                 "value": _mask_value(match.group(), pii_type),
                 "position": match.start(),
             })
 
-    # Check API key patterns
-    for key_type, pattern in API_KEY_PATTERNS.items():
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            findings.append({
-                "type": key_type,
-                "category": "API_KEY",
-                "sensitivity": SENSITIVITY.get(key_type, "HIGH"),
-                "value": _mask_value(match.group(), key_type),
-                "position": match.start(),
-            })
-
     # Sort by position
     findings.sort(key=lambda x: x["position"])
     return findings
@@ -142,17 +175,41 @@ def mask_pii(text: str, mask_char: str = "*") -> str:
     if not text:
         return ""
 
-    result = text
-
-    # Mask API keys first (longer patterns)
-    for key_type, pattern in API_KEY_PATTERNS.items():
-        result = re.sub(pattern, lambda m: mask_char * len(m.group()), result)
-
-    # Mask PII
-    for pii_type, pattern in PII_PATTERNS.items():
-        result = re.sub(pattern, lambda m: mask_char * len(m.group()), result)
-
-    return result
+    # Patterns run in order over the progressively masked text, as separate
+    # re.sub calls would: masking one value can create the word boundary a
+    # later pattern needs. The text only changes when a pattern masks
+    # something, so only then is the prefilter re-run.
+    candidates = set(_MASK_PREFILTER.candidates(text))
+    safe = ascii_safe(text)
+    for i, (pattern, fast) in enumerate(_MASK_COMPILED):
+        if i not in candidates:
+            continue
+        spans = [match.span() for match in (fast if safe else pattern).finditer(text)]
+        if spans:
+            text = _mask_spans(text, spans, mask_char)
+            candidates = set(_MASK_PREFILTER.candidates(text))
+            safe = ascii_safe(text)
+    return text
+
+
+def _mask_spans(text: str, spans: List[Tuple[int, int]], mask_char: str) -> str:
+    """text with each character of the ascending, non-overlapping spans replaced by mask_char."""
+    if text.isascii() and len(mask_char) == 1 and mask_char.isascii():
+        # Character offsets are byte offsets: overwrite the matched bytes in place
+        buf = bytearray(text, "ascii")
+        fill = mask_char.encode("ascii")
+        for start, end in spans:
+            buf[start:end] = fill * (end - start)
+        return buf.decode("ascii")
+
+    parts = []
+    pos = 0
+    for start, end in spans:
+        parts.append(text[pos:start])
+        parts.append(mask_char * (end - start))
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
 
 
 def should_block_pii(text: str, allow_emails: bool = False) -> Tuple[bool, str, List[Dict]]:
@@ -5,9 +5,15 @@ Common patterns: instruction override, role hijacking, delimiter abuse.
 """
 
 import re
-from typing import Tuple
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 
-# Known injection patterns (regex)
+from ._multiscan import Prefilter
+
+# Known injection patterns (regex). Each starts with a literal and has no
+# nested quantifiers, so a scan is linear in the text (about 0.1s per MB
+# even for adversarial whitespace runs); keep new patterns that way rather
+# than truncating what is scanned, which would let padding hide a payload.
 INJECTION_PATTERNS = [
     # Instruction override attempts
     (r"ignore\s+(all\s+)?(previous|above|prior)\s+(instructions?|prompts?|rules?)", "INSTRUCTION_OVERRIDE"),
@@ -43,6 +49,34 @@ INJECTION_PATTERNS = [
     (r"eval\s*\(|exec\s*\(", "CODE_EXEC"),
 ]
 
+
+def _lowercase_pattern(pattern: str) -> str:
+    """Lowercase the literal letters of pattern, leaving escapes such as \\S alone."""
+    return re.sub(r"\\.|[A-Z]+", lambda m: m.group() if m.group().startswith("\\") else m.group().lower(), pattern)
+
+
+# Compiled once at import, in INJECTION_PATTERNS order. Patterns run case
+# sensitively over _fold(text): re only uses its fast literal-prefix scan
+# without IGNORECASE, which makes a clean scan several times faster.
+_INJECTION_COMPILED = [(re.compile(_lowercase_pattern(pattern)), reason) for pattern, reason in INJECTION_PATTERNS]
+# One Hyperscan pass (or required-literal check) finds the patterns that can match
+_INJECTION_PREFILTER = Prefilter([pattern.pattern for pattern, _ in _INJECTION_COMPILED])
+
+# Characters re.IGNORECASE matches to an ASCII letter that str.lower() does
+# not map to it (U+0130 would even lowercase to two characters)
+_FOLD = (("\u0130", "i"), ("\u0131", "i"), ("\u017f", "s"), ("\u212a", "k"))
+
+
+def _fold(text: str) -> str:
+    """Lowercase text so lowercase patterns match it exactly as re.IGNORECASE would."""
+    if not text.isascii():
+        # str.replace is much faster than str.translate on non-ASCII text
+        for char, letter in _FOLD:
+            if char in text:
+                text = text.replace(char, letter)
+    return text.lower()
+
+
 # Suspicious character sequences
 SUSPICIOUS_SEQUENCES = [
     ("\x00", "NULL_BYTE"),
@@ -69,46 +103,118 @@ def detect_prompt_injection(text: str, strict: bool = False) -> Tuple[bool, str,
     if not text:
         return False, "", 0.0
 
-    text_lower = text.lower()
+    return _detect_prompt_injection(text, strict)
 
-    # Check suspicious character sequences (high confidence)
+
+@lru_cache(maxsize=128)
+def _detect_prompt_injection(text: str, strict: bool) -> Tuple[bool, str, float]:
+    """Memoized detect_prompt_injection for non-empty text; templates and agent loops repeat prompts."""
+    return _detect(text, strict)
+
+
+def _detect(
+    text: str,
+    strict: bool,
+    folded: Optional[str] = None,
+    candidates: Optional[Sequence[int]] = None
+) -> Tuple[bool, str, float]:
+    """detect_prompt_injection for non-empty text, optionally with its _fold() and prefilter candidates."""
+    # Check suspicious character sequences (high confidence). Substring
+    # tests run at memchr speed; one combined regex search is no faster.
     for seq, reason in SUSPICIOUS_SEQUENCES:
         if seq in text:
             return True, reason, 0.95
 
     # Check regex patterns
-    for pattern, reason in INJECTION_PATTERNS:
-        if re.search(pattern, text_lower, re.IGNORECASE):
+    if folded is None:
+        folded = _fold(text)
+    if candidates is None:
+        candidates = _INJECTION_PREFILTER.candidates(folded)
+    for i in candidates:
+        pattern, reason = _INJECTION_COMPILED[i]
+        if pattern.search(folded):
             confidence = 0.85 if strict else 0.75
             return True, reason, confidence
 
-    # Heuristic checks
-    scores = []
+    # Heuristic checks; keeps the highest score (the first one on ties)
+    reason, confidence = "", 0.0
 
     # Many special delimiters
     delimiter_count = sum(text.count(d) for d in ['```', '"""', "'''", '###', '---'])
     if delimiter_count > 5:
-        scores.append(("EXCESSIVE_DELIMITERS", 0.5 + min(delimiter_count * 0.05, 0.3)))
+        reason, confidence = "EXCESSIVE_DELIMITERS", 0.5 + min(delimiter_count * 0.05, 0.3)
 
     # Unusual capitalization patterns (e.g., "IGNORE ALL")
-    caps_ratio = sum(1 for c in text if c.isupper()) / max(len(text), 1)
-    if caps_ratio > 0.5 and len(text) > 20:
-        scores.append(("CAPS_SHOUTING", 0.4))
+    if confidence < 0.4 and len(text) > 20 and _count_upper(text) / len(text) > 0.5:
+        reason, confidence = "CAPS_SHOUTING", 0.4
 
     # Very long input (potential payload)
-    if len(text) > 10000:
-        scores.append(("EXCESSIVE_LENGTH", 0.3))
+    if confidence < 0.3 and len(text) > 10000:
+        reason, confidence = "EXCESSIVE_LENGTH", 0.3
 
     # Return highest confidence detection
-    if scores:
-        scores.sort(key=lambda x: x[1], reverse=True)
-        reason, confidence = scores[0]
-        if confidence >= (0.6 if strict else 0.7):
-            return True, reason, confidence
+    if reason and confidence >= (0.6 if strict else 0.7):
+        return True, reason, confidence
 
     return False, "", 0.0
 
 
+def detect_prompt_injection_batch(texts: Sequence[str], strict: bool = False) -> List[Tuple[bool, str, float]]:
+    """
+    Detect prompt injection attempts in several texts (e.g. a conversation).
+
+    Same results as detect_prompt_injection on each text, but one prefilter
+    pass over the whole batch picks the patterns worth trying.
+
+    Args:
+        texts: User input texts to analyze
+        strict: If True, use stricter detection (more false positives)
+
+    Returns:
+        List of (is_injection, reason_code, confidence), one per text
+    """
+    folded = [_fold(text) if text else "" for text in texts]
+    # Any pattern matching one text also matches the joined batch (none is
+    # anchored), so its candidates cover every text
+    candidates = _INJECTION_PREFILTER.candidates("\x00".join(folded))
+    return [
+        _detect(text, strict, folded_text, candidates) if text else (False, "", 0.0)
+        for text, folded_text in zip(texts, folded)
+    ]
+
+
+# Every byte except A-Z, deleted to count ASCII capitals in one C pass
+_NOT_ASCII_UPPER = bytes(b for b in range(256) if not 0x41 <= b <= 0x5A)
+_ASCII_RUNS_RE = re.compile(r'[\x00-\x7f]+')
+
+
+def _count_upper(text: str) -> int:
+    """Number of uppercase characters in text."""
+    if text.isascii():
+        return len(text.encode("ascii").translate(None, _NOT_ASCII_UPPER))
+    ascii_text = text.encode("ascii", "ignore")
+    if 2 * len(ascii_text) < len(text):
+        return sum(map(str.isupper, text))
+    # Mostly ASCII: count its capitals in C, and only the rest per character
+    rest = _ASCII_RUNS_RE.sub('', text)
+    return len(ascii_text.translate(None, _NOT_ASCII_UPPER)) + sum(map(str.isupper, rest))
+
+
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+
+# Common delimiters that could be used for injection, and their escapes.
+# Sequential str.replace is kept on purpose: it returns the text itself when
+# a delimiter is absent (no copy), and its search is several times faster
+# than one alternation regex, which has no literal prefix to skip ahead on.
+_DELIMITER_ESCAPES = (
+    ('```system', '` ` `system'),
+    ('[INST]', '[_INST_]'),
+    ('[/INST]', '[/_INST_]'),
+    ('<|im_start|>', '<_im_start_>'),
+    ('<|im_end|>', '<_im_end_>'),
+)
+
+
 def sanitize_input(text: str) -> str:
     """
     Sanitize user input by removing/escaping dangerous patterns.
@@ -124,18 +230,10 @@ def sanitize_input(text: str) -> str:
         return ""
 
     # Remove null bytes and control characters
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
+    text = _CONTROL_CHARS_RE.sub('', text)
 
     # Escape common delimiters that could be used for injection
-    replacements = [
-        ('```system', '` ` `system'),
-        ('[INST]', '[_INST_]'),
-        ('[/INST]', '[/_INST_]'),
-        ('<|im_start|>', '<_im_start_>'),
-        ('<|im_end|>', '<_im_end_>'),
-    ]
-
-    for old, new in replacements:
+    for old, new in _DELIMITER_ESCAPES:
         text = text.replace(old, new)
 
     return text
@@ -163,9 +261,10 @@ def get_injection_report(text: str) -> dict:
 
     # Find all matching patterns for detailed report
     if text:
-        text_lower = text.lower()
-        for pattern, reason_code in INJECTION_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        folded = _fold(text)
+        for i in _INJECTION_PREFILTER.candidates(folded):
+            pattern, reason_code = _INJECTION_COMPILED[i]
+            if pattern.search(folded):
                 report["patterns_matched"].append(reason_code)
 
     return report
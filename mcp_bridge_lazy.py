@@ -4,21 +4,33 @@
 import asyncio
 import json
 import os
+import sys
 import traceback
-from typing import Any
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
 from pathlib import Path
 
 # Debug mode - set AUGMENT_DEBUG=true to expose stack traces
 DEBUG = os.getenv("AUGMENT_DEBUG", "false").lower() == "true"
 
+def _log(message: str) -> None:
+    """Write a diagnostic line to stderr (stdout carries the MCP stream) in one write."""
+    sys.stderr.write(message + "\n")
+
 # Load environment variables from .env file (if exists)
 # This allows using .env for development while still supporting
 # environment variable overrides (e.g., from Claude MCP config)
-try:
-    from dotenv import load_dotenv
-    load_dotenv(override=False)  # Don't override existing env vars
-except ImportError:
-    pass  # python-dotenv not installed, skip
+# load_dotenv() searches upward from this file's directory (from the cwd
+# under a debugger); checking both first lets the usual start without a
+# .env skip importing dotenv at all.
+_DOTENV_DIRS = [Path(os.path.abspath(__file__)).parent, Path(os.path.abspath(os.getcwd()))]
+if any((d / ".env").exists() for start in _DOTENV_DIRS for d in (start, *start.parents)):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(override=False)  # Don't override existing env vars
+    except ImportError:
+        pass  # python-dotenv not installed, skip
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -769,6 +781,7 @@ WHEN TO USE:
             "properties": {
                 "path": {"type": "string", "default": ".", "description": "Directory path"},
                 "recursive": {"type": "boolean", "default": False},
+                "max_depth": {"type": "integer", "description": "Deepest level listed when recursive (1 = direct children; values below 1 are rejected)"},
                 "pattern": {"type": "string", "description": "Glob pattern filter (e.g., '*.py')"},
                 "project": {"type": "string", "default": "auto"}
             },
@@ -791,12 +804,69 @@ WHEN TO USE:
             "required": ["pattern"]
         },
     ),
+    Tool(
+        name="batch.execute",
+        description="""Run several tool calls in one request.
+
+WHEN TO USE:
+• Chaining calls such as rag.search → answer.generate → memory.set
+• Many independent lookups (file.read, code.find_symbol, ...)
+
+Operations run one after another, in list order, so a later one
+sees the effects of earlier ones. Returns one result per operation.""",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "operations": {
+                    "type": "array",
+                    "description": "Tool calls to run",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string", "description": "Tool name (e.g. 'rag.search')"},
+                            "args": {"type": "object", "description": "Tool arguments"}
+                        },
+                        "required": ["name"]
+                    }
+                },
+                "stopOnError": {"type": "boolean", "default": False, "description": "Skip the operations after the first one that fails"}
+            },
+            "required": ["operations"]
+        },
+    ),
 ]
 
 @server.list_tools()
 async def _list_tools() -> list[Tool]:
     return TOOLS
 
+@lru_cache(maxsize=64)
+def _count_lines(path: str, mtime_ns: int, size: int) -> int:
+    """
+    Number of lines in a chunks file; mtime and size key the cache, so
+    unchanged files are not rescanned on every resources/list.
+
+    Chunk files are JSON lines, whose only line break is \n.
+    """
+    lines = 0
+    last = b""
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last and last != b"\n":
+        lines += 1  # final line without a newline
+    return lines
+
+def _chunks_count(proj_name: str) -> int:
+    """Lines in a project's chunks file, 0 when it does not exist."""
+    chunks_file = DATA_DIR / f"chunks_{proj_name}.jsonl"
+    try:
+        st = chunks_file.stat()
+    except OSError:
+        return 0
+    return _count_lines(str(chunks_file), st.st_mtime_ns, st.st_size)
+
 @server.list_resources()
 async def _list_resources() -> list[dict[str, Any]]:
     """
@@ -812,15 +882,17 @@ async def _list_resources() -> list[dict[str, Any]]:
         from utils.project_utils import get_all_projects
         from memory.longterm import list_mem
 
-        # Expose registered projects as resources
+        # Expose registered projects as resources; their chunk files are
+        # counted in worker threads, so the disk reads overlap
         projects = get_all_projects()
-        for proj_name, proj_info in projects.items():
+        counts = await asyncio.gather(
+            *(asyncio.to_thread(_chunks_count, proj_name) for proj_name in projects),
+            return_exceptions=True,
+        )
+        for (proj_name, proj_info), chunks_count in zip(projects.items(), counts):
+            if isinstance(chunks_count, BaseException):
+                raise chunks_count
             root = proj_info.get("root", "")
-            chunks_file = DATA_DIR / f"chunks_{proj_name}.jsonl"
-            chunks_count = 0
-            if chunks_file.exists():
-                with open(chunks_file) as f:
-                    chunks_count = sum(1 for _ in f)
 
             resources.append(Resource(
                 uri=f"project://{proj_name}",
@@ -831,7 +903,7 @@ async def _list_resources() -> list[dict[str, Any]]:
 
         # Expose memory as a resource
         try:
-            mem_items = list_mem(project="auto")
+            mem_items = await asyncio.to_thread(list_mem, project="auto")
             mem_count = len(mem_items)
             if mem_count > 0:
                 resources.append(Resource(
@@ -855,8 +927,7 @@ async def _list_resources() -> list[dict[str, Any]]:
 
     except Exception as e:
         # If something fails, still return partial results
-        import sys
-        print(f"[WARN] Error listing resources: {e}", file=sys.stderr)
+        _log(f"[WARN] Error listing resources: {e}")
 
     return resources
 
@@ -897,796 +968,892 @@ async def _read_resource(uri: str) -> str:
 
     return json.dumps({"error": "Unknown resource URI"})
 
-def _lazy_engine():
-    """Import heavy deps only when needed."""
-    # 全部延後到這裡才 import（避免啟動逾時）
+# Import heavy deps only when needed (全部延後到這裡才 import，避免啟動逾時).
+# One cached group per tool family, so e.g. task.list never loads the search/LLM stack.
+
+@lru_cache(maxsize=None)
+def _search_engine() -> SimpleNamespace:
+    """Retrieval stack: hybrid BM25+vector search, subagent filter, iterative search."""
     from retrieval.search import hybrid_search, evidence_fingerprints_for_hits
-    from providers.registry import get_provider, chat  # 會讀 config/models.yaml（已改成絕對路徑）
-    from router import pick_route, get_route_config
-    from cache import make_key, get as cache_get, set as cache_set
-    from guardrails.abstain import should_abstain
-    from memory.longterm import get_mem, set_mem, delete_mem, list_mem
-    from tokenizer import estimate_tokens_from_messages
-    from memory.tasks import TaskManager
     from retrieval.subagent_filter import hybrid_search_with_subagent
     from retrieval.iterative_search import iterative_search, should_use_iterative_search
-    from guardrails.abstain import get_abstain_reason, suggest_query_improvements
-    from utils.project_utils import (
-        get_project_status, auto_register_project, set_active_project,
-        has_bm25_index, clear_cache, clear_memory, get_active_project,
-        is_project_registered
+    return SimpleNamespace(
+        hybrid_search=hybrid_search,
+        hybrid_search_with_subagent=hybrid_search_with_subagent,
+        iterative_search=iterative_search,
+        should_use_iterative_search=should_use_iterative_search,
+        evidence_fingerprints_for_hits=evidence_fingerprints_for_hits,
     )
-    return {
-        "hybrid_search": hybrid_search,
-        "hybrid_search_with_subagent": hybrid_search_with_subagent,
-        "iterative_search": iterative_search,
-        "should_use_iterative_search": should_use_iterative_search,
-        "evidence_fingerprints_for_hits": evidence_fingerprints_for_hits,
-        "get_provider": get_provider,
-        "chat": chat,
-        "pick_route": pick_route,
-        "get_route_config": get_route_config,
-        "make_key": make_key,
-        "cache_get": cache_get,
-        "cache_set": cache_set,
-        "should_abstain": should_abstain,
-        "get_abstain_reason": get_abstain_reason,
-        "suggest_query_improvements": suggest_query_improvements,
-        "get_mem": get_mem,
-        "set_mem": set_mem,
-        "delete_mem": delete_mem,
-        "list_mem": list_mem,
-        "estimate_tokens_from_messages": estimate_tokens_from_messages,
-        "TaskManager": TaskManager,
-        "get_project_status": get_project_status,
-        "auto_register_project": auto_register_project,
-        "set_active_project": set_active_project,
-        "has_bm25_index": has_bm25_index,
-        "clear_cache": clear_cache,
-        "clear_memory": clear_memory,
-        "get_active_project": get_active_project,
-        "is_project_registered": is_project_registered,
-    }
-
-@server.call_tool()
-async def _call_tool(name: str, arguments: dict[str, Any] | None) -> dict[str, Any]:
-    args = arguments or {}
-
-    # 延遲載入
-    E = _lazy_engine()
-
-    if name == "rag.search":
-        q = str(args.get("query", ""))
-        k = int(args.get("k", 8))
-        use_subagent = bool(args.get("use_subagent", True))
-        use_iterative = bool(args.get("use_iterative", False))
-        auto_index = bool(args.get("auto_index", True))  # NEW: Enable auto-indexing by default
-
-        # AUTO-INCREMENTAL INDEXING (acemcp-style)
-        if auto_index:
-            try:
-                import sys
-                from retrieval.incremental_indexer import auto_index_if_needed
-                from utils.project_utils import resolve_auto_project, get_project_status, load_projects, save_projects
-
-                # Resolve project
-                project_name = resolve_auto_project()
-
-                # AUTO-INIT: If no project registered for current directory, auto-init it
-                if not project_name and cwd:
-                    cwd_path = Path(cwd).resolve()
-                    # Use directory name as project name (sanitized)
-                    import re
-                    raw_name = cwd_path.name
-                    # Sanitize: only alphanumeric, underscore, hyphen
-                    project_name = re.sub(r'[^a-zA-Z0-9_-]', '-', raw_name)
-
-                    print(f"[AUTO-INIT] Project not registered, auto-initializing: {project_name}", file=sys.stderr)
-
-                    # Register project
-                    import hashlib
-                    projects = load_projects()
-                    project_id = hashlib.md5(str(cwd_path).encode()).hexdigest()[:8]
-                    projects[project_name] = {
-                        "id": project_id,
-                        "root": str(cwd_path),
-                        "db": f"data/corpus_{project_name}.duckdb",
-                        "chunks": f"data/chunks_{project_name}.jsonl",
-                        "active": True,
-                    }
-                    # Deactivate other projects
-                    for name in projects:
-                        if name != project_name:
-                            projects[name]["active"] = False
-                    save_projects(projects)
-                    print(f"[AUTO-INIT] Registered project: {project_name} -> {cwd_path}", file=sys.stderr)
-
-                if project_name:
-                    status = get_project_status(project_name)
-                    project_root = status.get("root")
-
-                    if project_root:
-                        # Auto-detect and index changes
-                        stats = auto_index_if_needed(project_name, project_root)
-
-                        if stats:
-                            print(f"[AUTO-INDEX] Updated index: +{stats['chunks_added']} -{stats['chunks_removed']} ={stats['chunks_total']} total",
-                                  file=sys.stderr)
-                    else:
-                        print(f"[AUTO-INDEX] Project {project_name} not found, skipping auto-index", file=sys.stderr)
-                else:
-                    print(f"[AUTO-INDEX] No active project and no cwd, skipping auto-index", file=sys.stderr)
-
-            except Exception as e:
-                # Don't fail search if auto-index fails
-                print(f"[WARN] Auto-index failed: {e}", file=sys.stderr)
-
-        # Auto-enable iterative search for complex queries
-        if not use_iterative and E["should_use_iterative_search"](q, task_type="lookup"):
-            use_iterative = True
-
-        # Execute search based on mode
-        if use_iterative:
-            hits = E["iterative_search"](q, k_per_iteration=k, use_subagent=use_subagent, project="auto")
-        elif use_subagent:
-            hits = E["hybrid_search_with_subagent"](q, k=k, use_subagent=True, project="auto")
-        else:
-            hits = E["hybrid_search"](q, k=k, project="auto")
-
-        return {"ok": True, "hits": hits}
-
-    if name == "dual.search":
-        from retrieval.dual_search import dual_search
-        q = str(args.get("query", ""))
-        k = int(args.get("k", 8))
-        use_subagent = bool(args.get("use_subagent", True))
-        use_iterative = bool(args.get("use_iterative", False))
-        include_auggie = bool(args.get("include_auggie", True))
-        auto_rebuild = bool(args.get("auto_rebuild", True))
-        result = dual_search(
-            query=q,
-            k=k,
-            use_subagent=use_subagent,
-            use_iterative=use_iterative,
-            include_auggie=include_auggie,
-            auto_rebuild=auto_rebuild,
-            project="auto"
-        )
-        return result
-
-    if name == "memory.get":
-        key = str(args.get("key", ""))
-        project = args.get("project", "auto")
-        val = E["get_mem"](key, project=project)
-        return {"ok": True, "value": val, "project": project}
-
-    if name == "memory.set":
-        key = str(args.get("key", ""))
-        value = str(args.get("value", ""))
-        project = args.get("project", "auto")
-        E["set_mem"](key, value, project=project)
-        return {"ok": True, "project": project}
-
-    if name == "memory.delete":
-        key = str(args.get("key", ""))
-        project = args.get("project", "auto")
-        E["delete_mem"](key, project=project)
-        return {"ok": True, "message": f"Deleted key: {key}", "project": project}
-
-    if name == "memory.list":
-        project = args.get("project", "auto")
-        items = E["list_mem"](project=project)
-        # Convert to list of dicts for better JSON output
-        result = [{"key": k, "value": v, "updated_at": updated_at} for k, v, updated_at in items]
-        return {"ok": True, "items": result, "count": len(result), "project": project}
-
-    if name == "task.add":
-        project = args.get("project", "auto")
-        tm = E["TaskManager"](project=project)
-        task_id = tm.add_task(
-            title=str(args.get("title", "")),
-            description=str(args.get("description", "")),
-            priority=int(args.get("priority", 0)),
-            parent_id=args.get("parent_id")
-        )
-        return {"ok": True, "task_id": task_id, "project": project}
-
-    if name == "task.list":
-        project = args.get("project", "auto")
-        tm = E["TaskManager"](project=project)
-        tasks = tm.list_tasks(
-            status=args.get("status"),
-            parent_id=args.get("parent_id")
-        )
-        return {"ok": True, "tasks": tasks, "count": len(tasks)}
-
-    if name == "task.get":
-        project = args.get("project", "auto")
-        tm = E["TaskManager"](project=project)
-        task = tm.get_task(int(args.get("task_id", 0)))
-        if task:
-            return {"ok": True, "task": task}
-        else:
-            return {"ok": False, "error": "Task not found"}
-
-    if name == "task.update":
-        project = args.get("project", "auto")
-        tm = E["TaskManager"](project=project)
-        success = tm.update_task(
-            task_id=int(args.get("task_id", 0)),
-            title=args.get("title"),
-            description=args.get("description"),
-            status=args.get("status"),
-            priority=args.get("priority")
-        )
-        if success:
-            task = tm.get_task(int(args.get("task_id", 0)))
-            return {"ok": True, "task": task}
-        else:
-            return {"ok": False, "error": "Task not found or update failed"}
 
-    if name == "task.delete":
-        project = args.get("project", "auto")
-        tm = E["TaskManager"](project=project)
-        success = tm.delete_task(
-            task_id=int(args.get("task_id", 0)),
-            delete_subtasks=bool(args.get("delete_subtasks", False))
-        )
-        return {"ok": success}
-
-    if name == "task.current":
-        project = args.get("project", "auto")
-        tm = E["TaskManager"](project=project)
-        task = tm.get_current_task()
-        if task:
-            return {"ok": True, "task": task}
-        else:
-            return {"ok": True, "task": None, "message": "No in-progress tasks"}
-
-    if name == "task.resume":
-        project = args.get("project", "auto")
-        tm = E["TaskManager"](project=project)
-        task = tm.resume_task(int(args.get("task_id", 0)))
-        if task:
-            return {"ok": True, "task": task}
-        else:
-            return {"ok": False, "error": "Task not found"}
-
-    if name == "task.stats":
-        project = args.get("project", "auto")
-        tm = E["TaskManager"](project=project)
-        stats = tm.get_stats()
-        return {"ok": True, "stats": stats}
-
-    if name == "answer.generate":
-        query = str(args.get("query", ""))
-        task = str(args.get("task_type", "lookup"))
-        route_override = str(args.get("route", "auto"))
-        temperature = float(args.get("temperature", 0.2))
-
-        # Use enhanced search with subagent filtering
-        # Automatically use iterative search for complex tasks
-        use_iterative = E["should_use_iterative_search"](query, task_type=task)
-
-        if use_iterative:
-            hits = E["iterative_search"](query, k_per_iteration=8, use_subagent=True, project="auto")[:5]
-        else:
-            hits = E["hybrid_search_with_subagent"](query, k=8, use_subagent=True, project="auto")[:5]
-
-        # Enhanced abstain check - concise error codes for LLM
-        if E["should_abstain"](hits, min_diversity=2):
-            error_code = E["get_abstain_reason"](hits, min_diversity=2)
-            E["suggest_query_improvements"](query, hits)  # Logs to stderr only
-            return {"ok": True, "answer": f"Search failed: {error_code}", "citations": [], "abstained": True}
-
-        system = ("你只能根據 Evidence 回答；每個關鍵結論後面附【source:<file:line>|<url#heading>】。"
-                  "若證據不足請明確說不知道，並列出需要的檔案或關鍵字。")
-        evidence = "\n\n".join([f"[{h['source']}]\n{h['text']}" for h in hits])
-        messages = [
-            {"role": "system", "content": system},
-            {"role": "user", "content": f"# Query\n{query}\n\n# Evidence\n{evidence}"},
-        ]
-
-        total_tokens_est = E["estimate_tokens_from_messages"](messages)
-
-        # Get route config (includes model and max_output_tokens)
-        route_config = E["get_route_config"](task, total_tokens_est, route_override=route_override)
-        model_alias = route_config["model"]
-        max_output_tokens = route_config["max_output_tokens"]
-
-        ev_fp = E["evidence_fingerprints_for_hits"](hits)
-        key = E["make_key"](
-            model=model_alias,
-            messages=messages,
-            extra={"temperature": temperature, "task": task, "route": route_override, "token_est": total_tokens_est},
-            evidence_fingerprints=ev_fp,
-            project="auto",  # Use active project for cache
-        )
-        cached = E["cache_get"](key)
-        if cached:
-            return {"ok": True, **cached, "cached": True}
-
-        provider = E["get_provider"](model_alias)
-        answer = E["chat"](provider, messages, temperature=temperature, seed=7, max_output_tokens=max_output_tokens)
-        payload = {"answer": answer, "citations": [h["source"] for h in hits]}
-        E["cache_set"](key, payload, ttl_sec=7200)
-        return {"ok": True, **payload, "cached": False}
-
-    if name == "answer.accumulated":
-        from retrieval.accumulated_answer import generate_accumulated_answer
-        query = str(args.get("query", ""))
-        sub_queries = args.get("sub_queries")  # Optional list
-        k_per_query = int(args.get("k_per_query", 5))
-        route = str(args.get("route", "reason-large"))
-        temperature = float(args.get("temperature", 0.2))
-        result = generate_accumulated_answer(
-            query=query,
-            sub_queries=sub_queries,
-            k_per_query=k_per_query,
-            route=route,
-            temperature=temperature,
-            project="auto"
-        )
-        return result
-
-    if name == "answer.unified":
-        from retrieval.unified_orchestrator import create_execution_plan
-        query = str(args.get("query", ""))
-        sub_queries = args.get("sub_queries")  # Optional list
-        include_auggie = bool(args.get("include_auggie", True))
-        route = str(args.get("route", "reason-large"))
-        plan = create_execution_plan(
-            query=query,
-            sub_queries=sub_queries,
-            include_auggie=include_auggie,
-            route=route
-        )
-        return plan
+@lru_cache(maxsize=None)
+def _llm_engine() -> SimpleNamespace:
+    """Answer generation: providers, routing, response cache, abstain checks."""
+    from providers.registry import get_provider, chat  # 會讀 config/models.yaml（已改成絕對路徑）
+    from router import get_route_config
+    from cache import make_key, get as cache_get, set as cache_set
+    from guardrails.abstain import should_abstain, get_abstain_reason, suggest_query_improvements
+    from tokenizer import estimate_tokens_from_messages
+    return SimpleNamespace(
+        get_provider=get_provider,
+        chat=chat,
+        get_route_config=get_route_config,
+        make_key=make_key,
+        cache_get=cache_get,
+        cache_set=cache_set,
+        should_abstain=should_abstain,
+        get_abstain_reason=get_abstain_reason,
+        suggest_query_improvements=suggest_query_improvements,
+        estimate_tokens_from_messages=estimate_tokens_from_messages,
+    )
 
-    # Project Management Tools
-    if name == "project.status":
-        project = args.get("project", "auto")
-        # Direct import to avoid E dictionary issues
-        from utils.project_utils import get_project_status
-        status = get_project_status(project)
-        return {"ok": True, "status": status}
+@lru_cache(maxsize=None)
+def _memory_engine() -> SimpleNamespace:
+    """Long-term memory store."""
+    from memory.longterm import get_mem, set_mem, delete_mem, list_mem
+    return SimpleNamespace(get_mem=get_mem, set_mem=set_mem, delete_mem=delete_mem, list_mem=list_mem)
 
-    if name == "project.init":
-        import subprocess
-        import sys
-        from utils.validators import validate_project_path, validate_project_name
+@lru_cache(maxsize=None)
+def _task_engine() -> SimpleNamespace:
+    """Task tracking."""
+    from memory.tasks import TaskManager
+    return SimpleNamespace(TaskManager=TaskManager)
 
-        project = args.get("project", "auto")
-        build_vector = bool(args.get("build_vector", True))
+# Tool name -> handler(args); filled by @_register at import
+_HANDLERS: dict[str, Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]] = {}
 
-        # Get current working directory as project root
-        cwd = os.getcwd()
+def _register(name: str):
+    """Register the decorated coroutine as the handler of tool `name`."""
+    def decorator(func):
+        _HANDLERS[name] = func
+        return func
+    return decorator
 
-        # Validate path (security: prevent command injection)
-        try:
-            validated_cwd = validate_project_path(cwd)
-            cwd = str(validated_cwd)
-        except ValueError as e:
-            return {"ok": False, "error": f"Invalid project path: {e}"}
+def _registry_mtime_ns() -> int:
+    """mtime of the project registry (data/projects.json), 0 if it does not exist."""
+    from utils.project_utils import PROJECTS_CONFIG
+    try:
+        return os.stat(PROJECTS_CONFIG).st_mtime_ns
+    except OSError:
+        return 0
 
-        # Auto-detect project name if needed
-        if project == "auto":
-            project = Path(cwd).name
+@lru_cache(maxsize=4)
+def _auto_project(cwd: str, registry_mtime_ns: int) -> tuple[str | None, str | None]:
+    """
+    (project name, root) that 'auto' resolves to from cwd.
 
-        # Validate project name (security: prevent injection)
+    Reads only the registry, unlike get_project_status (which also counts
+    chunks, cache and memory). Keyed on the registry's mtime, so back-to-back
+    searches reuse it and any registry write invalidates it.
+    """
+    from utils.project_utils import resolve_auto_project, load_projects
+    project_name = resolve_auto_project()
+    if not project_name:
+        return None, None
+    return project_name, load_projects().get(project_name, {}).get("root")
+
+@_register("rag.search")
+async def _handle_rag_search(args: dict[str, Any]) -> dict[str, Any]:
+    S = _search_engine()
+    q = str(args.get("query", ""))
+    k = int(args.get("k", 8))
+    use_subagent = bool(args.get("use_subagent", True))
+    use_iterative = bool(args.get("use_iterative", False))
+    auto_index = bool(args.get("auto_index", True))  # NEW: Enable auto-indexing by default
+
+    # AUTO-INCREMENTAL INDEXING (acemcp-style)
+    if auto_index:
         try:
-            project = validate_project_name(project, allow_auto=False)
-        except ValueError as e:
-            return {"ok": False, "error": f"Invalid project name: {e}"}
-
-        # Direct import to avoid E dictionary issues
-        from utils.project_utils import auto_register_project, has_bm25_index, get_project_status
-
-        # Register project
-        if not auto_register_project(project, cwd):
-            return {
-                "ok": False,
-                "error": f"Invalid project directory: {cwd}",
-                "suggestion": "Ensure directory contains code files"
-            }
-
-        # Build BM25 index
-        if not has_bm25_index(project):
-            build_script = BASE / "retrieval" / "build_index.py"
-            projects = get_project_status(project)
-
-            # Use DATA_DIR for consistent storage location
-            db_path = DATA_DIR / f"corpus_{project}.duckdb"
-            chunks_path = DATA_DIR / f"chunks_{project}.jsonl"
-
-            cmd = [
-                sys.executable,
-                str(build_script),
-                "--root", cwd,
-                "--db", str(db_path),
-                "--chunks", str(chunks_path),
-            ]
-
-            try:
-                # Run in MCP server directory context
-                subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=str(BASE))
-            except subprocess.CalledProcessError as e:
-                return {
-                    "ok": False,
-                    "error": f"Failed to build BM25 index: {e}",
-                    "stderr": e.stderr if e.stderr else ""
+            from retrieval.incremental_indexer import auto_index_if_needed
+            from utils.project_utils import load_projects, save_projects
+
+            # Resolve project (cached until the cwd or the project registry changes)
+            cwd = os.getcwd()
+            project_name, project_root = _auto_project(cwd, _registry_mtime_ns())
+
+            # AUTO-INIT: If no project registered for current directory, auto-init it
+            if not project_name and cwd:
+                cwd_path = Path(cwd).resolve()
+                # Use directory name as project name (sanitized)
+                import re
+                raw_name = cwd_path.name
+                # Sanitize: only alphanumeric, underscore, hyphen
+                project_name = re.sub(r'[^a-zA-Z0-9_-]', '-', raw_name)
+
+                _log(f"[AUTO-INIT] Project not registered, auto-initializing: {project_name}")
+
+                # Register project
+                import hashlib
+                projects = load_projects()
+                project_id = hashlib.md5(str(cwd_path).encode()).hexdigest()[:8]
+                projects[project_name] = {
+                    "id": project_id,
+                    "root": str(cwd_path),
+                    "db": f"data/corpus_{project_name}.duckdb",
+                    "chunks": f"data/chunks_{project_name}.jsonl",
+                    "active": True,
                 }
+                # Deactivate other projects
+                for name in projects:
+                    if name != project_name:
+                        projects[name]["active"] = False
+                save_projects(projects)
+                project_root = str(cwd_path)
+                _log(f"[AUTO-INIT] Registered project: {project_name} -> {cwd_path}")
+
+            if project_name:
+                if project_root:
+                    # Auto-detect and index changes
+                    stats = auto_index_if_needed(project_name, project_root)
+
+                    if stats:
+                        _log(f"[AUTO-INDEX] Updated index: +{stats['chunks_added']} -{stats['chunks_removed']} ={stats['chunks_total']} total")
+                else:
+                    _log(f"[AUTO-INDEX] Project {project_name} not found, skipping auto-index")
+            else:
+                _log(f"[AUTO-INDEX] No active project and no cwd, skipping auto-index")
 
-        # Build vector index if requested and dependencies available
-        vector_build_error = None
-        if build_vector:
-            try:
-                import faiss
-                import sentence_transformers
-
-                build_vector_script = BASE / "retrieval" / "build_vector_index.py"
-                cmd = [sys.executable, str(build_vector_script), "--project", project]
-
-                # Run in MCP server directory context
-                result = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=str(BASE))
-                if result.returncode != 0:
-                    vector_build_error = f"Vector index build failed: {result.stderr}"
-            except ImportError as e:
-                vector_build_error = f"Vector dependencies not installed: {e}"
-            except subprocess.CalledProcessError as e:
-                vector_build_error = f"Failed to build vector index: {e.stderr if e.stderr else str(e)}"
-            except Exception as e:
-                vector_build_error = f"Unexpected error building vector index: {str(e)}"
-
-        # Set as active project
-        from utils.project_utils import set_active_project
-        set_active_project(project)
+        except Exception as e:
+            # Don't fail search if auto-index fails
+            _log(f"[WARN] Auto-index failed: {e}")
+
+    # Auto-enable iterative search for complex queries
+    if not use_iterative and S.should_use_iterative_search(q, task_type="lookup"):
+        use_iterative = True
+
+    # Execute search based on mode
+    if use_iterative:
+        hits = S.iterative_search(q, k_per_iteration=k, use_subagent=use_subagent, project="auto")
+    elif use_subagent:
+        hits = S.hybrid_search_with_subagent(q, k=k, use_subagent=True, project="auto")
+    else:
+        hits = S.hybrid_search(q, k=k, project="auto")
+
+    return {"ok": True, "hits": hits}
+
+@_register("dual.search")
+async def _handle_dual_search(args: dict[str, Any]) -> dict[str, Any]:
+    from retrieval.dual_search import dual_search
+    q = str(args.get("query", ""))
+    k = int(args.get("k", 8))
+    use_subagent = bool(args.get("use_subagent", True))
+    use_iterative = bool(args.get("use_iterative", False))
+    include_auggie = bool(args.get("include_auggie", True))
+    auto_rebuild = bool(args.get("auto_rebuild", True))
+    result = dual_search(
+        query=q,
+        k=k,
+        use_subagent=use_subagent,
+        use_iterative=use_iterative,
+        include_auggie=include_auggie,
+        auto_rebuild=auto_rebuild,
+        project="auto"
+    )
+    return result
+
+@_register("memory.get")
+async def _handle_memory_get(args: dict[str, Any]) -> dict[str, Any]:
+    M = _memory_engine()
+    key = str(args.get("key", ""))
+    project = args.get("project", "auto")
+    val = M.get_mem(key, project=project)
+    return {"ok": True, "value": val, "project": project}
+
+@_register("memory.set")
+async def _handle_memory_set(args: dict[str, Any]) -> dict[str, Any]:
+    M = _memory_engine()
+    key = str(args.get("key", ""))
+    value = str(args.get("value", ""))
+    project = args.get("project", "auto")
+    M.set_mem(key, value, project=project)
+    return {"ok": True, "project": project}
+
+@_register("memory.delete")
+async def _handle_memory_delete(args: dict[str, Any]) -> dict[str, Any]:
+    M = _memory_engine()
+    key = str(args.get("key", ""))
+    project = args.get("project", "auto")
+    M.delete_mem(key, project=project)
+    return {"ok": True, "message": f"Deleted key: {key}", "project": project}
+
+@_register("memory.list")
+async def _handle_memory_list(args: dict[str, Any]) -> dict[str, Any]:
+    M = _memory_engine()
+    project = args.get("project", "auto")
+    items = M.list_mem(project=project)
+    # Convert to list of dicts for better JSON output
+    result = [{"key": k, "value": v, "updated_at": updated_at} for k, v, updated_at in items]
+    return {"ok": True, "items": result, "count": len(result), "project": project}
+
+@_register("task.add")
+async def _handle_task_add(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    tm = _task_engine().TaskManager(project=project)
+    task_id = tm.add_task(
+        title=str(args.get("title", "")),
+        description=str(args.get("description", "")),
+        priority=int(args.get("priority", 0)),
+        parent_id=args.get("parent_id")
+    )
+    return {"ok": True, "task_id": task_id, "project": project}
+
+@_register("task.list")
+async def _handle_task_list(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    tm = _task_engine().TaskManager(project=project)
+    tasks = tm.list_tasks(
+        status=args.get("status"),
+        parent_id=args.get("parent_id")
+    )
+    return {"ok": True, "tasks": tasks, "count": len(tasks)}
+
+@_register("task.get")
+async def _handle_task_get(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    tm = _task_engine().TaskManager(project=project)
+    task = tm.get_task(int(args.get("task_id", 0)))
+    if task:
+        return {"ok": True, "task": task}
+    else:
+        return {"ok": False, "error": "Task not found"}
+
+@_register("task.update")
+async def _handle_task_update(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    tm = _task_engine().TaskManager(project=project)
+    success = tm.update_task(
+        task_id=int(args.get("task_id", 0)),
+        title=args.get("title"),
+        description=args.get("description"),
+        status=args.get("status"),
+        priority=args.get("priority")
+    )
+    if success:
+        task = tm.get_task(int(args.get("task_id", 0)))
+        return {"ok": True, "task": task}
+    else:
+        return {"ok": False, "error": "Task not found or update failed"}
+
+@_register("task.delete")
+async def _handle_task_delete(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    tm = _task_engine().TaskManager(project=project)
+    success = tm.delete_task(
+        task_id=int(args.get("task_id", 0)),
+        delete_subtasks=bool(args.get("delete_subtasks", False))
+    )
+    return {"ok": success}
+
+@_register("task.current")
+async def _handle_task_current(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    tm = _task_engine().TaskManager(project=project)
+    task = tm.get_current_task()
+    if task:
+        return {"ok": True, "task": task}
+    else:
+        return {"ok": True, "task": None, "message": "No in-progress tasks"}
+
+@_register("task.resume")
+async def _handle_task_resume(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    tm = _task_engine().TaskManager(project=project)
+    task = tm.resume_task(int(args.get("task_id", 0)))
+    if task:
+        return {"ok": True, "task": task}
+    else:
+        return {"ok": False, "error": "Task not found"}
+
+@_register("task.stats")
+async def _handle_task_stats(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    tm = _task_engine().TaskManager(project=project)
+    stats = tm.get_stats()
+    return {"ok": True, "stats": stats}
+
+@_register("answer.generate")
+async def _handle_answer_generate(args: dict[str, Any]) -> dict[str, Any]:
+    S = _search_engine()
+    L = _llm_engine()
+    query = str(args.get("query", ""))
+    task = str(args.get("task_type", "lookup"))
+    route_override = str(args.get("route", "auto"))
+    temperature = float(args.get("temperature", 0.2))
+
+    # Use enhanced search with subagent filtering
+    # Automatically use iterative search for complex tasks
+    use_iterative = S.should_use_iterative_search(query, task_type=task)
+
+    if use_iterative:
+        hits = S.iterative_search(query, k_per_iteration=8, use_subagent=True, project="auto")[:5]
+    else:
+        hits = S.hybrid_search_with_subagent(query, k=8, use_subagent=True, project="auto")[:5]
+
+    # Enhanced abstain check - concise error codes for LLM
+    if L.should_abstain(hits, min_diversity=2):
+        error_code = L.get_abstain_reason(hits, min_diversity=2)
+        L.suggest_query_improvements(query, hits)  # Logs to stderr only
+        return {"ok": True, "answer": f"Search failed: {error_code}", "citations": [], "abstained": True}
+
+    system = ("你只能根據 Evidence 回答；每個關鍵結論後面附【source:<file:line>|<url#heading>】。"
+              "若證據不足請明確說不知道，並列出需要的檔案或關鍵字。")
+    evidence = "\n\n".join([f"[{h['source']}]\n{h['text']}" for h in hits])
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": f"# Query\n{query}\n\n# Evidence\n{evidence}"},
+    ]
+
+    total_tokens_est = L.estimate_tokens_from_messages(messages)
+
+    # Get route config (includes model and max_output_tokens)
+    route_config = L.get_route_config(task, total_tokens_est, route_override=route_override)
+    model_alias = route_config["model"]
+    max_output_tokens = route_config["max_output_tokens"]
+
+    ev_fp = S.evidence_fingerprints_for_hits(hits)
+    key = L.make_key(
+        model=model_alias,
+        messages=messages,
+        extra={"temperature": temperature, "task": task, "route": route_override, "token_est": total_tokens_est},
+        evidence_fingerprints=ev_fp,
+        project="auto",  # Use active project for cache
+    )
+    cached = L.cache_get(key)
+    if cached:
+        return {"ok": True, **cached, "cached": True}
+
+    provider = L.get_provider(model_alias)
+    answer = L.chat(provider, messages, temperature=temperature, seed=7, max_output_tokens=max_output_tokens)
+    payload = {"answer": answer, "citations": [h["source"] for h in hits]}
+    L.cache_set(key, payload, ttl_sec=7200)
+    return {"ok": True, **payload, "cached": False}
+
+@_register("answer.accumulated")
+async def _handle_answer_accumulated(args: dict[str, Any]) -> dict[str, Any]:
+    from retrieval.accumulated_answer import generate_accumulated_answer
+    query = str(args.get("query", ""))
+    sub_queries = args.get("sub_queries")  # Optional list
+    k_per_query = int(args.get("k_per_query", 5))
+    route = str(args.get("route", "reason-large"))
+    temperature = float(args.get("temperature", 0.2))
+    result = generate_accumulated_answer(
+        query=query,
+        sub_queries=sub_queries,
+        k_per_query=k_per_query,
+        route=route,
+        temperature=temperature,
+        project="auto"
+    )
+    return result
+
+@_register("answer.unified")
+async def _handle_answer_unified(args: dict[str, Any]) -> dict[str, Any]:
+    from retrieval.unified_orchestrator import create_execution_plan
+    query = str(args.get("query", ""))
+    sub_queries = args.get("sub_queries")  # Optional list
+    include_auggie = bool(args.get("include_auggie", True))
+    route = str(args.get("route", "reason-large"))
+    plan = create_execution_plan(
+        query=query,
+        sub_queries=sub_queries,
+        include_auggie=include_auggie,
+        route=route
+    )
+    return plan
 
-        response_data = {
-            "ok": True,
-            "message": f"Project initialized: {project}",
-            "project": project,
-            "bm25_index": "created" if not has_bm25_index(project) else "already exists"
-        }
+# Project Management Tools
+@_register("project.status")
+async def _handle_project_status(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    # Direct import to avoid E dictionary issues
+    from utils.project_utils import get_project_status
+    status = get_project_status(project)
+    return {"ok": True, "status": status}
 
-        if build_vector:
-            if vector_build_error:
-                response_data["vector_index"] = "failed"
-                response_data["vector_error"] = vector_build_error
-            else:
-                response_data["vector_index"] = "created"
+@_register("project.init")
+async def _handle_project_init(args: dict[str, Any]) -> dict[str, Any]:
+    import subprocess
+    import sys
+    from utils.validators import validate_project_path, validate_project_name
 
-        return response_data
+    project = args.get("project", "auto")
+    build_vector = bool(args.get("build_vector", True))
 
-    if name == "cache.clear":
-        project = args.get("project", "auto")
-        # Direct import to avoid E dictionary issues
-        from utils.project_utils import clear_cache
-        result = clear_cache(project)
-        return result
+    # Get current working directory as project root
+    cwd = os.getcwd()
 
-    if name == "cache.status":
-        project = args.get("project", "auto")
-        from utils.project_utils import get_cache_size
-        size = get_cache_size(project)
-        return {
-            "ok": True,
-            "cache_size": size
-        }
+    # Validate path (security: prevent command injection)
+    try:
+        validated_cwd = validate_project_path(cwd)
+        cwd = str(validated_cwd)
+    except ValueError as e:
+        return {"ok": False, "error": f"Invalid project path: {e}"}
 
-    if name == "memory.clear":
-        project = args.get("project", "auto")
-        # Direct import to avoid E dictionary issues
-        from utils.project_utils import clear_memory
-        result = clear_memory(project)
-        return result
+    # Auto-detect project name if needed
+    if project == "auto":
+        project = Path(cwd).name
 
-    if name == "index.status":
-        project = args.get("project", "auto")
-        # Direct import to avoid E dictionary issues
-        from utils.project_utils import get_project_status
-        status = get_project_status(project)
+    # Validate project name (security: prevent injection)
+    try:
+        project = validate_project_name(project, allow_auto=False)
+    except ValueError as e:
+        return {"ok": False, "error": f"Invalid project name: {e}"}
 
-        index_status = {
-            "bm25": status.get("bm25_index", {}),
-            "vector": status.get("vector_index", {})
-        }
+    # Direct import to avoid E dictionary issues
+    from utils.project_utils import auto_register_project, has_bm25_index, get_project_status
 
+    # Register project
+    if not auto_register_project(project, cwd):
         return {
-            "ok": True,
-            "status": index_status
+            "ok": False,
+            "error": f"Invalid project directory: {cwd}",
+            "suggestion": "Ensure directory contains code files"
         }
 
-    if name == "index.rebuild":
-        import subprocess
-        import sys
-        from utils.validators import validate_project_name, validate_project_path
-
-        # Direct import to avoid E dictionary issues - import at the beginning
-        from utils.project_utils import is_project_registered, get_active_project, get_project_status
+    # Build BM25 index
+    if not has_bm25_index(project):
+        build_script = BASE / "retrieval" / "build_index.py"
+        projects = get_project_status(project)
+
+        # Use DATA_DIR for consistent storage location
+        db_path = DATA_DIR / f"corpus_{project}.duckdb"
+        chunks_path = DATA_DIR / f"chunks_{project}.jsonl"
+
+        cmd = [
+            sys.executable,
+            str(build_script),
+            "--root", cwd,
+            "--db", str(db_path),
+            "--chunks", str(chunks_path),
+        ]
 
         try:
-            project = args.get("project", "auto")
-            vector_only = bool(args.get("vector_only", False))
-
-            if project == "auto":
-                # Use unified auto project resolution
-                from utils.project_utils import resolve_auto_project
-                project = resolve_auto_project()
-
-                if not project:
-                    return {
-                        "ok": False,
-                        "error": "Cannot determine project: no active project and current directory not registered"
-                    }
-
-            # Validate project name (security)
-            project = validate_project_name(project, allow_auto=False)
-
-        except ValueError as e:
-            return {"ok": False, "error": f"Invalid project name: {e}"}
-        except Exception as e:
-            return {
-                "ok": False,
-                "error": f"Failed to determine project: {str(e)}" if DEBUG else "Failed to determine project"
-            }
-
-        if not project:
-            return {
-                "ok": False,
-                "error": "No active project and cannot detect from current directory"
-            }
-
-        # Now get_project_status is properly imported
-        status = get_project_status(project)
-        root = status.get("root")
-
-        # Validate root path (security)
-        if root:
-            try:
-                root = str(validate_project_path(root))
-            except ValueError as e:
-                return {"ok": False, "error": f"Invalid project root: {e}"}
-
-        # If project not registered yet, use current directory as root
-        if not root:
-            root = cwd
-
-        if not root:
+            # Run in MCP server directory context
+            subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=str(BASE))
+        except subprocess.CalledProcessError as e:
             return {
                 "ok": False,
-                "error": f"Project not found: {project}"
+                "error": f"Failed to build BM25 index: {e}",
+                "stderr": e.stderr if e.stderr else ""
             }
 
-        # Rebuild BM25 index
-        if not vector_only:
-            build_script = BASE / "retrieval" / "build_index.py"
-
-            # Use DATA_DIR for consistent storage location
-            db_path = DATA_DIR / f"corpus_{project}.duckdb"
-            chunks_path = DATA_DIR / f"chunks_{project}.jsonl"
-
-            # Prefer venv Python (has duckdb installed) over system Python
-            venv_python = BASE / ".venv" / "bin" / "python"
-            python_exe = str(venv_python) if venv_python.exists() else sys.executable
-
-            cmd = [
-                python_exe,
-                str(build_script),
-                "--root", root,
-                "--db", str(db_path),
-                "--chunks", str(chunks_path),
-            ]
-
-            try:
-                # Run in MCP server directory context
-                result = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=str(BASE))
-            except subprocess.CalledProcessError as e:
-                return {
-                    "ok": False,
-                    "error": f"Failed to rebuild BM25 index: {e}",
-                    "stderr": e.stderr if e.stderr else "",
-                    "stdout": e.stdout if e.stdout else "",
-                    "cmd": " ".join(cmd),
-                    "hint": "Check if duckdb is installed in the Python environment"
-                }
-
-        # Rebuild vector index
-        vector_rebuild_error = None
+    # Build vector index if requested and dependencies available
+    vector_build_error = None
+    if build_vector:
         try:
             import faiss
             import sentence_transformers
 
             build_vector_script = BASE / "retrieval" / "build_vector_index.py"
-            # Reuse venv_python if defined, otherwise detect
-            if 'python_exe' not in locals():
-                venv_python = BASE / ".venv" / "bin" / "python"
-                python_exe = str(venv_python) if venv_python.exists() else sys.executable
-            cmd = [python_exe, str(build_vector_script), "--project", project]
+            cmd = [sys.executable, str(build_vector_script), "--project", project]
 
             # Run in MCP server directory context
             result = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=str(BASE))
+            if result.returncode != 0:
+                vector_build_error = f"Vector index build failed: {result.stderr}"
         except ImportError as e:
-            vector_rebuild_error = f"Vector dependencies not installed: {e}"
-            if vector_only:
-                return {
-                    "ok": False,
-                    "error": vector_rebuild_error,
-                    "suggestion": "Run: bash scripts/install_vector_deps.sh"
-                }
+            vector_build_error = f"Vector dependencies not installed: {e}"
         except subprocess.CalledProcessError as e:
-            vector_rebuild_error = f"Failed to rebuild vector index: {e.stderr if e.stderr else str(e)}"
-            return {
-                "ok": False,
-                "error": vector_rebuild_error,
-                "stderr": e.stderr if e.stderr else ""
-            }
+            vector_build_error = f"Failed to build vector index: {e.stderr if e.stderr else str(e)}"
         except Exception as e:
-            vector_rebuild_error = f"Unexpected error: {str(e)}"
-            return {
-                "ok": False,
-                "error": vector_rebuild_error
-            }
-
-        response_data = {
-            "ok": True,
-            "message": f"Index rebuilt for project: {project}"
-        }
+            vector_build_error = f"Unexpected error building vector index: {str(e)}"
 
-        if vector_only:
-            response_data["bm25_index"] = "skipped"
-            response_data["vector_index"] = "rebuilt" if not vector_rebuild_error else "failed"
-        else:
-            response_data["bm25_index"] = "rebuilt"
-            response_data["vector_index"] = "rebuilt" if not vector_rebuild_error else "failed"
-
-        if vector_rebuild_error:
-            response_data["vector_error"] = vector_rebuild_error
-
-        return response_data
+    # Set as active project
+    from utils.project_utils import set_active_project
+    set_active_project(project)
 
-    # ============================================================
-    # Code Analysis Tools (Serena-like)
-    # ============================================================
-    if name == "code.symbols":
-        from code.symbols import extract_symbols
-        from utils.project_utils import get_project_status, resolve_auto_project
+    response_data = {
+        "ok": True,
+        "message": f"Project initialized: {project}",
+        "project": project,
+        "bm25_index": "created" if not has_bm25_index(project) else "already exists"
+    }
 
-        file_path = str(args.get("file_path", ""))
-        depth = int(args.get("depth", 2))
-        include_body = bool(args.get("include_body", False))
-        project = args.get("project", "auto")
+    if build_vector:
+        if vector_build_error:
+            response_data["vector_index"] = "failed"
+            response_data["vector_error"] = vector_build_error
+        else:
+            response_data["vector_index"] = "created"
+
+    return response_data
+
+@_register("cache.clear")
+async def _handle_cache_clear(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    # Direct import to avoid E dictionary issues
+    from utils.project_utils import clear_cache
+    result = clear_cache(project)
+    return result
+
+@_register("cache.status")
+async def _handle_cache_status(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    from utils.project_utils import get_cache_size
+    size = get_cache_size(project)
+    return {
+        "ok": True,
+        "cache_size": size
+    }
 
-        # Resolve project root
-        project_name = resolve_auto_project() if project == "auto" else project
-        status = get_project_status(project_name) if project_name else {}
-        project_root = status.get("root", os.getcwd())
+@_register("memory.clear")
+async def _handle_memory_clear(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    # Direct import to avoid E dictionary issues
+    from utils.project_utils import clear_memory
+    result = clear_memory(project)
+    return result
+
+@_register("index.status")
+async def _handle_index_status(args: dict[str, Any]) -> dict[str, Any]:
+    project = args.get("project", "auto")
+    # Direct import to avoid E dictionary issues
+    from utils.project_utils import get_project_status
+    status = get_project_status(project)
 
-        # Resolve file path
-        full_path = Path(file_path)
-        if not full_path.is_absolute():
-            full_path = Path(project_root) / file_path
+    index_status = {
+        "bm25": status.get("bm25_index", {}),
+        "vector": status.get("vector_index", {})
+    }
 
-        if not full_path.exists():
-            return {"ok": False, "error": f"File not found: {file_path}"}
+    return {
+        "ok": True,
+        "status": index_status
+    }
 
-        symbols = extract_symbols(str(full_path), depth=depth, include_body=include_body)
-        return {"ok": True, "file": str(full_path), "symbols": symbols, "count": len(symbols)}
+@_register("index.rebuild")
+async def _handle_index_rebuild(args: dict[str, Any]) -> dict[str, Any]:
+    import subprocess
+    import sys
+    from utils.validators import validate_project_name, validate_project_path
 
-    if name == "code.find_symbol":
-        from code.symbols import find_symbol
-        from utils.project_utils import get_project_status, resolve_auto_project
+    # Direct import to avoid E dictionary issues - import at the beginning
+    from utils.project_utils import is_project_registered, get_active_project, get_project_status
 
-        pattern = str(args.get("pattern", ""))
-        file_path = args.get("file_path")
-        include_body = bool(args.get("include_body", True))
+    try:
         project = args.get("project", "auto")
+        vector_only = bool(args.get("vector_only", False))
 
-        # Resolve project root
-        project_name = resolve_auto_project() if project == "auto" else project
-        status = get_project_status(project_name) if project_name else {}
-        project_root = status.get("root", os.getcwd())
-
-        results = find_symbol(
-            pattern,
-            file_path=file_path,
-            project_root=project_root,
-            include_body=include_body
-        )
-        return {"ok": True, "pattern": pattern, "results": results, "count": len(results)}
-
-    if name == "code.references":
-        from code.references import find_references
-        from utils.project_utils import get_project_status, resolve_auto_project
+        if project == "auto":
+            # Use unified auto project resolution
+            from utils.project_utils import resolve_auto_project
+            project = resolve_auto_project()
 
-        symbol = str(args.get("symbol", ""))
-        context_lines = int(args.get("context_lines", 2))
-        project = args.get("project", "auto")
+            if not project:
+                return {
+                    "ok": False,
+                    "error": "Cannot determine project: no active project and current directory not registered"
+                }
 
-        # Resolve project root
-        project_name = resolve_auto_project() if project == "auto" else project
-        status = get_project_status(project_name) if project_name else {}
-        project_root = status.get("root", os.getcwd())
+        # Validate project name (security)
+        project = validate_project_name(project, allow_auto=False)
 
-        results = find_references(symbol, project_root, context_lines=context_lines)
-        return {"ok": True, "symbol": symbol, "references": results, "count": len(results)}
+    except ValueError as e:
+        return {"ok": False, "error": f"Invalid project name: {e}"}
+    except Exception as e:
+        return {
+            "ok": False,
+            "error": f"Failed to determine project: {str(e)}" if DEBUG else "Failed to determine project"
+        }
 
-    if name == "search.pattern":
-        from code.pattern_search import search_pattern
-        from utils.project_utils import get_project_status, resolve_auto_project
+    if not project:
+        return {
+            "ok": False,
+            "error": "No active project and cannot detect from current directory"
+        }
 
-        pattern = str(args.get("pattern", ""))
-        file_glob = str(args.get("file_glob", "**/*"))
-        context_lines = int(args.get("context_lines", 2))
-        case_sensitive = bool(args.get("case_sensitive", True))
-        project = args.get("project", "auto")
+    # Now get_project_status is properly imported
+    status = get_project_status(project)
+    root = status.get("root")
 
-        # Resolve project root
-        project_name = resolve_auto_project() if project == "auto" else project
-        status = get_project_status(project_name) if project_name else {}
-        project_root = status.get("root", os.getcwd())
+    # Validate root path (security)
+    if root:
+        try:
+            root = str(validate_project_path(root))
+        except ValueError as e:
+            return {"ok": False, "error": f"Invalid project root: {e}"}
 
-        results = search_pattern(
-            pattern, project_root,
-            file_glob=file_glob,
-            context_lines=context_lines,
-            case_sensitive=case_sensitive
-        )
-        return {"ok": True, "pattern": pattern, "matches": results, "count": len(results)}
+    # If project not registered yet, use current directory as root
+    if not root:
+        root = cwd
 
-    # ============================================================
-    # File Operations Tools (Serena-like)
-    # ============================================================
-    if name == "file.read":
-        from file.reader import read_file
-        from utils.project_utils import get_project_status, resolve_auto_project
+    if not root:
+        return {
+            "ok": False,
+            "error": f"Project not found: {project}"
+        }
 
-        path = str(args.get("path", ""))
-        start_line = args.get("start_line")
-        end_line = args.get("end_line")
-        project = args.get("project", "auto")
+    # Rebuild BM25 index
+    if not vector_only:
+        build_script = BASE / "retrieval" / "build_index.py"
 
-        # Resolve project root
-        project_name = resolve_auto_project() if project == "auto" else project
-        status = get_project_status(project_name) if project_name else {}
-        project_root = status.get("root", os.getcwd())
+        # Use DATA_DIR for consistent storage location
+        db_path = DATA_DIR / f"corpus_{project}.duckdb"
+        chunks_path = DATA_DIR / f"chunks_{project}.jsonl"
 
-        result = read_file(path, project_root=project_root, start_line=start_line, end_line=end_line)
-        return result
+        # Prefer venv Python (has duckdb installed) over system Python
+        venv_python = BASE / ".venv" / "bin" / "python"
+        python_exe = str(venv_python) if venv_python.exists() else sys.executable
 
-    if name == "file.list":
-        from file.finder import list_directory
-        from utils.project_utils import get_project_status, resolve_auto_project
+        cmd = [
+            python_exe,
+            str(build_script),
+            "--root", root,
+            "--db", str(db_path),
+            "--chunks", str(chunks_path),
+        ]
 
-        path = str(args.get("path", "."))
-        recursive = bool(args.get("recursive", False))
-        pattern = args.get("pattern")
-        project = args.get("project", "auto")
+        try:
+            # Run in MCP server directory context
+            result = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=str(BASE))
+        except subprocess.CalledProcessError as e:
+            return {
+                "ok": False,
+                "error": f"Failed to rebuild BM25 index: {e}",
+                "stderr": e.stderr if e.stderr else "",
+                "stdout": e.stdout if e.stdout else "",
+                "cmd": " ".join(cmd),
+                "hint": "Check if duckdb is installed in the Python environment"
+            }
 
-        # Resolve project root
-        project_name = resolve_auto_project() if project == "auto" else project
-        status = get_project_status(project_name) if project_name else {}
-        project_root = status.get("root", os.getcwd())
+    # Rebuild vector index
+    vector_rebuild_error = None
+    try:
+        import faiss
+        import sentence_transformers
 
-        result = list_directory(path, project_root=project_root, recursive=recursive, pattern=pattern)
-        return result
+        build_vector_script = BASE / "retrieval" / "build_vector_index.py"
+        # Reuse venv_python if defined, otherwise detect
+        if 'python_exe' not in locals():
+            venv_python = BASE / ".venv" / "bin" / "python"
+            python_exe = str(venv_python) if venv_python.exists() else sys.executable
+        cmd = [python_exe, str(build_vector_script), "--project", project]
 
-    if name == "file.find":
-        from file.finder import find_files
-        from utils.project_utils import get_project_status, resolve_auto_project
+        # Run in MCP server directory context
+        result = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=str(BASE))
+    except ImportError as e:
+        vector_rebuild_error = f"Vector dependencies not installed: {e}"
+        if vector_only:
+            return {
+                "ok": False,
+                "error": vector_rebuild_error,
+                "suggestion": "Run: bash scripts/install_vector_deps.sh"
+            }
+    except subprocess.CalledProcessError as e:
+        vector_rebuild_error = f"Failed to rebuild vector index: {e.stderr if e.stderr else str(e)}"
+        return {
+            "ok": False,
+            "error": vector_rebuild_error,
+            "stderr": e.stderr if e.stderr else ""
+        }
+    except Exception as e:
+        vector_rebuild_error = f"Unexpected error: {str(e)}"
+        return {
+            "ok": False,
+            "error": vector_rebuild_error
+        }
 
-        pattern = str(args.get("pattern", ""))
-        project = args.get("project", "auto")
+    response_data = {
+        "ok": True,
+        "message": f"Index rebuilt for project: {project}"
+    }
 
-        # Resolve project root
-        project_name = resolve_auto_project() if project == "auto" else project
-        status = get_project_status(project_name) if project_name else {}
-        project_root = status.get("root", os.getcwd())
+    if vector_only:
+        response_data["bm25_index"] = "skipped"
+        response_data["vector_index"] = "rebuilt" if not vector_rebuild_error else "failed"
+    else:
+        response_data["bm25_index"] = "rebuilt"
+        response_data["vector_index"] = "rebuilt" if not vector_rebuild_error else "failed"
+
+    if vector_rebuild_error:
+        response_data["vector_error"] = vector_rebuild_error
+
+    return response_data
+
+# ============================================================
+# Code Analysis Tools (Serena-like)
+# ============================================================
+@_register("code.symbols")
+async def _handle_code_symbols(args: dict[str, Any]) -> dict[str, Any]:
+    from code.symbols import extract_symbols
+    from utils.project_utils import get_project_status, resolve_auto_project
+
+    file_path = str(args.get("file_path", ""))
+    depth = int(args.get("depth", 2))
+    include_body = bool(args.get("include_body", False))
+    project = args.get("project", "auto")
+
+    # Resolve project root
+    project_name = resolve_auto_project() if project == "auto" else project
+    status = get_project_status(project_name) if project_name else {}
+    project_root = status.get("root", os.getcwd())
+
+    # Resolve file path
+    full_path = Path(file_path)
+    if not full_path.is_absolute():
+        full_path = Path(project_root) / file_path
+
+    if not full_path.exists():
+        return {"ok": False, "error": f"File not found: {file_path}"}
+
+    symbols = extract_symbols(str(full_path), depth=depth, include_body=include_body)
+    return {"ok": True, "file": str(full_path), "symbols": symbols, "count": len(symbols)}
+
+@_register("code.find_symbol")
+async def _handle_code_find_symbol(args: dict[str, Any]) -> dict[str, Any]:
+    from code.symbols import find_symbol
+    from utils.project_utils import get_project_status, resolve_auto_project
+
+    pattern = str(args.get("pattern", ""))
+    file_path = args.get("file_path")
+    include_body = bool(args.get("include_body", True))
+    project = args.get("project", "auto")
+
+    # Resolve project root
+    project_name = resolve_auto_project() if project == "auto" else project
+    status = get_project_status(project_name) if project_name else {}
+    project_root = status.get("root", os.getcwd())
+
+    results = find_symbol(
+        pattern,
+        file_path=file_path,
+        project_root=project_root,
+        include_body=include_body
+    )
+    return {"ok": True, "pattern": pattern, "results": results, "count": len(results)}
+
+@_register("code.references")
+async def _handle_code_references(args: dict[str, Any]) -> dict[str, Any]:
+    from code.references import find_references
+    from utils.project_utils import get_project_status, resolve_auto_project
+
+    symbol = str(args.get("symbol", ""))
+    context_lines = int(args.get("context_lines", 2))
+    project = args.get("project", "auto")
+
+    # Resolve project root
+    project_name = resolve_auto_project() if project == "auto" else project
+    status = get_project_status(project_name) if project_name else {}
+    project_root = status.get("root", os.getcwd())
+
+    results = find_references(symbol, project_root, context_lines=context_lines)
+    return {"ok": True, "symbol": symbol, "references": results, "count": len(results)}
+
+@_register("search.pattern")
+async def _handle_search_pattern(args: dict[str, Any]) -> dict[str, Any]:
+    from code.pattern_search import search_pattern
+    from utils.project_utils import get_project_status, resolve_auto_project
+
+    pattern = str(args.get("pattern", ""))
+    file_glob = str(args.get("file_glob", "**/*"))
+    context_lines = int(args.get("context_lines", 2))
+    case_sensitive = bool(args.get("case_sensitive", True))
+    project = args.get("project", "auto")
+
+    # Resolve project root
+    project_name = resolve_auto_project() if project == "auto" else project
+    status = get_project_status(project_name) if project_name else {}
+    project_root = status.get("root", os.getcwd())
+
+    results = search_pattern(
+        pattern, project_root,
+        file_glob=file_glob,
+        context_lines=context_lines,
+        case_sensitive=case_sensitive
+    )
+    return {"ok": True, "pattern": pattern, "matches": results, "count": len(results)}
+
+# ============================================================
+# File Operations Tools (Serena-like)
+# ============================================================
+@_register("file.read")
+async def _handle_file_read(args: dict[str, Any]) -> dict[str, Any]:
+    from file.reader import read_file
+    from utils.project_utils import get_project_status, resolve_auto_project
+
+    path = str(args.get("path", ""))
+    start_line = args.get("start_line")
+    end_line = args.get("end_line")
+    project = args.get("project", "auto")
+
+    # Resolve project root
+    project_name = resolve_auto_project() if project == "auto" else project
+    status = get_project_status(project_name) if project_name else {}
+    project_root = status.get("root", os.getcwd())
+
+    result = read_file(path, project_root=project_root, start_line=start_line, end_line=end_line)
+    return result
+
+@_register("file.list")
+async def _handle_file_list(args: dict[str, Any]) -> dict[str, Any]:
+    from file.finder import list_directory
+    from utils.project_utils import get_project_status, resolve_auto_project
+
+    path = str(args.get("path", "."))
+    recursive = bool(args.get("recursive", False))
+    max_depth = args.get("max_depth")
+    pattern = args.get("pattern")
+    project = args.get("project", "auto")
+
+    # Resolve project root
+    project_name = resolve_auto_project() if project == "auto" else project
+    status = get_project_status(project_name) if project_name else {}
+    project_root = status.get("root", os.getcwd())
+
+    result = list_directory(
+        path, project_root=project_root, recursive=recursive, pattern=pattern,
+        max_depth=int(max_depth) if max_depth is not None else None
+    )
+    return result
+
+@_register("file.find")
+async def _handle_file_find(args: dict[str, Any]) -> dict[str, Any]:
+    from file.finder import find_files
+    from utils.project_utils import get_project_status, resolve_auto_project
+
+    pattern = str(args.get("pattern", ""))
+    project = args.get("project", "auto")
+
+    # Resolve project root
+    project_name = resolve_auto_project() if project == "auto" else project
+    status = get_project_status(project_name) if project_name else {}
+    project_root = status.get("root", os.getcwd())
+
+    result = find_files(pattern, project_root)
+    return result
+
+@_register("batch.execute")
+async def _handle_batch_execute(args: dict[str, Any]) -> dict[str, Any]:
+    operations = args.get("operations") or []
+    stop_on_error = bool(args.get("stopOnError", False))
+
+    # Handlers block the event loop while they run, so operations run one
+    # after another, in list order; "first failure" is the first in the list
+    results = []
+    failed = False
+    for op in operations:
+        name = op.get("name") if isinstance(op, dict) else None
+        handler = _HANDLERS.get(name) if name != "batch.execute" else None
+        if failed and stop_on_error:
+            result = {"ok": False, "error": "skipped after an earlier failure"}
+        elif handler is None:
+            result = {"ok": False, "error": f"unknown tool {name}"}
+        else:
+            try:
+                result = await handler(op.get("args") or {})
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+        if isinstance(result, dict) and result.get("ok") is False:
+            failed = True
+        results.append({"name": name, "result": result})
 
-        result = find_files(pattern, project_root)
-        return result
+    return {"ok": not failed, "results": results, "count": len(results)}
 
-    return {"ok": False, "error": f"unknown tool {name}"}
+@server.call_tool()
+async def _call_tool(name: str, arguments: dict[str, Any] | None) -> dict[str, Any]:
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return {"ok": False, "error": f"unknown tool {name}"}
+    return await handler(arguments or {})
 
 async def amain():
     async with stdio_server() as (read, write):
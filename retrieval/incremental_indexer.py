@@ -25,6 +25,11 @@ from retrieval.build_index import (
 )
 
 
+def _log(message: str) -> None:
+    """Write a diagnostic line to stderr in one write (one flush, even for several lines)."""
+    sys.stderr.write(message + "\n")
+
+
 class IncrementalIndexer:
     """
     Manages incremental indexing for a project.
@@ -60,7 +65,7 @@ class IncrementalIndexer:
             with open(self.state_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"[WARN] Failed to load index state: {e}", file=sys.stderr)
+            _log(f"[WARN] Failed to load index state: {e}")
             return {}
 
     def _save_state(self, state: Dict[str, dict]):
@@ -69,7 +74,7 @@ class IncrementalIndexer:
             with open(self.state_file, 'w', encoding='utf-8') as f:
                 json.dump(state, indent=2, ensure_ascii=False, fp=f)
         except Exception as e:
-            print(f"[ERROR] Failed to save index state: {e}", file=sys.stderr)
+            _log(f"[ERROR] Failed to save index state: {e}")
 
     def _get_file_metadata(self, file_path: Path) -> dict:
         """Get file metadata for change detection."""
@@ -94,7 +99,7 @@ class IncrementalIndexer:
 
             return metadata
         except Exception as e:
-            print(f"[WARN] Failed to get metadata for {file_path}: {e}", file=sys.stderr)
+            _log(f"[WARN] Failed to get metadata for {file_path}: {e}")
             return {}
 
     def _has_changed(self, file_path: str, metadata: dict) -> bool:
@@ -127,7 +132,7 @@ class IncrementalIndexer:
                 "deleted": [...],    # Removed files
             }
         """
-        print(f"[INCREMENTAL] Detecting changes in {self.project_root}...", file=sys.stderr)
+        _log(f"[INCREMENTAL] Detecting changes in {self.project_root}...")
         start_time = time.time()
 
         changes = {
@@ -170,10 +175,12 @@ class IncrementalIndexer:
         elapsed = time.time() - start_time
         total_changes = len(changes["added"]) + len(changes["modified"]) + len(changes["deleted"])
 
-        print(f"[INCREMENTAL] Detected {total_changes} changes in {elapsed:.2f}s:", file=sys.stderr)
-        print(f"  - Added: {len(changes['added'])}", file=sys.stderr)
-        print(f"  - Modified: {len(changes['modified'])}", file=sys.stderr)
-        print(f"  - Deleted: {len(changes['deleted'])}", file=sys.stderr)
+        _log(
+            f"[INCREMENTAL] Detected {total_changes} changes in {elapsed:.2f}s:\n"
+            f"  - Added: {len(changes['added'])}\n"
+            f"  - Modified: {len(changes['modified'])}\n"
+            f"  - Deleted: {len(changes['deleted'])}"
+        )
 
         # Update state
         self.current_files = current_files
@@ -189,7 +196,7 @@ class IncrementalIndexer:
         Returns:
             Statistics: {"chunks_added": N, "chunks_removed": M, "chunks_total": T}
         """
-        print(f"[INCREMENTAL] Starting incremental update...", file=sys.stderr)
+        _log(f"[INCREMENTAL] Starting incremental update...")
         start_time = time.time()
 
         stats = {
@@ -207,7 +214,7 @@ class IncrementalIndexer:
                         if line.strip():
                             existing_chunks.append(json.loads(line))
             except Exception as e:
-                print(f"[ERROR] Failed to load existing chunks: {e}", file=sys.stderr)
+                _log(f"[ERROR] Failed to load existing chunks: {e}")
                 return stats
 
         # Remove deleted and modified files' chunks
@@ -224,7 +231,7 @@ class IncrementalIndexer:
                 else:
                     stats["chunks_removed"] += 1
 
-        print(f"[INCREMENTAL] Removed {stats['chunks_removed']} chunks from {len(files_to_remove)} files", file=sys.stderr)
+        _log(f"[INCREMENTAL] Removed {stats['chunks_removed']} chunks from {len(files_to_remove)} files")
 
         # Add chunks from added and modified files
         new_chunks = []
@@ -239,10 +246,10 @@ class IncrementalIndexer:
 
                 if chunks:
                     new_chunks.extend(chunks)
-                    print(f"[INCREMENTAL]   Indexed {rel_path}: {len(chunks)} chunks", file=sys.stderr)
+                    _log(f"[INCREMENTAL]   Indexed {rel_path}: {len(chunks)} chunks")
 
             except Exception as e:
-                print(f"[WARN] Failed to parse {rel_path}: {e}", file=sys.stderr)
+                _log(f"[WARN] Failed to parse {rel_path}: {e}")
                 continue
 
         stats["chunks_added"] = len(new_chunks)
@@ -257,23 +264,23 @@ class IncrementalIndexer:
                 for chunk in all_chunks:
                     f.write(json.dumps(chunk, ensure_ascii=False) + '\n')
 
-            print(f"[INCREMENTAL] Wrote {stats['chunks_total']} chunks to {self.chunks_file.name}", file=sys.stderr)
+            _log(f"[INCREMENTAL] Wrote {stats['chunks_total']} chunks to {self.chunks_file.name}")
 
         except Exception as e:
-            print(f"[ERROR] Failed to write chunks: {e}", file=sys.stderr)
+            _log(f"[ERROR] Failed to write chunks: {e}")
             return stats
 
         # Update BM25 index (DuckDB)
         try:
             self._update_bm25_index(all_chunks)
         except Exception as e:
-            print(f"[ERROR] Failed to update BM25 index: {e}", file=sys.stderr)
+            _log(f"[ERROR] Failed to update BM25 index: {e}")
 
         # Save new state
         self._save_state(self.current_files)
 
         elapsed = time.time() - start_time
-        print(f"[INCREMENTAL] Update complete in {elapsed:.2f}s", file=sys.stderr)
+        _log(f"[INCREMENTAL] Update complete in {elapsed:.2f}s")
 
         return stats
 
@@ -322,7 +329,7 @@ class IncrementalIndexer:
                 )
             """)
 
-            print(f"[INCREMENTAL] Updated BM25 index with {len(chunks)} chunks", file=sys.stderr)
+            _log(f"[INCREMENTAL] Updated BM25 index with {len(chunks)} chunks")
 
         finally:
             conn.close()
@@ -351,7 +358,7 @@ def auto_index_if_needed(project_name: str, project_root: str) -> Optional[Dict[
     total_changes = len(changes["added"]) + len(changes["modified"]) + len(changes["deleted"])
 
     if total_changes == 0:
-        print(f"[INCREMENTAL] No changes detected, index is up-to-date", file=sys.stderr)
+        _log(f"[INCREMENTAL] No changes detected, index is up-to-date")
         return None
 
     # Perform incremental update
@@ -371,7 +378,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     if args.force:
-        print("[INCREMENTAL] Force re-index requested, removing old state...", file=sys.stderr)
+        _log("[INCREMENTAL] Force re-index requested, removing old state...")
         indexer = IncrementalIndexer(args.project, args.root)
         if indexer.state_file.exists():
             indexer.state_file.unlink()
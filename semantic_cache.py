@@ -14,6 +14,7 @@ import json
 import time
 import pickle
 import logging
+import threading
 from pathlib import Path
 from typing import Any, Optional, Dict, List
 
@@ -45,6 +46,28 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 from utils.project_utils import resolve_auto_project
 from retrieval.vector_search import EmbeddingProvider
 
+# Exact inner-product search is fastest up to ~10k entries; beyond that an
+# HNSW graph keeps lookups roughly O(log N). Vectors are L2-normalized, so
+# inner product equals cosine similarity for both index types.
+HNSW_THRESHOLD = 10_000
+HNSW_M = 32
+
+
+def _new_index(dimension: int, size: int):
+    """Create an empty FAISS index suited to a cache of `size` entries."""
+    faiss = _lazy_faiss()
+    if size >= HNSW_THRESHOLD:
+        return faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    return faiss.IndexFlatIP(dimension)
+
+
+def _normalized(embeddings) -> np.ndarray:
+    """Embeddings as contiguous float32, L2-normalized in place by FAISS."""
+    vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+    _lazy_faiss().normalize_L2(vectors)
+    return vectors
+
+
 class SemanticCache:
     """
     Semantic cache using vector similarity.
@@ -73,6 +96,9 @@ class SemanticCache:
         """
         self.project = project or ""
         self.similarity_threshold = similarity_threshold
+        # Instances are shared per project (cache._get_sem): guards index and
+        # cache_entries, whose positions must stay aligned
+        self._lock = threading.Lock()
 
         # Check FAISS dependency
         faiss = _lazy_faiss()
@@ -117,23 +143,24 @@ class SemanticCache:
         entries_path = self._get_entries_path()
         
         if cache_path.exists() and entries_path.exists():
-            try:
-                faiss = _lazy_faiss()
-                self.index = faiss.read_index(str(cache_path))
-                with open(entries_path, "rb") as f:
-                    self.cache_entries = pickle.load(f)
-                
-                # Remove expired entries
-                self._cleanup_expired()
-                
-                logger.info(
-                    f"Loaded semantic cache: {len(self.cache_entries)} entries "
-                    f"(project: {self.project or 'global'})"
-                )
-            except Exception as e:
-                logger.warning(f"Failed to load semantic cache: {e}")
-                self.index = None
-                self.cache_entries = []
+            with self._lock:
+                try:
+                    faiss = _lazy_faiss()
+                    self.index = faiss.read_index(str(cache_path))
+                    with open(entries_path, "rb") as f:
+                        self.cache_entries = pickle.load(f)
+
+                    # Remove expired entries (rebuilds the index)
+                    self._cleanup_expired()
+
+                    logger.info(
+                        f"Loaded semantic cache: {len(self.cache_entries)} entries "
+                        f"(project: {self.project or 'global'})"
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to load semantic cache: {e}")
+                    self.index = None
+                    self.cache_entries = []
     
     def _save_cache(self):
         """Save cache to disk."""
@@ -178,9 +205,8 @@ class SemanticCache:
                     normalize=True
                 )
                 
-                faiss = _lazy_faiss()
-                self.index = faiss.IndexFlatIP(self.dimension)
-                self.index.add(embeddings.astype(np.float32))
+                self.index = _new_index(self.dimension, len(valid_entries))
+                self.index.add(_normalized(embeddings))
             else:
                 self.index = None
             
@@ -192,12 +218,13 @@ class SemanticCache:
                 f"(removed {len(self.cache_entries) - len(valid_entries)} expired)"
             )
     
-    def get(self, query: str) -> Optional[Any]:
+    def get(self, query: str, similarity_threshold: Optional[float] = None) -> Optional[Any]:
         """
         Get cached value for a similar query.
         
         Args:
             query: Query text
+            similarity_threshold: Override the instance threshold for this lookup
         
         Returns:
             Cached value if found, None otherwise
@@ -211,24 +238,28 @@ class SemanticCache:
             normalize=True
         )
 
-        # Search for similar queries
-        scores, indices = self.index.search(query_embedding.astype(np.float32), 1)
-        
-        if len(scores[0]) == 0:
-            return None
-        
-        score = scores[0][0]
-        idx = indices[0][0]
+        # Search for similar queries; the entry is read under the same lock
+        # so it is the one stored at the vector's position
+        with self._lock:
+            if self.index is None:
+                return None
+            scores, indices = self.index.search(_normalized(query_embedding), 1)
+
+            if len(scores[0]) == 0 or indices[0][0] < 0:
+                return None
+
+            score = scores[0][0]
+            cached_query, value, expire_at = self.cache_entries[indices[0][0]]
         
         # Check similarity threshold
-        if score < self.similarity_threshold:
+        threshold = self.similarity_threshold if similarity_threshold is None else similarity_threshold
+        if score < threshold:
             logger.debug(
-                f"Semantic cache miss: similarity {score:.3f} < threshold {self.similarity_threshold}"
+                f"Semantic cache miss: similarity {score:.3f} < threshold {threshold}"
             )
             return None
         
         # Check expiration
-        cached_query, value, expire_at = self.cache_entries[idx]
         now = int(time.time())
         
         if expire_at < now:
@@ -262,35 +293,46 @@ class SemanticCache:
             normalize=True
         )
 
-        # Add to index
-        faiss = _lazy_faiss()
-        if self.index is None:
-            self.index = faiss.IndexFlatIP(self.dimension)
-        
-        self.index.add(query_embedding.astype(np.float32))
-        self.cache_entries.append((query, value, expire_at))
-        
-        # Save cache
-        self._save_cache()
+        with self._lock:
+            # Add to index
+            if self.index is None:
+                self.index = _new_index(self.dimension, 1)
+            elif (self.index.ntotal + 1 >= HNSW_THRESHOLD
+                  and not isinstance(self.index, _lazy_faiss().IndexHNSWFlat)):
+                self._upgrade_index()
+
+            self.index.add(_normalized(query_embedding))
+            self.cache_entries.append((query, value, expire_at))
+
+            # Save cache
+            self._save_cache()
         
         logger.debug(f"Semantic cache set: '{query[:50]}...' (ttl: {ttl_sec}s)")
     
+    def _upgrade_index(self):
+        """Move the stored vectors from the flat index into an HNSW index."""
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        self.index = _new_index(self.dimension, HNSW_THRESHOLD)
+        self.index.add(vectors)
+        logger.info(f"Semantic cache switched to HNSW index ({len(vectors)} entries)")
+
     def clear(self):
         """Clear all cache entries."""
         if not self.enabled:
             return
         
-        self.index = None
-        self.cache_entries = []
-        
-        # Delete cache files
-        cache_path = self._get_cache_path()
-        entries_path = self._get_entries_path()
-        
-        if cache_path.exists():
-            cache_path.unlink()
-        if entries_path.exists():
-            entries_path.unlink()
+        with self._lock:
+            self.index = None
+            self.cache_entries = []
+
+            # Delete cache files
+            cache_path = self._get_cache_path()
+            entries_path = self._get_entries_path()
+
+            if cache_path.exists():
+                cache_path.unlink()
+            if entries_path.exists():
+                entries_path.unlink()
         
         logger.info("Semantic cache cleared")
 
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test the batch.execute MCP tool
+
+Tests:
+1. Results in list order - 結果依清單順序回傳
+2. stopOnError - 第一個失敗之後的操作全部略過
+3. Unknown and nested tools - 未知工具與巢狀 batch.execute 回傳 ok=False
+4. Handler exceptions - 例外轉為 {"ok": False, "error": ...}
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+
+pytest.importorskip("mcp")
+import mcp_bridge_lazy as bridge
+
+calls = []
+
+
+async def _echo(args):
+    calls.append(args.get("value"))
+    return {"ok": True, "value": args.get("value")}
+
+
+async def _fail(args):
+    calls.append("fail")
+    return {"ok": False, "error": "failed"}
+
+
+async def _raise(args):
+    raise ValueError("boom")
+
+
+STUBS = {"test.echo": _echo, "test.fail": _fail, "test.raise": _raise}
+
+
+def _batch(args):
+    """Run batch.execute with the stub handlers registered."""
+    calls.clear()
+    bridge._HANDLERS.update(STUBS)
+    try:
+        return asyncio.run(bridge._HANDLERS["batch.execute"](args))
+    finally:
+        for name in STUBS:
+            bridge._HANDLERS.pop(name, None)
+
+
+def test_results_in_order():
+    """Each operation's result comes back at its position in the list"""
+    print("\n=== Test 1: results in list order ===")
+
+    result = _batch({"operations": [
+        {"name": "test.echo", "args": {"value": i}} for i in range(5)
+    ]})
+    assert result["ok"] is True
+    assert result["count"] == 5
+    assert [r["name"] for r in result["results"]] == ["test.echo"] * 5
+    assert [r["result"]["value"] for r in result["results"]] == [0, 1, 2, 3, 4]
+    assert calls == [0, 1, 2, 3, 4]
+    print("✅ Results follow the operation list")
+
+
+def test_stop_on_error():
+    """With stopOnError, every operation after the first failure is skipped"""
+    print("\n=== Test 2: stopOnError ===")
+
+    operations = [
+        {"name": "test.echo", "args": {"value": 1}},
+        {"name": "test.fail"},
+        {"name": "test.echo", "args": {"value": 2}},
+        {"name": "test.echo", "args": {"value": 3}},
+    ]
+    result = _batch({"operations": operations, "stopOnError": True})
+    assert result["ok"] is False
+    assert calls == [1, "fail"]
+    skipped = [r["result"] for r in result["results"][2:]]
+    assert all(r["ok"] is False and "skipped" in r["error"] for r in skipped), skipped
+
+    # Without it, the rest still run
+    result = _batch({"operations": operations})
+    assert result["ok"] is False
+    assert calls == [1, "fail", 2, 3]
+    print("✅ Operations after the first failure are skipped")
+
+
+def test_unknown_and_nested_tools():
+    """An unknown tool and a nested batch.execute each fail on their own"""
+    print("\n=== Test 3: unknown and nested tools ===")
+
+    result = _batch({"operations": [
+        {"name": "test.missing"},
+        {"name": "batch.execute", "args": {"operations": [{"name": "test.echo"}]}},
+        {"name": "test.echo", "args": {"value": 1}},
+    ]})
+    first, nested, last = (r["result"] for r in result["results"])
+    assert first["ok"] is False and "unknown tool" in first["error"]
+    assert nested["ok"] is False
+    assert last == {"ok": True, "value": 1}
+    assert calls == [1]  # the nested batch ran nothing
+    print("✅ Unknown and nested tools return ok=False")
+
+
+def test_handler_exception():
+    """A handler that raises becomes an error result"""
+    print("\n=== Test 4: handler exceptions ===")
+
+    result = _batch({"operations": [
+        {"name": "test.raise"},
+        {"name": "test.echo", "args": {"value": 1}},
+    ]})
+    assert result["results"][0]["result"] == {"ok": False, "error": "boom"}
+    assert result["results"][1]["result"] == {"ok": True, "value": 1}
+    print("✅ Exceptions are converted to error results")
+
+
+def main():
+    print("=" * 60)
+    print("batch.execute Tests")
+    print("=" * 60)
+
+    try:
+        test_results_in_order()
+        test_stop_on_error()
+        test_unknown_and_nested_tools()
+        test_handler_exception()
+
+        print("\n" + "=" * 60)
+        print("✅ All batch.execute tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test response cache API (cache.make_key, cache.get, cache.set, cache.set_many)
+
+Tests:
+1. cache.set & cache.get - 基本讀寫
+2. Expired entries - 過期項目回傳 None
+3. cache.set_many - 批次寫入
+4. Project isolation - 專案隔離
+5. messages_fingerprints - 以訊息雜湊產生 key
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+
+import cache
+
+TEST_PROJECT = "test_cache_project"
+
+
+def test_cache_set_get():
+    """Test cache.set and cache.get"""
+    print("\n=== Test 1: cache.set & cache.get ===")
+
+    key = cache.make_key("model", [{"role": "user", "content": "你好"}], {"t": 0.2}, [], project=TEST_PROJECT)
+    cache.set(key, {"answer": "回答", "citations": ["a.py:1"]})
+
+    value = cache.get(key)
+    assert value == {"answer": "回答", "citations": ["a.py:1"]}, f"Unexpected value: {value}"
+    print("✅ cache.set & cache.get works correctly")
+
+
+def test_cache_expired():
+    """Expired entries are treated as misses"""
+    print("\n=== Test 2: expired entries ===")
+
+    key = cache.make_key("model", [{"role": "user", "content": "expired"}], {}, [], project=TEST_PROJECT)
+    cache.set(key, {"answer": "old"}, ttl_sec=-1)
+
+    assert cache.get(key) is None, "Expired entry should not be returned"
+    print("✅ expired entries return None")
+
+
+def test_cache_set_many():
+    """Test cache.set_many"""
+    print("\n=== Test 3: cache.set_many ===")
+
+    items = [
+        (cache.make_key("model", [{"content": f"q{i}"}], {}, [], project=TEST_PROJECT), {"i": i})
+        for i in range(5)
+    ]
+    cache.set_many(items)
+
+    for key, value in items:
+        assert cache.get(key) == value, f"Mismatch for {key}"
+    print(f"✅ cache.set_many stored {len(items)} items")
+
+
+def test_project_isolation():
+    """Same key hash in different projects does not collide"""
+    print("\n=== Test 4: project isolation ===")
+
+    cache.set("shared_hash", "a", project=TEST_PROJECT)
+    cache.set("shared_hash", "b", project=TEST_PROJECT + "_other")
+
+    assert cache.get("shared_hash", project=TEST_PROJECT) == "a"
+    assert cache.get("shared_hash", project=TEST_PROJECT + "_other") == "b"
+    print("✅ projects are isolated")
+
+
+def test_make_key_fingerprints():
+    """make_key with messages_fingerprints ignores the raw messages"""
+    print("\n=== Test 5: make_key messages_fingerprints ===")
+
+    messages = [{"role": "user", "content": "長訊息" * 1000}]
+    fps = [cache.message_fingerprint(m) for m in messages]
+
+    key_a = cache.make_key("model", messages, {}, [], project=TEST_PROJECT, messages_fingerprints=fps)
+    key_b = cache.make_key("model", None, {}, [], project=TEST_PROJECT, messages_fingerprints=fps)
+    assert key_a == key_b, "Fingerprinted keys should not depend on messages"
+
+    other = [cache.message_fingerprint({"role": "user", "content": "other"})]
+    key_c = cache.make_key("model", None, {}, [], project=TEST_PROJECT, messages_fingerprints=other)
+    assert key_a != key_c, "Different fingerprints must give different keys"
+    print("✅ messages_fingerprints produce stable keys")
+
+
+def cleanup():
+    cache.clear(TEST_PROJECT)
+    cache.clear(TEST_PROJECT + "_other")
+
+
+def main():
+    print("=" * 60)
+    print("Cache API Tests")
+    print("=" * 60)
+
+    try:
+        test_cache_set_get()
+        test_cache_expired()
+        test_cache_set_many()
+        test_project_isolation()
+        test_make_key_fingerprints()
+
+        cleanup()
+
+        print("\n" + "=" * 60)
+        print("✅ All Cache API tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        cleanup()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test persistent code index (code.index)
+
+Tests:
+1. build_index - 建立與增量更新
+2. filter_candidates - 略過不含字面字串的未變更檔案
+3. search_pattern with index - 結果與線性掃描一致（含新增檔案）
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+
+from code.index import build_index, filter_candidates
+from code._fswalk import iter_files
+from code.pattern_search import search_pattern
+
+
+def _make_project(tmp: Path):
+    (tmp / "src").mkdir()
+    (tmp / "src" / "alpha.py").write_text("def alpha_handler():\n    return 1\n")
+    (tmp / "src" / "beta.py").write_text("def beta():\n    return alpha_handler()\n")
+    (tmp / "notes.md").write_text("nothing to see\n")
+
+
+def test_build_index():
+    """build_index indexes once, then only refreshes changed files"""
+    print("\n=== Test 1: build_index ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        _make_project(tmp)
+        db = tmp / "idx" / "code_index.sqlite"
+
+        stats = build_index(tmp / "src", db)
+        assert stats["indexed"] == 2, f"Unexpected stats: {stats}"
+
+        stats = build_index(tmp / "src", db)
+        assert stats["indexed"] == 0 and stats["unchanged"] == 2, f"Unexpected stats: {stats}"
+
+        (tmp / "src" / "beta.py").unlink()
+        stats = build_index(tmp / "src", db)
+        assert stats["removed"] == 1, f"Unexpected stats: {stats}"
+    print("✅ build_index is incremental")
+
+
+def test_filter_candidates():
+    """Unchanged files without the literal are dropped; new files are kept"""
+    print("\n=== Test 2: filter_candidates ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        _make_project(tmp)
+        db = tmp / ".idx" / "code_index.sqlite"
+        build_index(tmp, db)
+
+        (tmp / "gamma.py").write_text("alpha_handler = None\n")
+        kept = {rel for _, rel in filter_candidates(tmp, iter_files(str(tmp)), "alpha_handler", db)}
+        assert kept == {"src/alpha.py", "src/beta.py", "gamma.py"}, f"Unexpected candidates: {kept}"
+
+        # Too short for the trigram index: nothing is filtered
+        kept = {rel for _, rel in filter_candidates(tmp, iter_files(str(tmp)), "al", db)}
+        assert len(kept) == 4, f"Unexpected candidates: {kept}"
+    print("✅ filter_candidates prunes only provably non-matching files")
+
+
+def test_search_pattern_with_index():
+    """search_pattern returns the same matches with a persistent index"""
+    print("\n=== Test 3: search_pattern with index ===")
+
+    import code.index as index
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        _make_project(tmp)
+        expected = search_pattern(r"alpha_\w+", str(tmp))
+
+        old_db = index.DB_PATH
+        index.DB_PATH = tmp / ".idx" / "code_index.sqlite"
+        try:
+            build_index(tmp)
+            assert search_pattern(r"alpha_\w+", str(tmp)) == expected
+        finally:
+            index.DB_PATH = old_db
+    print(f"✅ {len(expected)} matches, identical with and without index")
+
+
+def main():
+    print("=" * 60)
+    print("Code Index Tests")
+    print("=" * 60)
+
+    try:
+        test_build_index()
+        test_filter_candidates()
+        test_search_pattern_with_index()
+
+        print("\n" + "=" * 60)
+        print("✅ All Code Index tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
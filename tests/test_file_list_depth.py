@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test recursive directory listing depth (file.finder.list_directory)
+
+Tests:
+1. max_depth levels - 依 max_depth 限制列出的層數
+2. Invalid max_depth - 小於 1 的 max_depth 回傳錯誤
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+
+from file.finder import list_directory
+
+
+def _make_tree(root: Path):
+    """root/top.txt, root/a/one.txt, root/a/b/two.txt, root/a/b/c/three.txt"""
+    (root / "a" / "b" / "c").mkdir(parents=True)
+    (root / "top.txt").write_text("0")
+    (root / "a" / "one.txt").write_text("1")
+    (root / "a" / "b" / "two.txt").write_text("2")
+    (root / "a" / "b" / "c" / "three.txt").write_text("3")
+
+
+def _listing(root, **kwargs):
+    result = list_directory(str(root), recursive=True, **kwargs)
+    assert result["ok"] is True, result
+    return set(result["directories"]), set(result["files"])
+
+
+def test_max_depth_levels():
+    """Each max_depth lists exactly that many levels"""
+    print("\n=== Test 1: max_depth levels ===")
+
+    a, ab, abc = "a", os.path.join("a", "b"), os.path.join("a", "b", "c")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _make_tree(root)
+
+        assert _listing(root, max_depth=1) == ({a}, {"top.txt"})
+        assert _listing(root, max_depth=2) == (
+            {a, ab}, {"top.txt", os.path.join(a, "one.txt")})
+        assert _listing(root, max_depth=3) == (
+            {a, ab, abc},
+            {"top.txt", os.path.join(a, "one.txt"), os.path.join(ab, "two.txt")})
+
+        everything = _listing(root)
+        assert everything == _listing(root, max_depth=4) == _listing(root, max_depth=100)
+        assert os.path.join(abc, "three.txt") in everything[1]
+    print("✅ Listing stops at max_depth")
+
+
+def test_invalid_max_depth():
+    """max_depth below 1 is rejected, not treated as 1"""
+    print("\n=== Test 2: invalid max_depth ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _make_tree(Path(tmp))
+        for depth in (0, -1):
+            result = list_directory(tmp, recursive=True, max_depth=depth)
+            assert result["ok"] is False, result
+            assert "max_depth" in result["error"]
+    print("✅ max_depth < 1 returns an error")
+
+
+def main():
+    print("=" * 60)
+    print("Directory Listing Depth Tests")
+    print("=" * 60)
+
+    try:
+        test_max_depth_levels()
+        test_invalid_max_depth()
+
+        print("\n" + "=" * 60)
+        print("✅ All directory listing depth tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test PII masking (guardrails.mask_pii)
+
+Tests:
+1. Boundary created by masking - 遮罩後產生的邊界仍會被後續模式遮罩
+2. Custom mask_char - 自訂遮罩字元
+3. Clean text - 無 PII 時原文不變
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+
+from guardrails import mask_pii
+
+
+def test_mask_boundary_from_earlier_mask():
+    """Masking a Slack token creates the word boundary that ends a passport number"""
+    print("\n=== Test 1: boundary created by masking ===")
+
+    text = "AB1234567xoxb-123-45-67895"
+    masked = mask_pii(text)
+    assert masked == "*" * len(text), f"Unexpected mask: {masked}"
+    print("✅ Passport number next to a token is masked")
+
+
+def test_mask_char():
+    """Non-* mask characters mask the same values"""
+    print("\n=== Test 2: custom mask_char ===")
+
+    text = "AB1234567xoxb-123-45-67895"
+    assert mask_pii(text, "#") == "#" * len(text)
+    assert mask_pii(text, "-") == "-" * len(text)
+
+    text = "call 555-123-4567 now"
+    assert mask_pii(text, "#") == "call ############ now"
+    assert mask_pii(text, "XY") == "call " + "XY" * 12 + " now"
+    print("✅ mask_char is applied to every masked character")
+
+
+def test_clean_text_unchanged():
+    """Text without PII comes back unchanged"""
+    print("\n=== Test 3: clean text ===")
+
+    text = "def search(query, k=8):\n    return []\n"
+    assert mask_pii(text) == text
+    assert mask_pii("") == ""
+    print("✅ Clean text unchanged")
+
+
+def main():
+    print("=" * 60)
+    print("PII Masking Tests")
+    print("=" * 60)
+
+    try:
+        test_mask_boundary_from_earlier_mask()
+        test_mask_char()
+        test_clean_text_unchanged()
+
+        print("\n" + "=" * 60)
+        print("✅ All PII masking tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
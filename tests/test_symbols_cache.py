@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test the persistent symbol cache (code.symbols_cache)
+
+Tests:
+1. Warm hit - 暖快取結果等同冷解析，且不重新解析
+2. Same-size edit - 檔案大小不變的修改仍會失效
+3. Separate keys - depth 與 include_body 各自獨立快取
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+
+from code import symbols, symbols_cache
+
+SOURCE = '''class Alpha:
+    def method(self):
+        return 1
+
+
+def alpha_func(x):
+    return x + 1
+'''
+
+
+class _Env:
+    """Temp DB_PATH and source file, counting real parses."""
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = (symbols_cache.DB_PATH, symbols_cache._CONN, symbols_cache._CONN_PID,
+                      symbols._extract_symbols_uncached)
+        symbols_cache.DB_PATH = Path(self.tmp.name) / "symbols_cache.sqlite"
+        symbols_cache._CONN = None
+        self.parses = 0
+        uncached = symbols._extract_symbols_uncached
+
+        def counting(*args, **kwargs):
+            self.parses += 1
+            return uncached(*args, **kwargs)
+
+        symbols._extract_symbols_uncached = counting
+        self.path = Path(self.tmp.name) / "sample.py"
+        self.path.write_text(SOURCE)
+        symbols.clear_symbol_cache()
+        return self
+
+    def extract(self, **kwargs):
+        # Drop the in-memory layer so only the persistent cache can answer
+        symbols.clear_symbol_cache()
+        return symbols.extract_symbols(str(self.path), **kwargs)
+
+    def __exit__(self, *exc):
+        if symbols_cache._CONN is not None:
+            symbols_cache._CONN.close()
+        (symbols_cache.DB_PATH, symbols_cache._CONN, symbols_cache._CONN_PID,
+         symbols._extract_symbols_uncached) = self.saved
+        symbols.clear_symbol_cache()
+        self.tmp.cleanup()
+
+
+def test_warm_hit_matches_cold():
+    """A warm call returns the cold call's symbols without parsing again"""
+    print("\n=== Test 1: warm hit ===")
+
+    with _Env() as env:
+        cold = env.extract(depth=2, include_body=True)
+        assert env.parses == 1
+        warm = env.extract(depth=2, include_body=True)
+        assert env.parses == 1, "Warm call re-parsed the file"
+        assert warm == cold
+        assert {s["name"] for s in cold} >= {"Alpha", "alpha_func"}
+    print("✅ Warm cache returns the same symbols")
+
+
+def test_same_size_edit_misses():
+    """Editing the file without changing its size invalidates the entry"""
+    print("\n=== Test 2: same-size edit ===")
+
+    with _Env() as env:
+        before = env.extract()
+        old_sha = symbols_cache.file_hash(str(env.path))
+
+        edited = SOURCE.replace("alpha_func", "gamma_func")
+        assert len(edited) == len(SOURCE)
+        env.path.write_text(edited)
+
+        after = env.extract()
+        assert env.parses == 2, "Edited file was served from the cache"
+        names = {s["name"] for s in after}
+        assert "gamma_func" in names and "alpha_func" not in names, names
+        assert before != after
+        # The row for the old content is dropped
+        assert symbols_cache.get(os.path.abspath(env.path), old_sha, 2, False) is None
+    print("✅ Same-size edit is a cache miss")
+
+
+def test_depth_and_body_are_separate_keys():
+    """depth and include_body each key their own entry"""
+    print("\n=== Test 3: separate keys ===")
+
+    with _Env() as env:
+        variants = [(2, False), (1, False), (2, True), (1, True)]
+        first = {v: env.extract(depth=v[0], include_body=v[1]) for v in variants}
+        assert env.parses == len(variants), "A variant was served from another's entry"
+
+        sha = symbols_cache.file_hash(str(env.path))
+        for depth, include_body in variants:
+            assert symbols_cache.get(os.path.abspath(env.path), sha, depth, include_body) is not None
+
+        again = {v: env.extract(depth=v[0], include_body=v[1]) for v in variants}
+        assert env.parses == len(variants)
+        assert again == first
+        assert first[(2, False)] != first[(1, False)]  # depth 1 omits methods
+        assert first[(2, False)] != first[(2, True)]   # bodies only when asked
+    print("✅ depth and include_body are cached separately")
+
+
+def main():
+    print("=" * 60)
+    print("Symbol Cache Tests")
+    print("=" * 60)
+
+    try:
+        test_warm_hit_matches_cold()
+        test_same_size_edit_misses()
+        test_depth_and_body_are_separate_keys()
+
+        print("\n" + "=" * 60)
+        print("✅ All symbol cache tests passed!")
+        print("=" * 60)
+        return 0
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())